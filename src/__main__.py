@@ -0,0 +1,78 @@
+"""
+Unified command line: ``python -m src <subcommand> [args...]``.
+
+    python -m src first-round [CSV|GLOB ...] [--n-sim N] [--summary-only] ...
+    python -m src runoff      [CSV|GLOB ...] [--n-sim N] [--exact] ...
+    python -m src combined    [--polls CSV] [--polls-2t CSV] [--n-sim N]
+    python -m src backtest    [--year 2022] [--n-sim N] [--replay] ...
+    python -m src sweep       GRID.json [GRID2.json ...] [--polls CSV] [--n-sim N]
+    python -m src watch       [--polls CSV] [--feed JSONL] [--no-charts] ...
+    python -m src serve       [streamlit options]
+
+Each subcommand imports only its own module when it runs, so ``--help``
+and the dispatcher itself start in milliseconds, and the run pays only for
+the libraries its model needs.  Subcommands that read poll CSVs or sweep
+grids take several files or glob patterns, processed one after another in
+the same interpreter.  The original scripts (``python src/simulation_v2.py``
+etc.) keep working and accept the same arguments.
+"""
+
+import argparse
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+
+# subcommand → (module, entry function, one-line description)
+SUBCOMANDOS = {
+    "first-round": ("src.simulation_v2", "main",
+                    "First-round Monte Carlo on data/pesquisas.csv (simulation_v2.py)"),
+    "runoff":      ("src.simulation_2turno", "main",
+                    "Standalone second round on data/pesquisas_2turno.csv"),
+    "combined":    ("src.simulation_combined", "main",
+                    "First round and standalone second round with the combined dashboard"),
+    "backtest":    ("src.backtesting", "main",
+                    "Backtests, calibration, replay and error bank against 2018/2022"),
+    "sweep":       ("src.simulation_v2", "main_sweep",
+                    "Batched what-if scenario sweeps from JSON grids"),
+    "watch":       ("src.daemon", "main",
+                    "Daemon that republishes the forecast when the polls or the feed change"),
+    "serve":       (None, None,
+                    "Streamlit dashboard (src/dashboard.py)"),
+}
+
+DASHBOARD = Path(__file__).resolve().parent / "dashboard.py"
+
+
+def _parser() -> argparse.ArgumentParser:
+    largura = max(map(len, SUBCOMANDOS))
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Brazil election Monte Carlo — unified command line.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="subcommands:\n" + "\n".join(
+            f"  {nome:<{largura}}  {desc}" for nome, (_, _, desc) in SUBCOMANDOS.items()
+        ) + "\n\nRun 'python -m src <subcommand> --help' for its options.",
+    )
+    parser.add_argument("subcomando", choices=list(SUBCOMANDOS), metavar="SUBCOMMAND")
+    parser.add_argument("argumentos", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    prog = f"python -m src {args.subcomando}"
+
+    if args.subcomando == "serve":
+        return subprocess.call(
+            [sys.executable, "-m", "streamlit", "run", str(DASHBOARD), *args.argumentos]
+        )
+
+    modulo, funcao, _ = SUBCOMANDOS[args.subcomando]
+    getattr(importlib.import_module(modulo), funcao)(args.argumentos, prog=prog)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,9 @@ Usage:
     python src/backtesting.py                  # all snapshots
     python src/backtesting.py --year 2022      # 2022 only
     python src/backtesting.py --year 2018      # 2018 only
+    python src/backtesting.py --n-sim auto --target-se 0.002
+    python src/backtesting.py --n-sim 200000 --workers 4   # snapshots in parallel
+    python src/backtesting.py --calibrate                  # hyperparameter search
 
 Output:
     outputs/backtesting_report.csv             # per-snapshot metrics
@@ -25,18 +28,35 @@ Output:
 Author: gabrielrv13
 """
 
+import os
 import sys
+import math
+import json
 import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from datetime import date
+from datetime import date, timedelta
 from typing import NamedTuple
 
 # ─── PATHS ────────────────────────────────────────────────────────────────────
 
 ROOT_DIR   = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.core.adaptive import DEFAULT_TARGET_SE, n_sim_arg, sample_until
+from src.core.error_bank import ErrorBank
+from src.core.scoring import crps_sample, log_score, pit
+from src.core.reliability import DEFAULT_N_BOOT, bootstrap_metrics, reliability_table
+from src.core.sampling import METHODS as METODOS_AMOSTRAGEM, gamma_from_normals, sample_dirichlet
+from src.core.summary import top_two
+from src.io.archive import PollArchive
+
 DATA_DIR   = ROOT_DIR / "data" / "historico"
+ARQUIVO_PATH = DATA_DIR / "arquivo.sqlite"   # built by --build-archive
 OUTPUT_DIR = ROOT_DIR / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
@@ -88,12 +108,20 @@ SNAPSHOT_DATES: dict[str, dict[str, date]] = {
     },
 }
 
+ELECTION_DATES: dict[str, date] = {
+    "2022": date(2022, 10, 2),
+    "2018": date(2018, 10, 7),
+}
+
 SNAPSHOTS_2022 = ["T-90", "T-60", "T-30", "T-14", "T-7"]
 SNAPSHOTS_2018 = ["T-30", "T-14", "T-7"]
 
 # ─── N_SIM ────────────────────────────────────────────────────────────────────
 
 N_SIM_BACKTEST = 40_000
+SEMENTE_BACKTEST = 42  # Base seed; each snapshot derives its own stream from it
+BANCO_ERROS_PATH = OUTPUT_DIR / "banco_erros.npz"
+LIMIARES_MARGEM = (3.0, 5.0, 10.0, 15.0, 20.0)  # P(1st-round margin > X pp) statements
 
 # ─── DATA STRUCTURES ──────────────────────────────────────────────────────────
 
@@ -109,6 +137,13 @@ class SnapshotResult(NamedTuple):
     pred_winner_prob: float
     pred_margin:      float
     bias_per_cand:    dict
+    crps_share:       float   # mean CRPS of valid vote shares over ground-truth candidates (pp)
+    crps_margin:      float   # CRPS of the first-round margin (pp)
+    log_score_pair:   float   # −log P(actual runoff pair)
+    pit_margin:       float   # P(simulated margin <= actual)
+    crps_per_cand:    dict
+    pit_per_cand:     dict
+    declaracoes:      tuple = ()   # (tipo, evento, p, y) statements for reliability analysis
 
 
 # ─── POLL AGGREGATION (local, no globals) ─────────────────────────────────────
@@ -133,7 +168,12 @@ def _detectar_outliers(valores: np.ndarray, threshold: float = 2.5) -> np.ndarra
     return np.abs(z_scores) > threshold
 
 
-def _agregar_candidato(df_cand: pd.DataFrame, data_referencia: date) -> tuple:
+def _agregar_candidato(
+    df_cand: pd.DataFrame,
+    data_referencia: date,
+    tau: float = 7,
+    outlier_threshold: float = 2.5,
+) -> tuple:
     """
     Aggregates polls for a single candidate with temporal weighting.
 
@@ -149,13 +189,13 @@ def _agregar_candidato(df_cand: pd.DataFrame, data_referencia: date) -> tuple:
         )
 
     pesos = np.array([
-        _calcular_peso_temporal(d, data_referencia)
+        _calcular_peso_temporal(d, data_referencia, tau)
         for d in df_cand["data"].values
     ])
     pesos = pesos / pesos.sum()
 
     votos = df_cand["intencao_voto_pct"].values
-    is_outlier = _detectar_outliers(votos)
+    is_outlier = _detectar_outliers(votos, outlier_threshold)
     mask = ~is_outlier if (~is_outlier).sum() > 0 else np.ones(len(votos), dtype=bool)
 
     pesos_v = pesos[mask] / pesos[mask].sum()
@@ -179,7 +219,46 @@ def _agregar_candidato(df_cand: pd.DataFrame, data_referencia: date) -> tuple:
 
 # ─── SNAPSHOT LOADER ──────────────────────────────────────────────────────────
 
-def carregar_snapshot(csv_path: Path, data_referencia: date) -> tuple:
+_ARQUIVO: PollArchive | None = None
+
+
+def arquivo_pesquisas(recarregar: bool = False) -> PollArchive:
+    """
+    Process-wide poll archive (src/io/archive.py), loaded once.
+
+    Reads ARQUIVO_PATH when it exists and is newer than every snapshot CSV;
+    otherwise ingests the CSVs in data/historico/ in memory.
+    """
+    global _ARQUIVO
+    if _ARQUIVO is None or recarregar:
+        csvs = list(DATA_DIR.glob("*_1t_T-*.csv"))
+        atual = ARQUIVO_PATH.exists() and all(
+            c.stat().st_mtime <= ARQUIVO_PATH.stat().st_mtime for c in csvs
+        )
+        _ARQUIVO = (PollArchive.load(ARQUIVO_PATH) if atual
+                    else PollArchive.from_csvs(DATA_DIR, NAME_ALIASES))
+    return _ARQUIVO
+
+
+def pesquisas_snapshot(
+    year: str,
+    snapshot: str,
+    tau: float = 7,
+    outlier_threshold: float = 2.5,
+) -> tuple:
+    """carregar_snapshot() for a snapshot of the poll archive (a date-range lookup)."""
+    return agregar_pesquisas(
+        arquivo_pesquisas().snapshot(year, snapshot), SNAPSHOT_DATES[year][snapshot],
+        tau, outlier_threshold,
+    )
+
+
+def carregar_snapshot(
+    csv_path: Path,
+    data_referencia: date,
+    tau: float = 7,
+    outlier_threshold: float = 2.5,
+) -> tuple:
     """
     Loads a historical poll snapshot and aggregates it using the same
     temporal-weighting logic as carregar_pesquisas() in simulation_v2.py.
@@ -191,10 +270,17 @@ def carregar_snapshot(csv_path: Path, data_referencia: date) -> tuple:
     Args:
         csv_path:        Path to historical CSV file.
         data_referencia: Snapshot date (e.g. date(2022, 9, 20) for T-14).
+        tau:               Temporal decay (days) of the poll weights.
+        outlier_threshold: Modified z-score above which a poll is dropped.
 
     Returns:
         tuple: (candidatos, votos_media, rejeicao, desvio_base, indecisos)
     """
+    return agregar_pesquisas(_ler_pesquisas(csv_path), data_referencia, tau, outlier_threshold)
+
+
+def _ler_pesquisas(csv_path: Path) -> pd.DataFrame:
+    """Reads a historical poll CSV, parsing dates and mapping candidate aliases."""
     if not csv_path.exists():
         raise FileNotFoundError(f"Snapshot CSV not found: {csv_path}")
 
@@ -206,14 +292,28 @@ def carregar_snapshot(csv_path: Path, data_referencia: date) -> tuple:
     if missing:
         raise ValueError(f"Missing columns in {csv_path.name}: {missing}")
 
-    candidatos = list(df["candidato"].unique())
-    candidatos = [NAME_ALIASES.get(c, c) for c in candidatos]
     df["candidato"] = df["candidato"].map(lambda x: NAME_ALIASES.get(x, x))
+    return df
+
+
+def agregar_pesquisas(
+    df: pd.DataFrame,
+    data_referencia: date,
+    tau: float = 7,
+    outlier_threshold: float = 2.5,
+) -> tuple:
+    """
+    Aggregates already-loaded polls (see carregar_snapshot()) at ``data_referencia``.
+
+    Returns:
+        tuple: (candidatos, votos_media, rejeicao, desvio_base, indecisos)
+    """
+    candidatos = list(df["candidato"].unique())
     votos_list, rejeicao_list, desvio_list = [], [], []
 
     for cand in candidatos:
         df_cand = df[df["candidato"] == cand].copy()
-        voto, rej, desv = _agregar_candidato(df_cand, data_referencia)
+        voto, rej, desv = _agregar_candidato(df_cand, data_referencia, tau, outlier_threshold)
         votos_list.append(voto)
         rejeicao_list.append(rej)
         desvio_list.append(desv)
@@ -226,7 +326,7 @@ def carregar_snapshot(csv_path: Path, data_referencia: date) -> tuple:
     indecisos = 0.0
     if "indecisos_pct" in df.columns:
         pesos_g = np.array([
-            _calcular_peso_temporal(d, data_referencia)
+            _calcular_peso_temporal(d, data_referencia, tau)
             for d in df["data"].values
         ])
         pesos_g = pesos_g / pesos_g.sum()
@@ -237,28 +337,39 @@ def carregar_snapshot(csv_path: Path, data_referencia: date) -> tuple:
 
 # ─── SIMULATION RUNNER ────────────────────────────────────────────────────────
 
-def executar_simulacao_historica(
-    candidatos:  list[str],
-    votos_media: np.ndarray,
-    rejeicao:    np.ndarray,
-    desvio:      float,
-    indecisos:   float,
-    n_sim:       int = N_SIM_BACKTEST,
-) -> dict:
-    """
-    Runs first-round Monte Carlo simulation using historical poll inputs.
+def _amostrar_historica(
+    alphas: np.ndarray,
+    tetos: np.ndarray,
+    n_sim: int,
+    metodo: str = "random",
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """Dirichlet draws with rejection ceiling, renormalised to 100 (%)."""
+    # ── Dirichlet sampling ────────────────────────────────────────────────────
+    proporcoes = sample_dirichlet(alphas, n_sim, metodo, rng)
+    return _aplicar_teto_historico(proporcoes, tetos)
 
-    Replicates the Dirichlet sampling logic from simular_primeiro_turno()
-    without depending on module-level globals.
 
-    Returns:
-        dict with keys:
-            "prob_vencedor"  : {candidato: float} — win probability (0–1)
-            "mediana_votos"  : {candidato: float} — median vote share (%)
-            "mediana_margem" : float              — median first-round margin (pp)
-            "prob_par"       : dict[frozenset, float] — runoff pair probabilities
-    """
-    # ── Undecided redistribution ───────────────────────────────────────────────
+def _aplicar_teto_historico(proporcoes: np.ndarray, tetos: np.ndarray) -> np.ndarray:
+    """Rejection ceiling on raw Dirichlet proportions, renormalised to 100 (%)."""
+    votos_norm = proporcoes * 100.0
+
+    # ── Rejection ceiling ─────────────────────────────────────────────────────
+    votos_limitados = np.minimum(votos_norm, tetos[np.newaxis, :])
+    totais = votos_limitados.sum(axis=1, keepdims=True)
+    totais = np.where(totais == 0, 1.0, totais)
+    return votos_limitados / totais * 100.0
+
+
+def _alphas_historicos(
+    votos_media: np.ndarray,
+    rejeicao: np.ndarray,
+    desvio: float,
+    indecisos: float,
+    blank_fraction: float = 0.15,
+    escala_desvio: float = 1.0,
+) -> np.ndarray:
+    """Dirichlet parameters after undecided redistribution (``escala_desvio`` scales DESVIO)."""
     votos_efetivos = votos_media.copy()
     if indecisos > 0:
         espaco = np.maximum(100.0 - rejeicao, 0.0) / 100.0
@@ -266,63 +377,115 @@ def executar_simulacao_historica(
         total_peso = pesos_dist.sum()
         if total_peso > 0:
             proporcoes = pesos_dist / total_peso
-            votos_efetivos += proporcoes * indecisos * 0.85  # 15% to blank/null
+            votos_efetivos += proporcoes * indecisos * (1.0 - blank_fraction)
 
     # Guard against invalid alphas
     votos_efetivos = np.maximum(votos_efetivos, 0.01)
 
-    # ── Dirichlet sampling ────────────────────────────────────────────────────
-    fator = 100.0 / max(desvio, 0.5)
-    alphas = votos_efetivos * fator
-    proporcoes = np.random.dirichlet(alphas, size=n_sim)
-    votos_norm = proporcoes * 100.0
+    fator = 100.0 / max(desvio * escala_desvio, 0.5)
+    return votos_efetivos * fator
 
-    # ── Rejection ceiling ─────────────────────────────────────────────────────
-    tetos = 100.0 - rejeicao
-    votos_limitados = np.minimum(votos_norm, tetos[np.newaxis, :])
-    totais = votos_limitados.sum(axis=1, keepdims=True)
-    totais = np.where(totais == 0, 1.0, totais)
-    votos_final = votos_limitados / totais * 100.0
 
-    # ── Winner per simulation ─────────────────────────────────────────────────
-    idx_vencedor = np.argmax(votos_final, axis=1)
-    vencedores = np.array(candidatos)[idx_vencedor]
-
-    prob_vencedor = {
-        c: float((vencedores == c).mean())
-        for c in candidatos
-    }
-    mediana_votos = {
-        c: float(np.median(votos_final[:, i]))
-        for i, c in enumerate(candidatos)
-    }
+def _resumir_historica(votos_final: np.ndarray, candidatos: list[str]) -> dict:
+    """Win, median vote, median margin and runoff-pair summary of simulated shares."""
+    n_sim, k = votos_final.shape
+    lider, segundo, margens = top_two(votos_final)
 
-    # ── Margin distribution ───────────────────────────────────────────────────
-    sorted_votes = np.sort(votos_final, axis=1)[:, ::-1]
-    margens = sorted_votes[:, 0] - sorted_votes[:, 1]
+    vitorias = np.bincount(lider, minlength=k)
+    prob_vencedor = {c: float(vitorias[i] / n_sim) for i, c in enumerate(candidatos)}
+    medianas = np.median(votos_final, axis=0)
+    mediana_votos = {c: float(medianas[i]) for i, c in enumerate(candidatos)}
     mediana_margem = float(np.median(margens))
+    prob_margem = {x: float(np.mean(margens > x)) for x in LIMIARES_MARGEM}
 
     # ── Runoff pair probabilities ─────────────────────────────────────────────
-    top2_idx = np.argsort(votos_final, axis=1)[:, -2:]
-    top2_sorted = np.sort(top2_idx, axis=1)
-    par_labels = [
-        frozenset([candidatos[a], candidatos[b]])
-        for a, b in top2_sorted
-    ]
-    prob_par: dict[frozenset, float] = {}
-    for par in par_labels:
-        prob_par[par] = prob_par.get(par, 0) + 1
-    for par in prob_par:
-        prob_par[par] /= n_sim
+    # Unordered pair (a < b) encoded as a·k + b and counted in one bincount
+    codigos = np.minimum(lider, segundo) * k + np.maximum(lider, segundo)
+    contagem = np.bincount(codigos, minlength=k * k)
+    prob_par: dict[frozenset, float] = {
+        frozenset([candidatos[c // k], candidatos[c % k]]): float(contagem[c] / n_sim)
+        for c in np.flatnonzero(contagem)
+    }
 
     return {
         "prob_vencedor":  prob_vencedor,
         "mediana_votos":  mediana_votos,
         "mediana_margem": mediana_margem,
         "prob_par":       prob_par,
+        "prob_margem":    prob_margem,
+        "n_sim":          n_sim,
+        "amostras":       votos_final,
+        "margens":        margens,
     }
 
 
+def executar_simulacao_historica(
+    candidatos:  list[str],
+    votos_media: np.ndarray,
+    rejeicao:    np.ndarray,
+    desvio:      float,
+    indecisos:   float,
+    n_sim:       int | str = N_SIM_BACKTEST,
+    target_se:   float = DEFAULT_TARGET_SE,
+    metodo:      str = "random",
+    rng:         np.random.Generator | None = None,
+    blank_fraction: float = 0.15,
+    escala_desvio:  float = 1.0,
+) -> dict:
+    """
+    Runs first-round Monte Carlo simulation using historical poll inputs.
+
+    Replicates the Dirichlet sampling logic from simular_primeiro_turno()
+    without depending on module-level globals.
+
+    With ``n_sim="auto"`` draws are taken in growing chunks until every
+    candidate's win probability, P(second round) and each P(margin > X)
+    in LIMIARES_MARGEM have Monte Carlo standard error <= ``target_se``.
+    ``metodo`` selects the Dirichlet back-end: "random", "sobol" or
+    "antithetic" (src/core/sampling.py).
+    ``rng`` makes the draws reproducible (legacy ``np.random`` when None).
+    ``blank_fraction`` and ``escala_desvio`` are the calibration knobs (see
+    calibrar()).
+
+    Returns:
+        dict with keys:
+            "prob_vencedor"  : {candidato: float} — win probability (0–1)
+            "mediana_votos"  : {candidato: float} — median vote share (%)
+            "mediana_margem" : float              — median first-round margin (pp)
+            "prob_par"       : dict[frozenset, float] — runoff pair probabilities
+            "prob_margem"    : {X: float}         — P(margin > X) for X in LIMIARES_MARGEM
+            "n_sim"          : int                — draws actually used
+            "amostras"       : (n_sim, K) array   — simulated valid shares (%)
+            "margens"        : (n_sim,) array     — simulated first-round margins (pp)
+    """
+    alphas = _alphas_historicos(votos_media, rejeicao, desvio, indecisos,
+                                blank_fraction, escala_desvio)
+    tetos = 100.0 - rejeicao
+
+    if n_sim == "auto":
+        def _contar(votos: np.ndarray) -> dict[str, int]:
+            lider, _, margens = top_two(votos)
+            vitorias = np.bincount(lider, minlength=len(candidatos))
+            out = {f"vitoria:{c}": int(k) for c, k in zip(candidatos, vitorias)}
+            out["p2t"] = int((votos.max(axis=1) < 50.0).sum())
+            for x in LIMIARES_MARGEM:
+                out[f"margem>{x:g}"] = int((margens > x).sum())
+            return out
+
+        run = sample_until(
+            lambda n: _amostrar_historica(alphas, tetos, n, metodo, rng),
+            _contar,
+            target_se=target_se,
+            verbose=False,
+        )
+        votos_final = np.concatenate(run.chunks)
+        n_sim = run.n_sim
+    else:
+        votos_final = _amostrar_historica(alphas, tetos, n_sim, metodo, rng)
+
+    return _resumir_historica(votos_final, candidatos)
+
+
 # ─── METRICS ──────────────────────────────────────────────────────────────────
 
 def calcular_metricas(
@@ -340,6 +503,8 @@ def calcular_metricas(
         3. Brier score      — (p_winner - 1)^2 for the actual winner
         4. Margin error     — |predicted_median_margin - actual_margin| (pp)
         5. Runoff correct   — model's highest-prob pair matches actual runoff pair
+
+    plus the distributional scores of pontuacao_distribucional().
     """
     gt = ground_truth
     vencedor_real  = gt["vencedor_1t"]
@@ -404,18 +569,97 @@ def calcular_metricas(
         pred_winner_prob=round(p_winner, 4),
         pred_margin=round(resultado["mediana_margem"], 2),
         bias_per_cand=bias_per_cand,
+        **pontuacao_distribucional(resultado, gt),
+        declaracoes=declaracoes_probabilisticas(resultado, gt),
     )
 
 
+def pontuacao_distribucional(resultado: dict, ground_truth: dict) -> dict:
+    """
+    CRPS, log score and PIT from the full simulated sample (src/core/scoring.py).
+
+    Scores:
+        - crps_per_cand / crps_share — CRPS of each ground-truth candidate's
+          valid share and its mean (pp); candidates the polls did not cover
+          are skipped
+        - crps_margin    — CRPS of the first-round margin (pp)
+        - log_score_pair — −log of the smoothed frequency of the actual runoff pair
+        - pit_per_cand / pit_margin — PIT of the actual shares and margin
+
+    Returns:
+        dict of SnapshotResult fields (NaN when the samples are not available).
+    """
+    amostras = resultado.get("amostras")
+    if amostras is None:
+        return {
+            "crps_share": float("nan"), "crps_margin": float("nan"),
+            "log_score_pair": float("nan"), "pit_margin": float("nan"),
+            "crps_per_cand": {}, "pit_per_cand": {},
+        }
+    gt = ground_truth
+    candidatos = list(resultado["prob_vencedor"])
+    cobertos = [c for c in gt["votos_1t"] if c in candidatos]
+    cols = [candidatos.index(c) for c in cobertos]
+    reais = np.array([gt["votos_1t"][c] for c in cobertos])
+
+    crps = np.atleast_1d(crps_sample(amostras[:, cols], reais))
+    pits = np.atleast_1d(pit(amostras[:, cols], reais))
+    n = resultado["n_sim"]
+    contagem_par = resultado["prob_par"].get(gt["par_finalista"], 0.0) * n
+
+    return {
+        "crps_share":     round(float(crps.mean()), 4),
+        "crps_margin":    round(crps_sample(resultado["margens"], gt["margem_1t"]), 4),
+        "log_score_pair": round(log_score(round(contagem_par), n), 4),
+        "pit_margin":     round(pit(resultado["margens"], gt["margem_1t"]), 4),
+        "crps_per_cand":  {c: round(float(v), 3) for c, v in zip(cobertos, crps)},
+        "pit_per_cand":   {c: round(float(v), 4) for c, v in zip(cobertos, pits)},
+    }
+
+
+def declaracoes_probabilisticas(resultado: dict, ground_truth: dict) -> tuple:
+    """
+    Every probability statement of one snapshot, resolved against the result.
+
+    Statements:
+        - vencedor: P(candidate leads the 1st round), one per modelled candidate
+        - par:      P(pair reaches the runoff), one per pair with nonzero probability
+        - margem:   P(1st-round margin > X pp), one per X in LIMIARES_MARGEM
+
+    Returns:
+        Tuple of (tipo, evento, p, y) with y in {0, 1}.
+    """
+    gt = ground_truth
+    declaracoes = []
+    for c, p in resultado["prob_vencedor"].items():
+        declaracoes.append(("vencedor", c, p, int(c == gt["vencedor_1t"])))
+    for par, p in resultado["prob_par"].items():
+        declaracoes.append(("par", " × ".join(sorted(par)), p, int(par == gt["par_finalista"])))
+    for x, p in resultado.get("prob_margem", {}).items():
+        declaracoes.append(("margem", f"> {x:g}pp", p, int(gt["margem_1t"] > x)))
+    return tuple(declaracoes)
+
+
 # ─── SINGLE SNAPSHOT ORCHESTRATOR ─────────────────────────────────────────────
 
-def backtest_snapshot(year: str, snapshot: str, n_sim: int = N_SIM_BACKTEST) -> SnapshotResult:
+def backtest_snapshot(
+    year: str,
+    snapshot: str,
+    n_sim: int | str = N_SIM_BACKTEST,
+    target_se: float = DEFAULT_TARGET_SE,
+    metodo: str = "random",
+    semente: int | None = None,
+) -> SnapshotResult:
     """
     Runs the full backtesting pipeline for one (year, snapshot) pair.
 
+    With ``semente`` the draws come from the snapshot's own stream (see
+    semente_snapshot()), so the result does not depend on which other
+    snapshots ran, in which order or in which process.
+
     Pipeline:
-        1. Resolve CSV path
-        2. Load and aggregate polls with carregar_snapshot()
+        1. Look up the snapshot in the poll archive
+        2. Aggregate its polls with agregar_pesquisas()
         3. Run simulation with executar_simulacao_historica()
         4. Compute metrics with calcular_metricas()
         5. Return SnapshotResult
@@ -425,15 +669,11 @@ def backtest_snapshot(year: str, snapshot: str, n_sim: int = N_SIM_BACKTEST) ->
     if year not in SNAPSHOT_DATES or snapshot not in SNAPSHOT_DATES[year]:
         raise ValueError(f"Unknown snapshot {snapshot} for year {year}")
 
-    csv_path = DATA_DIR / f"{year}_1t_{snapshot}.csv"
-    data_ref = SNAPSHOT_DATES[year][snapshot]
-
-    candidatos, votos_media, rejeicao, desvio_base, indecisos = carregar_snapshot(
-        csv_path, data_ref
-    )
+    candidatos, votos_media, rejeicao, desvio_base, indecisos = pesquisas_snapshot(year, snapshot)
 
+    rng = None if semente is None else np.random.default_rng(semente_snapshot(semente, year, snapshot))
     resultado = executar_simulacao_historica(
-        candidatos, votos_media, rejeicao, desvio_base, indecisos, n_sim
+        candidatos, votos_media, rejeicao, desvio_base, indecisos, n_sim, target_se, metodo, rng
     )
 
     return calcular_metricas(resultado, GROUND_TRUTH[year], year, snapshot)
@@ -441,12 +681,37 @@ def backtest_snapshot(year: str, snapshot: str, n_sim: int = N_SIM_BACKTEST) ->
 
 # ─── FULL BACKTESTING RUN ─────────────────────────────────────────────────────
 
-def backtest_completo(year: str | None = None, n_sim: int = N_SIM_BACKTEST) -> list[SnapshotResult]:
+def semente_snapshot(semente: int, year: str, snapshot: str) -> np.random.SeedSequence:
+    """Independent, reproducible stream for one snapshot, derived from a base seed."""
+    return np.random.SeedSequence(semente, spawn_key=(int(year), int(snapshot.removeprefix("T-"))))
+
+
+def _executar_agendado(tarefa: tuple) -> SnapshotResult | str:
+    """Process-pool worker: one snapshot, errors returned as text."""
+    try:
+        return backtest_snapshot(*tarefa)
+    except Exception as exc:
+        return str(exc)
+
+
+def backtest_completo(
+    year: str | None = None,
+    n_sim: int | str = N_SIM_BACKTEST,
+    target_se: float = DEFAULT_TARGET_SE,
+    metodo: str = "random",
+    workers: int | None = 1,
+    semente: int | None = SEMENTE_BACKTEST,
+) -> list[SnapshotResult]:
     """
     Runs backtesting across all available snapshots for one or both elections.
 
     Skips snapshots whose CSV file does not exist (partial data collection).
     Prints a warning for each missing file.
+
+    Snapshots are independent, so with ``workers`` > 1 they are fanned out
+    over a process pool (``None`` = one process per CPU).  Each snapshot
+    draws from its own seed derived from ``semente``, so serial and parallel
+    runs give identical results.
     """
     schedule: list[tuple[str, str]] = []
 
@@ -457,26 +722,505 @@ def backtest_completo(year: str | None = None, n_sim: int = N_SIM_BACKTEST) -> l
         for snap in snap_map[yr]:
             schedule.append((yr, snap))
 
-    resultados: list[SnapshotResult] = []
-
+    tarefas = []
     for yr, snap in schedule:
-        csv_path = DATA_DIR / f"{yr}_1t_{snap}.csv"
-        if not csv_path.exists():
-            print(f"  [SKIP] {csv_path.name} not found — skipping")
+        if not arquivo_pesquisas().has_snapshot(yr, snap):
+            print(f"  [SKIP] {yr}_1t_{snap} not in the poll archive — skipping")
             continue
+        tarefas.append((yr, snap, n_sim, target_se, metodo, semente))
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    workers = max(1, min(workers, len(tarefas)))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            saidas = list(pool.map(_executar_agendado, tarefas))
+    else:
+        saidas = map(_executar_agendado, tarefas)
 
+    resultados: list[SnapshotResult] = []
+    for (yr, snap, *_), resultado in zip(tarefas, saidas):
         print(f"  [RUN]  {yr} {snap} ...", end=" ", flush=True)
-        try:
-            resultado = backtest_snapshot(yr, snap, n_sim)
-            resultados.append(resultado)
-            status = "OK" if resultado.winner_correct else "WRONG WINNER"
-            print(f"RMSE={resultado.rmse:.2f}pp  Brier={resultado.brier:.4f}  [{status}]")
-        except Exception as exc:
-            print(f"ERROR — {exc}")
+        if isinstance(resultado, str):
+            print(f"ERROR — {resultado}")
+            continue
+        resultados.append(resultado)
+        status = "OK" if resultado.winner_correct else "WRONG WINNER"
+        print(f"RMSE={resultado.rmse:.2f}pp  Brier={resultado.brier:.4f}  [{status}]")
 
     return resultados
 
 
+# ─── EMPIRICAL ERROR BANK ─────────────────────────────────────────────────────
+
+def erros_snapshot(year: str, snapshot: str) -> tuple[int, np.ndarray]:
+    """
+    Poll-vs-result errors of one snapshot, by poll rank.
+
+    Uses the aggregated polls directly (no simulation), rebased to valid
+    votes over all modeled candidates as in calcular_metricas().
+
+    Returns:
+        tuple: (days to election, errors (R,) = result − poll in pp for the
+                leading poll ranks, stopping at the first candidate missing
+                from the ground truth so that entry r is always rank r)
+    """
+    data_ref = SNAPSHOT_DATES[year][snapshot]
+    candidatos, votos_media, _, _, _ = pesquisas_snapshot(year, snapshot)
+
+    votos_reais = GROUND_TRUTH[year]["votos_1t"]
+    validos = votos_media / votos_media.sum() * 100.0
+    ordem = np.argsort(-validos)
+    erros = []
+    for i in ordem:
+        if candidatos[i] not in votos_reais:
+            break
+        erros.append(votos_reais[candidatos[i]] - validos[i])
+    return (ELECTION_DATES[year] - data_ref).days, np.array(erros)
+
+
+def construir_banco_erros(caminho: Path = BANCO_ERROS_PATH) -> ErrorBank:
+    """
+    Builds the empirical-error bank from every available snapshot and saves it.
+
+    The bank is read by simulation_v2 --empirical-error, which adds one
+    sampled record of historical errors to each first-round draw.
+    """
+    dias, erros, rotulos = [], [], []
+    for yr, snaps in (("2022", SNAPSHOTS_2022), ("2018", SNAPSHOTS_2018)):
+        for snap in snaps:
+            if not arquivo_pesquisas().has_snapshot(yr, snap):
+                continue
+            d, e = erros_snapshot(yr, snap)
+            if not len(e):
+                continue        # poll leader without a ground-truth result
+            dias.append(d)
+            erros.append(e)
+            rotulos.append(f"{yr} {snap}")
+    if not erros:
+        raise FileNotFoundError(f"No historical snapshots found in {DATA_DIR}")
+
+    r = min(len(e) for e in erros)
+    banco = ErrorBank(np.array(dias, dtype=float), np.array([e[:r] for e in erros]), rotulos)
+    Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+    banco.save(caminho)
+    return banco
+
+
+# ─── CALIBRATION ──────────────────────────────────────────────────────────────
+# Model knobs searched against the backtests.  The 80/20 vote transfer of
+# simulation_v2._simular_confronto only affects the second round, which the
+# first-round ground truth here cannot score, so it is not part of the search.
+
+CONFIG_PADRAO: dict[str, float] = {
+    "tau":               7,     # temporal decay of poll weights (days)
+    "outlier_threshold": 2.5,   # modified z-score cut in poll aggregation
+    "blank_fraction":    0.15,  # undecided share sent to blank/null
+    "escala_desvio":     1.0,   # multiplier on the aggregated DESVIO
+}
+
+GRADE_CALIBRACAO: dict[str, list] = {
+    "tau":               [3, 5, 7, 10, 14, 21],
+    "outlier_threshold": [2.0, 2.5, 3.0, 3.5, 99.0],   # 99 = outlier removal off
+    "blank_fraction":    [0.0, 0.10, 0.15, 0.20, 0.30],
+    "escala_desvio":     [0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0, 4.0],
+}
+
+OBJETIVOS = ("rmse", "brier", "margin_error")
+CALIB_N_MIN = 2_000
+CALIB_ETA = 3
+
+# Per-process caches (each pool worker fills its own)
+_CACHE_SNAPSHOT: dict[tuple, tuple] = {}
+_CACHE_NORMAIS: dict[tuple, np.ndarray] = {}
+
+
+def _snapshot_calibracao(year: str, snapshot: str, tau: float, outlier_threshold: float) -> tuple:
+    chave = (year, snapshot, tau, outlier_threshold)
+    if chave not in _CACHE_SNAPSHOT:
+        _CACHE_SNAPSHOT[chave] = pesquisas_snapshot(year, snapshot, tau, outlier_threshold)
+    return _CACHE_SNAPSHOT[chave]
+
+
+def _normais_snapshot(year: str, snapshot: str, k: int, n: int, semente: int) -> np.ndarray:
+    """First ``n`` rows of the snapshot's common standard normals (prefix-stable)."""
+    chave = (year, snapshot, k, semente)
+    z = _CACHE_NORMAIS.get(chave)
+    if z is None or len(z) < n:
+        z = np.random.default_rng(semente_snapshot(semente, year, snapshot)).standard_normal((n, k))
+        _CACHE_NORMAIS[chave] = z
+    return z[:n]
+
+
+def avaliar_config(
+    config: dict,
+    snapshots: list[tuple[str, str]],
+    n_sim: int,
+    semente: int = SEMENTE_BACKTEST,
+    distribucional: bool = False,
+) -> dict:
+    """
+    Mean backtest metrics of one configuration on common random numbers.
+
+    Every configuration sees the same standard normals per snapshot, turned
+    into gamma variates by the Wilson–Hilferty transform, so metric
+    differences between configurations reflect the parameters rather than
+    Monte Carlo noise.  The first ``n`` normals are the same for any ``n``,
+    which lets successive halving grow the sample without re-drawing.
+
+    The CRPS/PIT scores sort the whole sample and are not used for ranking,
+    so they are computed only with ``distribucional=True``.
+
+    Returns:
+        dict with the config, rmse, brier, margin_error (means over
+        snapshots), winner_correct (count) and n_sim; plus crps_share and
+        crps_margin (means) with ``distribucional``.
+    """
+    metricas = []
+    for year, snap in snapshots:
+        candidatos, votos_media, rejeicao, desvio, indecisos = _snapshot_calibracao(
+            year, snap, config["tau"], config["outlier_threshold"]
+        )
+        alphas = _alphas_historicos(votos_media, rejeicao, desvio, indecisos,
+                                    config["blank_fraction"], config["escala_desvio"])
+        g = gamma_from_normals(_normais_snapshot(year, snap, len(alphas), n_sim, semente), alphas)
+        votos = _aplicar_teto_historico(g / g.sum(axis=1, keepdims=True), 100.0 - rejeicao)
+        resultado = _resumir_historica(votos, candidatos)
+        if not distribucional:
+            resultado["amostras"] = None    # pontuacao_distribucional() returns NaN
+        metricas.append(calcular_metricas(resultado, GROUND_TRUTH[year], year, snap))
+    linha = {
+        **config,
+        "rmse":           float(np.mean([m.rmse for m in metricas])),
+        "brier":          float(np.mean([m.brier for m in metricas])),
+        "margin_error":   float(np.mean([m.margin_error for m in metricas])),
+        "winner_correct": int(sum(m.winner_correct for m in metricas)),
+        "n_sim":          n_sim,
+    }
+    if distribucional:
+        linha["crps_share"] = float(np.mean([m.crps_share for m in metricas]))
+        linha["crps_margin"] = float(np.mean([m.crps_margin for m in metricas]))
+    return linha
+
+
+def _avaliar_lote(tarefa: tuple) -> list[dict]:
+    """Process-pool worker: a batch of configurations at one sample size."""
+    configs, snapshots, n_sim, semente, distribucional = tarefa
+    return [avaliar_config(c, snapshots, n_sim, semente, distribucional) for c in configs]
+
+
+def expandir_grade(grade: dict[str, list]) -> list[dict]:
+    """Cartesian product of a parameter grid; missing knobs keep CONFIG_PADRAO."""
+    desconhecidos = set(grade) - set(CONFIG_PADRAO)
+    if desconhecidos:
+        raise KeyError(f"Unknown calibration parameters: {sorted(desconhecidos)}. "
+                       f"Valid: {list(CONFIG_PADRAO)}")
+    nomes = list(grade)
+    return [{**CONFIG_PADRAO, **dict(zip(nomes, valores))}
+            for valores in itertools.product(*(grade[n] for n in nomes))]
+
+
+def calibrar(
+    grade: dict[str, list] | None = None,
+    year: str | None = None,
+    objetivo: str = "rmse",
+    n_min: int = CALIB_N_MIN,
+    n_max: int = N_SIM_BACKTEST,
+    eta: int = CALIB_ETA,
+    workers: int | None = 1,
+    semente: int = SEMENTE_BACKTEST,
+    verbose: bool = True,
+) -> pd.DataFrame:
+    """
+    Successive-halving search of the model knobs against the backtests.
+
+    All configurations are scored on ``n_min`` draws per snapshot; the best
+    ``1/eta`` survive to a round with ``eta`` times more draws, until one
+    remains or ``n_max`` is reached.  Draws are common random numbers, so a
+    configuration's score only moves by the extra draws between rounds.
+
+    Args:
+        grade:    Parameter grid (default: GRADE_CALIBRACAO).
+        year:     Restrict to one election (default: all snapshots).
+        objetivo: Metric minimised: "rmse", "brier" or "margin_error".
+        n_min:    Draws per snapshot in the first round.
+        n_max:    Draws per snapshot in the last round.
+        eta:      Halving rate.
+        workers:  Processes (None = one per CPU).
+        semente:  Base seed of the common random numbers.
+
+    Returns:
+        DataFrame with one row per configuration (its last round), ranked:
+        furthest round first, then by ``objetivo``.  Columns: the knobs,
+        rmse, brier, margin_error, winner_correct, n_sim, rodada, rank, and
+        crps_share / crps_margin for the configurations of the final round
+        (NaN for the others).
+    """
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Unknown objective '{objetivo}'. Valid: {list(OBJETIVOS)}")
+    years = [year] if year else ["2022", "2018"]
+    snap_map = {"2022": SNAPSHOTS_2022, "2018": SNAPSHOTS_2018}
+    snapshots = [(yr, snap) for yr in years for snap in snap_map[yr]
+                 if arquivo_pesquisas().has_snapshot(yr, snap)]
+    if not snapshots:
+        raise FileNotFoundError(f"No historical snapshots found in {DATA_DIR}")
+
+    vivos = expandir_grade(grade or GRADE_CALIBRACAO)
+    if CONFIG_PADRAO not in vivos:
+        vivos.append(dict(CONFIG_PADRAO))
+    workers = (os.cpu_count() or 1) if workers is None else max(1, workers)
+
+    finais: dict[tuple, dict] = {}
+    n, rodada = min(n_min, n_max), 0
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            final = len(vivos) <= 1 or n >= n_max
+            lotes = max(1, min(len(vivos), workers * 4))
+            tarefas = [(vivos[i::lotes], snapshots, n, semente, final) for i in range(lotes)]
+            saidas = executor.map(_avaliar_lote, tarefas) if executor else map(_avaliar_lote, tarefas)
+            linhas = [{**linha, "rodada": rodada} for lote in saidas for linha in lote]
+            for linha in linhas:
+                finais[tuple(linha[k] for k in CONFIG_PADRAO)] = linha
+            linhas.sort(key=lambda r: (r[objetivo], r["rmse"], r["margin_error"]))
+            if verbose:
+                print(f"  [CAL]  round {rodada}: {len(linhas):>5} configs × {n:>7,} draws  "
+                      f"best {objetivo}={linhas[0][objetivo]:.4f}")
+            if final:
+                break
+            vivos = [{k: r[k] for k in CONFIG_PADRAO} for r in linhas[:math.ceil(len(linhas) / eta)]]
+            n, rodada = min(n * eta, n_max), rodada + 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    tabela = pd.DataFrame(list(finais.values()))
+    tabela = tabela.sort_values(["rodada", objetivo, "rmse", "margin_error"],
+                                ascending=[False, True, True, True]).reset_index(drop=True)
+    tabela["rank"] = np.arange(1, len(tabela) + 1)
+    return tabela
+
+
+def relatorio_calibracao(tabela: pd.DataFrame, objetivo: str = "rmse", top: int = 10) -> dict:
+    """Prints the ranked table and the recommended configuration; returns it."""
+    sep = "=" * 70
+    print(f"\n{sep}")
+    print(f"  CALIBRATION — top {min(top, len(tabela))} of {len(tabela)} configurations "
+          f"(objective: {objetivo})")
+    print(sep)
+    cols = [*CONFIG_PADRAO, "rmse", "brier", "margin_error", "crps_share", "winner_correct", "n_sim"]
+    print(tabela[cols].head(top).to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+
+    melhor = tabela.iloc[0]
+    recomendado = {k: melhor[k].item() if hasattr(melhor[k], "item") else melhor[k]
+                   for k in CONFIG_PADRAO}
+    padrao = tabela[(tabela[list(CONFIG_PADRAO)] == pd.Series(CONFIG_PADRAO)).all(axis=1)]
+    print("\n  Recommended config:")
+    for k, v in recomendado.items():
+        print(f"    {k:<18} {v:<8g} (current: {CONFIG_PADRAO[k]:g})")
+    if not padrao.empty:
+        p = padrao.iloc[0]
+        print(f"\n  Current config: rank {int(p['rank'])}, {objetivo}={p[objetivo]:.4f} "
+              f"(n_sim {int(p['n_sim']):,}) vs {melhor[objetivo]:.4f}")
+
+    out_path = OUTPUT_DIR / "calibracao.csv"
+    tabela.to_csv(out_path, index=False)
+    (OUTPUT_DIR / "calibracao_recomendada.json").write_text(
+        json.dumps(recomendado, indent=2), encoding="utf-8"
+    )
+    print(f"\n  Table saved: {out_path}")
+    print(sep)
+    return recomendado
+
+
+# ─── ROLLING-ORIGIN REPLAY ────────────────────────────────────────────────────
+#
+# Re-runs the forecast for every day of a campaign with only the polls
+# published up to that day.  Poll weights are exponential in the poll's age,
+# so every aggregate (weighted means and variances) is a ratio of sums that
+# all decay by the same factor from one day to the next: the aggregate only
+# changes on days when polls are published, and then only for the candidates
+# they cover.  estados_replay() exploits that, and replay_campanha() samples
+# each distinct state once, in batches that share one broadcast gamma
+# transform of common normals (so day-to-day changes reflect the polls, not
+# Monte Carlo noise).
+
+LOTE_REPLAY = 16  # Forecast states sampled per broadcast gamma call
+
+
+def carregar_arquivo(year: str, csv_path: Path | None = None) -> pd.DataFrame:
+    """
+    Full poll archive of one campaign, sorted by date.
+
+    Without ``csv_path`` these are all of the year's polls in the poll
+    archive (arquivo_pesquisas()).
+    """
+    if csv_path is None:
+        df = arquivo_pesquisas().polls(year)
+        if df.empty:
+            raise FileNotFoundError(f"No polls for {year} in the poll archive")
+        return df.reset_index(drop=True)
+    df = _ler_pesquisas(Path(csv_path))
+    chave = [c for c in ("candidato", "instituto", "data") if c in df.columns]
+    df = df.dropna(subset=["data"]).drop_duplicates(subset=chave, keep="last")
+    return df.sort_values("data", kind="stable").reset_index(drop=True)
+
+
+def estados_replay(
+    arquivo: pd.DataFrame,
+    dias: list[date],
+    tau: float = 7,
+    outlier_threshold: float = 2.5,
+):
+    """
+    Aggregated poll state for each day, updated incrementally.
+
+    For every ``dia`` in ``dias`` (ascending) the state equals
+    ``agregar_pesquisas(polls dated <= dia, dia)``, but candidates are only
+    re-aggregated on days when new polls about them appear; days without
+    polls reuse the previous state object unchanged.  Days before the first
+    poll are skipped.
+
+    Yields:
+        (dia, n_pesquisas, (candidatos, votos_media, rejeicao, desvio_base, indecisos))
+    """
+    datas = arquivo["data"].to_numpy()
+    cache: dict[str, tuple] = {}
+    estado, n_vistos = None, 0
+    for dia in dias:
+        n = int(np.searchsorted(datas, dia, side="right"))
+        if n == 0:
+            continue
+        if n != n_vistos:
+            parcial = arquivo.iloc[:n]
+            for cand in arquivo["candidato"].iloc[n_vistos:n].unique():
+                cache[cand] = _agregar_candidato(
+                    parcial[parcial["candidato"] == cand], dia, tau, outlier_threshold
+                )
+            candidatos = list(parcial["candidato"].unique())
+            votos, rejeicao, desvios = (np.array(v, dtype=float)
+                                        for v in zip(*(cache[c] for c in candidatos)))
+            indecisos = 0.0
+            if "indecisos_pct" in parcial.columns:
+                pesos = np.exp(-np.array([(dia - d).days for d in parcial["data"]]) / tau)
+                indecisos = float(np.average(parcial["indecisos_pct"].fillna(0).values,
+                                             weights=pesos / pesos.sum()))
+            estado = (candidatos, votos, rejeicao, float(np.mean(desvios)), indecisos)
+            n_vistos = n
+        yield dia, n_vistos, estado
+
+
+def replay_campanha(
+    year:      str,
+    arquivo:   pd.DataFrame | None = None,
+    n_sim:     int = N_SIM_BACKTEST,
+    inicio:    date | None = None,
+    semente:   int = SEMENTE_BACKTEST,
+    tau:       float = 7,
+    outlier_threshold: float = 2.5,
+    lote:      int = LOTE_REPLAY,
+) -> pd.DataFrame:
+    """
+    Daily rolling-origin forecast over a whole campaign.
+
+    Args:
+        year:    Election year (must have GROUND_TRUTH).
+        arquivo: Poll archive (default: carregar_arquivo(year)).
+        n_sim:   Draws per forecast state.
+        inicio:  First forecast day (default: date of the first poll); the
+                 last one is the eve of the election.
+        semente: Seed of the campaign's common normals.
+        lote:    Distinct states sampled per broadcast call.
+
+    Returns:
+        DataFrame with one row per day: data, dias, n_pesquisas, prob:<cand>
+        (win probability), prob_par_real and the SnapshotResult metrics.
+    """
+    if year not in GROUND_TRUTH:
+        raise ValueError(f"Unknown year: {year}. Valid: {list(GROUND_TRUTH.keys())}")
+    arquivo = carregar_arquivo(year) if arquivo is None else arquivo
+    eleicao = ELECTION_DATES[year]
+    inicio = inicio or arquivo["data"].iloc[0]
+    dias = [inicio + timedelta(days=k) for k in range((eleicao - inicio).days)]
+
+    dias_estado: list[tuple] = []      # (dia, n_pesquisas, índice do estado)
+    estados: list[tuple] = []
+    rotulos: list[str] = []            # T-<dias> of the day each state first applies
+    for dia, n_pesq, estado in estados_replay(arquivo, dias, tau, outlier_threshold):
+        if not estados or estado is not estados[-1]:
+            estados.append(estado)
+            rotulos.append(f"T-{(eleicao - dia).days}")
+        dias_estado.append((dia, n_pesq, len(estados) - 1))
+
+    todos = list(arquivo["candidato"].unique())
+    rng = np.random.default_rng(np.random.SeedSequence(semente, spawn_key=(int(year),)))
+    z = rng.standard_normal((n_sim, len(todos)))
+    gt = GROUND_TRUTH[year]
+
+    # ── Sample distinct states in batches sharing a candidate set ─────────────
+    metricas: list[tuple[SnapshotResult, dict]] = []
+    i = 0
+    while i < len(estados):
+        candidatos = estados[i][0]
+        j = i
+        while j < min(i + lote, len(estados)) and estados[j][0] == candidatos:
+            j += 1
+        alphas = np.array([_alphas_historicos(e[1], e[2], e[3], e[4]) for e in estados[i:j]])
+        cols = [todos.index(c) for c in candidatos]
+        zb = np.broadcast_to(z[:, np.newaxis, cols], (n_sim, j - i, len(cols)))
+        g = gamma_from_normals(zb, alphas)
+        g /= g.sum(axis=2, keepdims=True)
+        for b, e in enumerate(estados[i:j]):
+            resumo = _resumir_historica(_aplicar_teto_historico(g[:, b], 100.0 - e[2]), candidatos)
+            metricas.append((calcular_metricas(resumo, gt, year, rotulos[i + b]), resumo))
+        i = j
+
+    linhas = []
+    for dia, n_pesq, k in dias_estado:
+        m, resumo = metricas[k]
+        linhas.append({
+            "data":           dia,
+            "dias":           (eleicao - dia).days,
+            "n_pesquisas":    n_pesq,
+            **{f"prob:{c}": resumo["prob_vencedor"].get(c, 0.0) for c in todos},
+            "prob_par_real":  resumo["prob_par"].get(gt["par_finalista"], 0.0),
+            "rmse":           m.rmse,
+            "brier":          m.brier,
+            "margin_error":   m.margin_error,
+            "pred_margin":    m.pred_margin,
+            "winner_correct": m.winner_correct,
+            "runoff_correct": m.runoff_correct,
+            "crps_share":     m.crps_share,
+            "crps_margin":    m.crps_margin,
+            "log_score_pair": m.log_score_pair,
+        })
+    return pd.DataFrame(linhas)
+
+
+def relatorio_replay(tabela: pd.DataFrame, year: str, passo: int = 7) -> Path:
+    """Prints a weekly view of the daily replay and saves outputs/replay_<year>.csv."""
+    sep = "=" * 70
+    vencedor = GROUND_TRUTH[year]["vencedor_1t"]
+    print(f"\n{sep}")
+    print(f"  ROLLING-ORIGIN REPLAY — {year}  ({len(tabela)} forecast days, "
+          f"{tabela['n_pesquisas'].iloc[-1] if len(tabela) else 0} poll rows)")
+    print(sep)
+    print(f"  {'Date':<11} {'Days':>5} {'Polls':>6} {'P(' + vencedor + ')':>14} "
+          f"{'RMSE':>6} {'Brier':>7} {'CRPS':>6}")
+    semana = tabela[(tabela["dias"] % passo == 0) | (tabela.index == len(tabela) - 1)]
+    for _, r in semana.iterrows():
+        print(f"  {str(r['data']):<11} {int(r['dias']):>5} {int(r['n_pesquisas']):>6} "
+              f"{r[f'prob:{vencedor}']:>14.3f} {r['rmse']:>6.2f} {r['brier']:>7.4f} "
+              f"{r['crps_share']:>6.2f}")
+    if len(tabela):
+        print(f"\n  Winner correct on {int(tabela['winner_correct'].sum())}/{len(tabela)} days; "
+              f"mean RMSE {tabela['rmse'].mean():.2f}pp, mean Brier {tabela['brier'].mean():.4f}")
+    out_path = OUTPUT_DIR / f"replay_{year}.csv"
+    tabela.to_csv(out_path, index=False)
+    print(f"  Series saved: {out_path}")
+    print(sep)
+    return out_path
+
+
 # ─── REPORTING ────────────────────────────────────────────────────────────────
 
 def relatorio_backtesting(resultados: list[SnapshotResult]) -> None:
@@ -485,6 +1229,7 @@ def relatorio_backtesting(resultados: list[SnapshotResult]) -> None:
 
     Console output:
         - Per-snapshot table
+        - Distributional scores (CRPS, log score, PIT) per snapshot
         - Brier score per election year
         - Shy-Bolsonaro bias table (mean signed error per candidate)
         - Overall verdict vs 3pp RMSE threshold
@@ -510,6 +1255,23 @@ def relatorio_backtesting(resultados: list[SnapshotResult]) -> None:
             f"{win:>8} {run:>8}"
         )
 
+    # ── Distributional scores ─────────────────────────────────────────────────
+    print(f"\n{'─'*40}")
+    print("  DISTRIBUTIONAL SCORES  (lower CRPS / log score is better)")
+    print(f"{'─'*40}")
+    print(f"{'Year':<6} {'Snap':<6} {'CRPS shr':>9} {'CRPS mrg':>9} {'LogS pair':>10} {'PIT mrg':>8}")
+    for r in resultados:
+        print(
+            f"{r.year:<6} {r.snapshot:<6} "
+            f"{r.crps_share:>9.3f} {r.crps_margin:>9.3f} "
+            f"{r.log_score_pair:>10.3f} {r.pit_margin:>8.3f}"
+        )
+    pits = [v for r in resultados for v in r.pit_per_cand.values()]
+    if pits:
+        extremos = np.mean([(v < 0.05) or (v > 0.95) for v in pits])
+        print(f"  Share PITs outside [0.05, 0.95]: {extremos:.0%} of {len(pits)} "
+              "(≈10% if calibrated)")
+
     # ── Brier score per year ──────────────────────────────────────────────────
     print(f"\n{'─'*40}")
     print("  BRIER SCORE BY YEAR")
@@ -556,6 +1318,9 @@ def relatorio_backtesting(resultados: list[SnapshotResult]) -> None:
     for r in resultados:
         row = r._asdict()
         row["bias_per_cand"] = str(r.bias_per_cand)
+        row["crps_per_cand"] = str(r.crps_per_cand)
+        row["pit_per_cand"]  = str(r.pit_per_cand)
+        row.pop("declaracoes")
         rows.append(row)
 
     out_path = OUTPUT_DIR / "backtesting_report.csv"
@@ -563,10 +1328,110 @@ def relatorio_backtesting(resultados: list[SnapshotResult]) -> None:
     print(f"\n  Report saved: {out_path}")
 
 
+# ─── RELIABILITY ──────────────────────────────────────────────────────────────
+
+def tabela_declaracoes(resultados: list[SnapshotResult]) -> pd.DataFrame:
+    """Pools the probability statements of all snapshots into one DataFrame."""
+    linhas = [
+        {"year": r.year, "snapshot": r.snapshot, "tipo": tipo, "evento": evento, "p": p, "y": y}
+        for r in resultados
+        for tipo, evento, p, y in r.declaracoes
+    ]
+    return pd.DataFrame(linhas, columns=["year", "snapshot", "tipo", "evento", "p", "y"])
+
+
+def relatorio_confiabilidade(
+    resultados: list[SnapshotResult],
+    n_boot:     int = DEFAULT_N_BOOT,
+    semente:    int = SEMENTE_BACKTEST,
+    grafico:    Path | None = None,
+) -> pd.DataFrame:
+    """
+    Reliability table and bootstrap CIs over the pooled probability statements.
+
+    Statements from one snapshot share the same polls, so the bootstrap
+    resamples whole snapshots (cluster bootstrap). Saves
+    outputs/confiabilidade.csv with every statement and, when ``grafico``
+    is given, a reliability diagram PNG.
+
+    Returns:
+        The pooled statements (year, snapshot, tipo, evento, p, y).
+    """
+    sep = "=" * 70
+    declaracoes = tabela_declaracoes(resultados)
+    if declaracoes.empty:
+        return declaracoes
+
+    p, y = declaracoes["p"].to_numpy(), declaracoes["y"].to_numpy()
+    grupos = (declaracoes["year"] + " " + declaracoes["snapshot"]).to_numpy()
+    tabela = reliability_table(p, y)
+    metricas = bootstrap_metrics(p, y, n_boot=n_boot, groups=grupos,
+                                 rng=np.random.default_rng(semente))
+
+    print(f"\n{sep}")
+    print("  RELIABILITY OF PROBABILITY STATEMENTS")
+    print(f"  {len(declaracoes)} statements from {len(set(grupos))} snapshots "
+          f"({', '.join(f'{t}: {n}' for t, n in declaracoes['tipo'].value_counts().items())})")
+    print(sep)
+    print(f"  {'Bin':<10} {'N':>5} {'Mean p':>8} {'Observed':>9}   {'90% CI':>15}")
+    for _, linha in tabela.iterrows():
+        print(f"  {linha['faixa']:<10} {int(linha['n']):>5} {linha['p_media']:>8.3f} "
+              f"{linha['freq_observada']:>9.3f}   [{linha['ic_inf']:.2f}, {linha['ic_sup']:.2f}]")
+
+    print(f"\n  Metric        Estimate   {int(metricas.level * 100)}% CI "
+          f"(cluster bootstrap, {metricas.n_boot:,} replicates)")
+    for nome in ("brier", "log_loss", "slope"):
+        print(f"  {nome:<12} {metricas.estimate[nome]:>9.4f}   "
+              f"[{metricas.lower[nome]:.4f}, {metricas.upper[nome]:.4f}]")
+    print("  Slope < 1: over-confident; > 1: under-confident")
+    print(sep)
+
+    out_path = OUTPUT_DIR / "confiabilidade.csv"
+    declaracoes.to_csv(out_path, index=False)
+    print(f"\n  Statements saved: {out_path}")
+
+    if grafico is not None:
+        _plotar_confiabilidade(tabela, metricas, Path(grafico))
+        print(f"  Reliability diagram saved: {grafico}")
+    return declaracoes
+
+
+def _plotar_confiabilidade(tabela: pd.DataFrame, metricas, path: Path) -> None:
+    """Reliability diagram: observed frequency vs mean stated probability per bin."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    ax.plot([0, 1], [0, 1], color="#999999", linestyle="--", linewidth=1)
+    ax.errorbar(
+        tabela["p_media"], tabela["freq_observada"],
+        yerr=[tabela["freq_observada"] - tabela["ic_inf"], tabela["ic_sup"] - tabela["freq_observada"]],
+        fmt="o", color="#1f77b4", capsize=3,
+    )
+    for _, linha in tabela.iterrows():
+        ax.annotate(str(int(linha["n"])), (linha["p_media"], linha["freq_observada"]),
+                    textcoords="offset points", xytext=(6, -10), fontsize=8)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.set_xlabel("Stated probability")
+    ax.set_ylabel("Observed frequency")
+    ax.set_title(
+        f"Backtest reliability — Brier {metricas.estimate['brier']:.3f}, "
+        f"slope {metricas.estimate['slope']:.2f} "
+        f"[{metricas.lower['slope']:.2f}, {metricas.upper['slope']:.2f}]",
+        fontsize=10,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
 # ─── CLI ──────────────────────────────────────────────────────────────────────
 
-def _parse_args() -> argparse.Namespace:
+def _parse_args(argv: list[str] | None = None, prog: str | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
+        prog=prog,
         description="Backtesting module — brazil-election-montecarlo v2.9",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -574,6 +1439,14 @@ Examples:
   python src/backtesting.py
   python src/backtesting.py --year 2022
   python src/backtesting.py --year 2018 --n-sim 200000
+  python src/backtesting.py --n-sim auto --target-se 0.001
+  python src/backtesting.py --n-sim 200000 --workers 4
+  python src/backtesting.py --calibrate --objective rmse
+  python src/backtesting.py --build-error-bank
+  python src/backtesting.py --build-archive
+  python src/backtesting.py --reliability-plot
+  python src/backtesting.py --replay --year 2022
+  python src/backtesting.py --replay data/arquivo_2022.csv --year 2022
         """,
     )
     parser.add_argument(
@@ -584,28 +1457,159 @@ Examples:
     )
     parser.add_argument(
         "--n-sim",
-        type=int,
+        type=n_sim_arg,
         default=N_SIM_BACKTEST,
+        metavar="N|auto",
+        help=f"Monte Carlo iterations per snapshot (default: {N_SIM_BACKTEST}); "
+             "'auto' samples each snapshot until win probabilities reach --target-se",
+    )
+    parser.add_argument(
+        "--sampling",
+        choices=METODOS_AMOSTRAGEM,
+        default="random",
+        help="Dirichlet sampling back-end (sobol/antithetic need fewer draws; default: random)",
+    )
+    parser.add_argument(
+        "--target-se",
+        type=float,
+        default=DEFAULT_TARGET_SE,
+        metavar="SE",
+        help=f"Target Monte Carlo standard error for --n-sim auto (default: {DEFAULT_TARGET_SE})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
         metavar="N",
-        help=f"Monte Carlo iterations per snapshot (default: {N_SIM_BACKTEST})",
+        help="Processes running snapshots in parallel (default: one per CPU; 1 = serial)",
     )
-    return parser.parse_args()
-
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=SEMENTE_BACKTEST,
+        help=f"Base seed; each snapshot derives its own stream (default: {SEMENTE_BACKTEST})",
+    )
+    parser.add_argument(
+        "--calibrate",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="GRID_JSON",
+        help="Successive-halving search of tau, outlier threshold, blank fraction and "
+             "DESVIO scale against all snapshots; optional JSON grid "
+             "{param: [values]} (default: GRADE_CALIBRACAO). --n-sim sets the last "
+             "round's draws per snapshot.",
+    )
+    parser.add_argument(
+        "--objective",
+        choices=OBJETIVOS,
+        default="rmse",
+        help="Metric minimised by --calibrate (default: rmse)",
+    )
+    parser.add_argument(
+        "--build-error-bank",
+        nargs="?",
+        const=str(BANCO_ERROS_PATH),
+        default=None,
+        metavar="NPZ",
+        help="Build the empirical poll-error bank used by simulation_v2 --empirical-error "
+             f"and exit (default path: {BANCO_ERROS_PATH.relative_to(ROOT_DIR)})",
+    )
+    parser.add_argument(
+        "--build-archive",
+        nargs="?",
+        const=str(ARQUIVO_PATH),
+        default=None,
+        metavar="SQLITE",
+        help="Ingest data/historico/*.csv into the indexed poll archive and exit "
+             f"(default path: {ARQUIVO_PATH.relative_to(ROOT_DIR)})",
+    )
+    parser.add_argument(
+        "--replay",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="ARCHIVE_CSV",
+        help="Daily rolling-origin replay of the campaign: one forecast per day with the "
+             "polls published up to it; optional full poll archive (needs --year; "
+             "default: union of the year's snapshot CSVs)",
+    )
+    parser.add_argument(
+        "--n-boot",
+        type=int,
+        default=DEFAULT_N_BOOT,
+        metavar="B",
+        help=f"Bootstrap replicates for the reliability metrics (default: {DEFAULT_N_BOOT})",
+    )
+    parser.add_argument(
+        "--reliability-plot",
+        nargs="?",
+        const=str(OUTPUT_DIR / "confiabilidade.png"),
+        default=None,
+        metavar="PNG",
+        help="Also draw the reliability diagram "
+             "(default path: outputs/confiabilidade.png)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
+    """Entry point for CLI execution (also ``python -m src backtest``)."""
+    args = _parse_args(argv, prog)
+    if args.build_archive:
+        arquivo = PollArchive.from_csvs(DATA_DIR, NAME_ALIASES)
+        arquivo.save(args.build_archive)
+        print(f"Poll archive saved: {args.build_archive} ({len(arquivo)} rows, "
+              f"{len(arquivo.windows)} snapshots, elections {', '.join(arquivo.elections)})")
+        return
+
+    if args.build_error_bank:
+        banco = construir_banco_erros(Path(args.build_error_bank))
+        print(f"Error bank saved: {args.build_error_bank} ({len(banco.dias)} snapshots)")
+        for rotulo, d, e in zip(banco.rotulos, banco.dias, banco.erros):
+            detalhe = "  ".join(f"#{i + 1} {x:+.2f}pp" for i, x in enumerate(e))
+            print(f"  {rotulo:<10} {int(d):>3}d  {detalhe}")
+        return
+
+    if args.calibrate is not None:
+        if args.n_sim == "auto":
+            sys.exit("--calibrate needs a fixed --n-sim (draws in the last round)")
+        grade = json.loads(Path(args.calibrate).read_text(encoding="utf-8")) if args.calibrate else None
+        tabela = calibrar(grade, year=args.year, objetivo=args.objective, n_max=args.n_sim,
+                          workers=args.workers, semente=args.seed)
+        relatorio_calibracao(tabela, args.objective)
+        return
+
+    if args.replay is not None:
+        if args.n_sim == "auto":
+            sys.exit("--replay needs a fixed --n-sim (draws per forecast state)")
+        if args.replay and args.year is None:
+            sys.exit("--replay ARCHIVE_CSV needs --year")
+        for year in [args.year] if args.year else list(GROUND_TRUTH):
+            arquivo = carregar_arquivo(year, Path(args.replay) if args.replay else None)
+            tabela = replay_campanha(year, arquivo, n_sim=args.n_sim, semente=args.seed)
+            relatorio_replay(tabela, year)
+        return
 
-def main() -> None:
-    """Entry point for CLI execution."""
-    args = _parse_args()
     print(f"\nbrazil-election-montecarlo — backtesting v2.9")
     print(f"  Year filter : {args.year or 'all'}")
-    print(f"  N_SIM       : {args.n_sim:,}\n")
+    if args.n_sim == "auto":
+        print(f"  N_SIM       : auto (target SE {args.target_se})\n")
+    else:
+        print(f"  N_SIM       : {args.n_sim:,}\n")
 
-    resultados = backtest_completo(year=args.year, n_sim=args.n_sim)
+    resultados = backtest_completo(
+        year=args.year, n_sim=args.n_sim, target_se=args.target_se, metodo=args.sampling,
+        workers=args.workers, semente=args.seed,
+    )
 
     if not resultados:
         print("No snapshots processed. Add historical CSV files to data/historico/")
-        sys.exit(0)
+        return
 
     relatorio_backtesting(resultados)
+    relatorio_confiabilidade(resultados, n_boot=args.n_boot, semente=args.seed,
+                             grafico=args.reliability_plot)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+# src/core/adaptive.py
+"""
+Adaptive sample size: draw until tracked probabilities reach a target error.
+
+A fixed ``--n-sim`` forces a guess.  40k draws are wasteful for a race whose
+tracked probabilities are all near 0 or 1, and too few for a tail market
+near 5%.  ``sample_until()`` instead draws in growing chunks and stops as
+soon as every tracked frequency has a Monte Carlo standard error at or below
+``target_se``.
+
+Callers supply two callables:
+
+- ``sampler(n)`` draws ``n`` samples and returns one chunk (any object —
+  usually the dict of arrays an ``amostrar_*`` function returns);
+- ``counter(chunk)`` returns ``{name: count}`` of "successes" in the chunk
+  for every tracked quantity (win per candidate, second round, margin above
+  each named threshold, ...).
+
+The stopping rule uses the conservative estimate ``p~ = (k + 1) / (n + 2)``
+so that a tracked probability with zero observed successes does not report
+SE = 0 after the first chunk.  After each chunk the remaining draws needed are
+projected from the worst quantity (``n = p~ (1 - p~) / target_se²``), capped
+at ``growth`` times the current total so a noisy early estimate cannot
+overshoot by much.
+
+Chunks are returned unchanged; concatenating them is the caller's job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+DEFAULT_TARGET_SE = 0.002
+DEFAULT_INITIAL = 5_000
+DEFAULT_MAX = 5_000_000
+DEFAULT_GROWTH = 4.0
+
+
+@dataclass
+class AdaptiveRun:
+    """
+    Outcome of sample_until().
+
+    Fields
+    ------
+    chunks : list
+        Sampler outputs in draw order.
+    n_sim : int
+        Total draws.
+    counts : dict[str, int]
+        Accumulated success count per tracked quantity.
+    max_se : float
+        Largest conservative standard error when sampling stopped.
+    worst : str
+        Name of the quantity with that error.
+    converged : bool
+        False when ``n_max`` was reached before ``target_se``.
+    history : list[tuple[int, float]]
+        ``(n_sim, max_se)`` after each chunk.
+    """
+
+    chunks: list
+    n_sim: int
+    counts: dict[str, int]
+    max_se: float
+    worst: str
+    converged: bool
+    history: list[tuple[int, float]] = field(default_factory=list)
+
+    def prob(self, name: str) -> float:
+        """Plain frequency ``k / n`` of a tracked quantity."""
+        return self.counts[name] / self.n_sim
+
+
+def conservative_se(k: int, n: int) -> float:
+    """Standard error using ``p~ = (k + 1) / (n + 2)``."""
+    p = (k + 1) / (n + 2)
+    return math.sqrt(p * (1.0 - p) / n)
+
+
+def sample_until(
+    sampler: Callable[[int], Any],
+    counter: Callable[[Any], dict[str, int]],
+    target_se: float = DEFAULT_TARGET_SE,
+    n_initial: int = DEFAULT_INITIAL,
+    n_max: int = DEFAULT_MAX,
+    growth: float = DEFAULT_GROWTH,
+    verbose: bool = True,
+) -> AdaptiveRun:
+    """
+    Draws chunks until every tracked frequency has SE <= ``target_se``.
+
+    Args:
+        sampler:   ``sampler(n)`` → chunk of ``n`` draws.
+        counter:   ``counter(chunk)`` → ``{name: successes}``.
+        target_se: Target standard error on the probability scale (0–1).
+        n_initial: Size of the first chunk (also the smallest chunk).
+        n_max:     Hard cap on total draws.
+        growth:    Maximum factor by which the total may grow per step.
+        verbose:   Print one progress line per chunk.
+
+    Returns:
+        AdaptiveRun
+    """
+    if target_se <= 0:
+        raise ValueError(f"target_se must be positive, got {target_se}")
+    if growth <= 1.0:
+        raise ValueError(f"growth must be > 1, got {growth}")
+
+    chunks: list = []
+    counts: dict[str, int] = {}
+    history: list[tuple[int, float]] = []
+    n = 0
+    passo = min(n_initial, n_max)
+
+    while True:
+        chunk = sampler(passo)
+        chunks.append(chunk)
+        n += passo
+        for name, k in counter(chunk).items():
+            counts[name] = counts.get(name, 0) + int(k)
+
+        worst, max_se = max(
+            ((name, conservative_se(k, n)) for name, k in counts.items()),
+            key=lambda item: item[1],
+        )
+        history.append((n, max_se))
+        if verbose:
+            print(f"    [auto] n={n:>10,}  max SE={max_se:.5f} ({worst})")
+
+        if max_se <= target_se:
+            return AdaptiveRun(chunks, n, counts, max_se, worst, True, history)
+        if n >= n_max:
+            if verbose:
+                print(f"    [auto] n_max={n_max:,} reached before target SE {target_se}")
+            return AdaptiveRun(chunks, n, counts, max_se, worst, False, history)
+
+        p = (counts[worst] + 1) / (n + 2)
+        necessario = math.ceil(p * (1.0 - p) / target_se ** 2 * 1.05)
+        passo = max(necessario - n, n_initial)
+        passo = min(passo, int(n * (growth - 1.0)), n_max - n)
+
+
+def n_sim_arg(value: str) -> int | str:
+    """argparse ``type=`` for ``--n-sim``: a positive integer or ``auto``."""
+    if value.strip().lower() == "auto":
+        return "auto"
+    try:
+        n = int(value.replace("_", ""))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer or 'auto', got '{value}'")
+    if n <= 0:
+        raise argparse.ArgumentTypeError(f"--n-sim must be positive, got {n}")
+    return n
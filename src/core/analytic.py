@@ -0,0 +1,169 @@
+# src/core/analytic.py
+"""
+Closed-form preview of the first-round probabilities.
+
+Before the ceiling, valid shares are exactly ``Dirichlet(alpha_valid)``
+(blank/null removal is the aggregation property), so each candidate's share
+is ``Beta(a_i, A_v − a_i)`` and every pair has known means and covariance:
+
+    μ_i = a_i / A_v,     Σ_ij = (δ_ij μ_i − μ_i μ_j) / (A_v + 1)
+
+From there:
+
+- **majority** — a share clipped at ``c_i`` and renormalised becomes
+  ``c_i / (c_i + 1 − v_i)``, which exceeds 1/2 exactly when
+  ``v_i > 1 − c_i``.  So the majority event is ``v_i > max(1/2, 1 − c_i)``,
+  a Beta survival function — exact up to the (negligible) case where
+  another candidate is clipped in the same draw.
+- **p2t** — ``1 − Σ_i P(majority_i)`` (majorities are mutually exclusive).
+- **pairwise leads** — renormalisation is a common scale factor, so the
+  order of two candidates after the ceiling is the order of
+  ``min(v_i, c_i)`` and ``min(v_j, c_j)``.  The difference is taken as
+  normal with the Dirichlet moments, the means clipped at the ceilings.
+- **win / top-two** — products of pairwise lead probabilities, normalised
+  to sum to one.  This treats the pairwise events as independent, which is
+  the main approximation; it is accurate when one or two candidates carry
+  the race, which is the usual situation.
+
+Everything runs in well under a millisecond for any number of candidates,
+which makes it suitable for live previews; Monte Carlo remains the reference.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .config import PollData
+from .simulation import DEFAULT_BLANK_FRACTION, dirichlet_alphas, redistribute_undecided, valid_mask
+
+
+@dataclass
+class AnalyticPreview:
+    """
+    Approximate first-round probabilities.
+
+    Fields
+    ------
+    candidates : list[str]
+        Valid candidate names.
+    mean, sd : np.ndarray
+        Ceiling-free valid-share mean and standard deviation (%).
+    win_prob : dict[str, float]
+        P(finishes first).
+    majority_prob : dict[str, float]
+        P(outright first-round majority).
+    p2t : float
+        P(second round).
+    top2_prob : dict[tuple[str, str], float]
+        P({a, b} are the two most voted), keys ordered as in ``candidates``.
+    """
+
+    candidates: list[str]
+    mean: np.ndarray
+    sd: np.ndarray
+    win_prob: dict[str, float]
+    majority_prob: dict[str, float]
+    p2t: float
+    top2_prob: dict[tuple[str, str], float]
+
+
+def _norm_cdf(z: np.ndarray) -> np.ndarray:
+    from scipy.special import ndtr
+
+    return ndtr(z)
+
+
+def lead_matrix(mu: np.ndarray, cov: np.ndarray, ceilings: np.ndarray) -> np.ndarray:
+    """
+    (V, V) normal approximation of P(candidate i ahead of j) after the ceiling.
+
+    The diagonal is 1 by convention so row products skip it.
+    """
+    m = np.minimum(mu, ceilings)
+    var = np.diag(cov)[:, np.newaxis] + np.diag(cov)[np.newaxis, :] - 2.0 * cov
+    sd = np.sqrt(np.maximum(var, 1e-18))
+    lead = _norm_cdf((m[:, np.newaxis] - m[np.newaxis, :]) / sd)
+    np.fill_diagonal(lead, 1.0)
+    return lead
+
+
+def preview_from_alphas(
+    alphas_valid: np.ndarray,
+    ceilings: np.ndarray,
+    candidates: list[str],
+) -> AnalyticPreview:
+    """
+    Analytic probabilities from valid-candidate Dirichlet parameters.
+
+    Args:
+        alphas_valid: (V,) Dirichlet parameters of the valid candidates.
+        ceilings:     (V,) ceilings as fractions (``(100 − rejection) / 100``).
+        candidates:   Valid candidate names.
+
+    Returns:
+        AnalyticPreview
+    """
+    from scipy.special import betainc
+
+    a = np.asarray(alphas_valid, dtype=float)
+    c = np.asarray(ceilings, dtype=float)
+    total = a.sum()
+    mu = a / total
+    cov = (np.diag(mu) - np.outer(mu, mu)) / (total + 1.0)
+
+    maioria = 1.0 - betainc(a, total - a, np.maximum(0.5, 1.0 - c))
+    p2t = float(np.clip(1.0 - maioria.sum(), 0.0, 1.0))
+
+    lead = lead_matrix(mu, cov, c)
+    win = lead.prod(axis=1)
+    win = win / win.sum()
+
+    v = len(a)
+    pares = {}
+    for i in range(v):
+        for j in range(i + 1, v):
+            outros = [k for k in range(v) if k not in (i, j)]
+            pares[(candidates[i], candidates[j])] = float(
+                lead[i, outros].prod() * lead[j, outros].prod()
+            )
+    soma = sum(pares.values())
+    if soma > 0:
+        pares = {k: p / soma for k, p in pares.items()}
+
+    return AnalyticPreview(
+        candidates=list(candidates),
+        mean=mu * 100,
+        sd=np.sqrt(np.diag(cov)) * 100,
+        win_prob={cand: float(p) for cand, p in zip(candidates, win)},
+        majority_prob={cand: float(p) for cand, p in zip(candidates, maioria)},
+        p2t=p2t,
+        top2_prob=pares,
+    )
+
+
+def preview(
+    poll: PollData,
+    desvio: float | None = None,
+    blank_fraction: float = DEFAULT_BLANK_FRACTION,
+) -> AnalyticPreview:
+    """
+    Analytic preview for aggregated polls (undecided redistribution included).
+
+    Args:
+        poll:           Aggregated polls.
+        desvio:         Noise term; ``poll.desvio_base`` when None.
+        blank_fraction: Undecided fraction sent to blank/null.
+    """
+    mask = valid_mask(poll.candidatos)
+    votos = redistribute_undecided(
+        poll.votos_media[np.newaxis], poll.rejeicao[np.newaxis],
+        [poll.indecisos], [blank_fraction], mask,
+    )
+    alphas = dirichlet_alphas(votos, [poll.desvio_base if desvio is None else desvio])[0]
+    return preview_from_alphas(
+        alphas[mask],
+        (100.0 - poll.rejeicao[mask]) / 100.0,
+        [c for c, ok in zip(poll.candidatos, mask) if ok],
+    )
@@ -16,10 +16,14 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 
+if TYPE_CHECKING:  # annotation only — keeps this module free of core imports
+    from src.core.summary import SummaryStats
+
 
 # ---------------------------------------------------------------------------
 # Input contract
@@ -57,7 +61,8 @@ class SimulationConfig:
             {"Lula": {"votos_media": 35.0, "rejeicao": 40.0}}
 
         Used by the backtesting module to inject ground-truth snapshots and
-        by the CLI ``--scenario`` flag for what-if analysis.
+        by the CLI ``--scenario`` flag for what-if analysis.  Lists of such
+        dicts are evaluated in one batched run by ``src.core.sweep.run_sweep``.
     election_date : date
         First-round election date.  Temporal weighting in the aggregator uses
         this to anchor the decay curve.  Default is 2026-10-04.
@@ -202,6 +207,12 @@ class SimulationResult:
         The config that produced this result.  ``None`` only when constructing
         result objects in tests without a full config.  Production code always
         sets this field.
+    summary : SummaryStats | None
+        Precomputed summary block from ``src.core.summary.compute_summary``:
+        quantiles, win/pair frequencies and margin-threshold counts computed
+        in a single pass.  Producers fill it once so that ``relatorio()``,
+        the dashboard and ``polymarket_edge()`` all read the same numbers.
+        ``None`` when the producer did not compute it.
     """
 
     df1: pd.DataFrame
@@ -215,6 +226,7 @@ class SimulationResult:
     margins: np.ndarray
     timestamp: datetime = field(default_factory=datetime.utcnow)
     config: SimulationConfig | None = None
+    summary: SummaryStats | None = field(default=None, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         if not (0.0 <= self.p2t <= 1.0):
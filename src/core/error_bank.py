@@ -0,0 +1,139 @@
+# src/core/error_bank.py
+"""
+Bank of historical poll-vs-result errors, applied to draws at sampling time.
+
+The Dirichlet noise term is symmetric around the poll average, while real
+polls miss in structured ways (2018 and 2022 both under-polled the
+right-wing finalist).  The backtests in src/backtesting.py measure those
+misses; this module stores them once and replays them in live forecasts.
+
+Each record is one historical snapshot:
+
+    dias   — days between the snapshot and election day
+    erros  — ``result − poll`` (pp of valid votes) for the poll's 1st, 2nd,
+             ... placed candidates
+
+Errors are indexed by poll rank rather than by name because candidates do
+not carry over between elections.  At sampling time every draw picks one
+record — with probability decaying in ``|dias − days_to_election|`` so a
+forecast three months out replays three-month-out errors, with the decay
+widened when needed so that no single record dominates — and the record's
+errors are added to the candidates holding the same poll ranks.  Shares are
+then clipped at zero and renormalised, which spreads the net error over the
+remaining candidates.  Selection is a vectorised gather (inverse CDF of the
+record weights at one uniform per draw), so it costs almost nothing and can
+be driven by stored uniforms for reproducible pools.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+DEFAULT_TAU_DIAS = 14.0
+DEFAULT_ESS_MIN = 3.0
+_PISO = 0.01
+
+
+@dataclass
+class ErrorBank:
+    """
+    Historical errors by poll rank.
+
+    Fields
+    ------
+    dias : np.ndarray
+        (M,) days to election of each record.
+    erros : np.ndarray
+        (M, R) ``result − poll`` in pp of valid votes; column r is the
+        candidate placed r-th in that snapshot's polls.
+    rotulos : list[str]
+        Record labels, e.g. "2022 T-14".
+    """
+
+    dias: np.ndarray
+    erros: np.ndarray
+    rotulos: list[str]
+
+    @property
+    def ranks(self) -> int:
+        return self.erros.shape[1]
+
+    def weights(
+        self,
+        dias: float,
+        tau: float = DEFAULT_TAU_DIAS,
+        ess_min: float = DEFAULT_ESS_MIN,
+    ) -> np.ndarray:
+        """
+        (M,) record probabilities ``∝ exp(−|dias_m − dias| / tau)``.
+
+        Far from the bank's horizons the nearest record would take almost all
+        the weight, so ``tau`` is widened in 25% steps until the Kish effective
+        number of records, ``(Σw)² / Σw²``, reaches ``min(ess_min, M)``.
+        """
+        alvo = min(float(ess_min), len(self.dias))
+        distancia = np.abs(self.dias - float(dias))
+        for _ in range(200):
+            w = np.exp(-(distancia - distancia.min()) / tau)
+            w /= w.sum()
+            if 1.0 / np.sum(w**2) >= alvo * (1 - 1e-9):
+                break
+            tau *= 1.25
+        return w
+
+    def gather(
+        self,
+        u: np.ndarray,
+        dias: float,
+        tau: float = DEFAULT_TAU_DIAS,
+        ess_min: float = DEFAULT_ESS_MIN,
+    ) -> np.ndarray:
+        """(n, R) errors for uniforms ``u`` (n,), one record per draw."""
+        acumulado = np.cumsum(self.weights(dias, tau, ess_min))
+        acumulado[-1] = 1.0
+        idx = np.searchsorted(acumulado, np.asarray(u, dtype=float), side="right")
+        return self.erros[np.minimum(idx, len(self.erros) - 1)]
+
+    def sample(
+        self,
+        n: int,
+        dias: float,
+        tau: float = DEFAULT_TAU_DIAS,
+        rng: np.random.Generator | None = None,
+        ess_min: float = DEFAULT_ESS_MIN,
+    ) -> np.ndarray:
+        """(n, R) errors drawn with ``rng`` (legacy ``np.random`` when None)."""
+        u = rng.random(n) if rng is not None else np.random.random_sample(n)
+        return self.gather(u, dias, tau, ess_min)
+
+    def save(self, path) -> None:
+        np.savez_compressed(path, dias=self.dias, erros=self.erros, rotulos=np.array(self.rotulos))
+
+    @classmethod
+    def load(cls, path) -> "ErrorBank":
+        with np.load(path) as f:
+            return cls(f["dias"].astype(float), f["erros"].astype(float),
+                       [str(r) for r in f["rotulos"]])
+
+
+def apply_errors(validos: np.ndarray, erros: np.ndarray, ordem) -> np.ndarray:
+    """
+    Adds rank errors to valid shares and renormalises to 100.
+
+    Args:
+        validos: (n, V) valid shares (%).
+        erros:   (n, R) errors from ``ErrorBank.gather``/``sample``.
+        ordem:   Column of ``validos`` holding poll rank 0, 1, ...; ranks
+                 beyond ``len(ordem)`` or ``R`` get no error.
+
+    Returns:
+        (n, V) shares (%) summing to 100 per row.
+    """
+    out = np.array(validos, dtype=float)
+    r = min(len(ordem), erros.shape[1])
+    out[:, list(ordem)[:r]] += erros[:, :r]
+    out = np.maximum(out, _PISO)
+    return out / out.sum(axis=1, keepdims=True) * 100.0
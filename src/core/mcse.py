@@ -0,0 +1,203 @@
+# src/core/mcse.py
+"""
+Monte Carlo standard errors for simulated probabilities and quantiles.
+
+Every probability the model reports is a frequency ``k / n`` over ``n``
+independent draws, so its simulation noise follows directly from the counts:
+
+- standard error ``sqrt(p (1 - p) / n)``;
+- Wilson score interval (default) — well behaved near 0 and 1, where the
+  tail markets live and the Wald interval collapses to zero width;
+- Jeffreys Beta interval, ``Beta(k + 1/2, n - k + 1/2)`` quantiles, as an
+  alternative when scipy is available.
+
+Quantiles have no closed-form count-based error, so they use batch means:
+the draws are split into ``B`` contiguous batches, the quantile is computed
+per batch, and the standard error is ``std(batch quantiles) / sqrt(B)``.
+
+These numbers describe simulation noise only — they say how much a rerun
+with a different seed would move the estimate, not how uncertain the
+election is.  All functions accept scalars or numpy arrays of counts.
+"""
+
+from __future__ import annotations
+
+from statistics import NormalDist
+
+import numpy as np
+
+
+DEFAULT_LEVEL = 0.95
+DEFAULT_BATCHES = 20
+
+
+def z_value(level: float = DEFAULT_LEVEL) -> float:
+    """Two-sided normal critical value for a confidence ``level``."""
+    return NormalDist().inv_cdf(0.5 + level / 2.0)
+
+
+def binomial_se(k, n):
+    """Standard error of the frequency ``k / n``."""
+    k = np.asarray(k, dtype=float)
+    p = k / n
+    return np.sqrt(p * (1.0 - p) / n)
+
+
+def wilson_interval(k, n, level: float = DEFAULT_LEVEL):
+    """
+    Wilson score interval for a binomial proportion.
+
+    Args:
+        k:     Success count(s).
+        n:     Number of draws.
+        level: Confidence level.
+
+    Returns:
+        (low, high) as floats or arrays matching ``k``.
+    """
+    k = np.asarray(k, dtype=float)
+    z = z_value(level)
+    p = k / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2.0 * n)) / denom
+    half = z * np.sqrt(p * (1.0 - p) / n + z * z / (4.0 * n * n)) / denom
+    low, high = np.clip(centre - half, 0.0, 1.0), np.clip(centre + half, 0.0, 1.0)
+    if low.ndim == 0:
+        return float(low), float(high)
+    return low, high
+
+
+def beta_interval(k, n, level: float = DEFAULT_LEVEL):
+    """
+    Jeffreys interval: equal-tailed quantiles of ``Beta(k + 1/2, n - k + 1/2)``.
+
+    The lower bound is 0 when ``k == 0`` and the upper bound is 1 when
+    ``k == n``.  Requires scipy.
+    """
+    from scipy.stats import beta
+
+    k = np.asarray(k, dtype=float)
+    alpha = (1.0 - level) / 2.0
+    low = np.where(k > 0, beta.ppf(alpha, k + 0.5, n - k + 0.5), 0.0)
+    high = np.where(k < n, beta.ppf(1.0 - alpha, k + 0.5, n - k + 0.5), 1.0)
+    if low.ndim == 0:
+        return float(low), float(high)
+    return low, high
+
+
+def prob_interval(k, n, level: float = DEFAULT_LEVEL, method: str = "wilson"):
+    """Dispatches to wilson_interval() or beta_interval()."""
+    if method == "wilson":
+        return wilson_interval(k, n, level)
+    if method == "beta":
+        return beta_interval(k, n, level)
+    raise ValueError(f"Unknown interval method '{method}' (expected 'wilson' or 'beta')")
+
+
+def prob_estimate(k, n, level: float = DEFAULT_LEVEL, method: str = "wilson") -> dict:
+    """
+    Frequency, standard error and interval for one count.
+
+    Returns:
+        dict with keys p, se, low, high (all in [0, 1]).
+    """
+    low, high = prob_interval(k, n, level, method)
+    return {
+        "p":    float(k / n),
+        "se":   float(binomial_se(k, n)),
+        "low":  low,
+        "high": high,
+    }
+
+
+def batch_means_quantile_se(
+    draws: np.ndarray,
+    levels,
+    n_batches: int = DEFAULT_BATCHES,
+) -> np.ndarray:
+    """
+    Batch-means standard error of column quantiles.
+
+    Args:
+        draws:     (N,) or (N, K) array of simulated values.
+        levels:    Quantile levels in [0, 1].
+        n_batches: Number of contiguous batches.  Draws beyond the last
+                   full batch are ignored.
+
+    Returns:
+        Array of shape (K, Q) — or (Q,) for 1-D input — with NaN when there
+        are fewer than two draws per batch.
+    """
+    draws = np.asarray(draws, dtype=float)
+    squeeze = draws.ndim == 1
+    if squeeze:
+        draws = draws[:, np.newaxis]
+    levels = np.asarray(levels, dtype=float)
+    n, k = draws.shape
+    size = n // n_batches
+    if n_batches < 2 or size < 2:
+        se = np.full((k, levels.size), np.nan)
+        return se[0] if squeeze else se
+
+    batches = draws[: size * n_batches].reshape(n_batches, size, k)
+    # (Q, B, K) -> spread across batches for every (level, column)
+    per_batch = np.quantile(batches, levels, axis=1)
+    se = (per_batch.std(axis=1, ddof=1) / np.sqrt(n_batches)).T
+    return se[0] if squeeze else se
+
+
+def edge_significance(
+    k: int,
+    n: int,
+    market_prob: float,
+    level: float = DEFAULT_LEVEL,
+) -> dict:
+    """
+    Tests whether a model-vs-market edge exceeds Monte Carlo noise.
+
+    The edge is significant when ``market_prob`` lies outside the Wilson
+    interval of the model frequency ``k / n``.  ``z_score`` is the edge in
+    units of the binomial standard error (``±inf``, with the sign of the
+    edge, when the SE is zero).
+
+    Returns:
+        dict with keys mc_se, ci_low, ci_high, z_score, significant,
+        min_detectable_edge (half-width of the interval at this n).
+    """
+    p = k / n
+    se = float(binomial_se(k, n))
+    low, high = wilson_interval(k, n, level)
+    edge = p - market_prob
+    z_score = edge / se if se > 0 else (np.copysign(np.inf, edge) if edge != 0 else 0.0)
+    return {
+        "mc_se":               round(se, 6),
+        "ci_low":              round(low, 6),
+        "ci_high":             round(high, 6),
+        "z_score":             round(float(z_score), 3),
+        "significant":         bool(market_prob < low or market_prob > high),
+        "min_detectable_edge": round((high - low) / 2.0, 6),
+    }
+
+
+def edge_significance_se(
+    prob: float,
+    se: float,
+    market_prob: float,
+    level: float = DEFAULT_LEVEL,
+) -> dict:
+    """
+    edge_significance() for estimators that report a standard error directly
+    (e.g. importance sampling) rather than a count: uses ``prob ± z · se``.
+    """
+    z = z_value(level)
+    low, high = max(0.0, prob - z * se), min(1.0, prob + z * se)
+    edge = prob - market_prob
+    z_score = edge / se if se > 0 else (np.copysign(np.inf, edge) if edge != 0 else 0.0)
+    return {
+        "mc_se":               round(se, 6),
+        "ci_low":              round(low, 6),
+        "ci_high":             round(high, 6),
+        "z_score":             round(float(z_score), 3),
+        "significant":         bool(market_prob < low or market_prob > high),
+        "min_detectable_edge": round(z * se, 6),
+    }
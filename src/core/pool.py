@@ -0,0 +1,237 @@
+# src/core/pool.py
+"""
+Appendable pool of Dirichlet draws, keyed by input hash and RNG stream.
+
+Exploratory runs often go 40k → "borderline, rerun at 200k".  A fresh run
+throws the first 40k draws away.  A ``SamplePool`` instead keeps every draw
+made for one set of inputs and one seed; asking for more only generates the
+missing rows, as a deterministic continuation of the same stream:
+
+- ``random``      — a ``PCG64`` generator; ``Generator.dirichlet`` consumes
+                    the stream row by row, so 40k + 160k draws are exactly
+                    the first 200k draws of a single call.
+- ``sobol``       — one scrambled Sobol engine; later points continue the
+                    sequence (``fast_forward`` restores it after a reload).
+- ``antithetic``  — pairs ``u, 1 − u`` stored interleaved, so every even
+                    prefix is balanced; an odd request leaves the mirror
+                    row of the last pair in the pool for the next one.
+
+Auxiliary uniforms (e.g. for the abstention draw) come from a second,
+independent stream spawned from the same seed, so they extend the same way.
+
+An optional ``counter(proporcoes, aux) -> {name: count}`` is applied to the
+new rows only and accumulated, so tracked frequencies are updated
+incrementally; quantiles are recomputed from the pooled arrays.
+
+Pools are held in memory by a small LRU ``PoolRegistry`` (the dashboard) or
+saved to ``<dir>/<key>.npz`` between CLI runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .sampling import _check_method, gamma_ppf
+
+
+DEFAULT_MAX_POOLS = 8
+_EPS = 1e-12
+
+
+def pool_key(*parts) -> str:
+    """Short stable hash of arrays, strings and numbers identifying a pool."""
+    h = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, (np.ndarray, list, tuple)):
+            arr = np.asarray(part)
+            h.update(arr.dtype.str.encode())
+            h.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode())
+        else:
+            h.update(repr(part).encode())
+        h.update(b"|")
+    return h.hexdigest()[:16]
+
+
+class SamplePool:
+    """
+    Growing set of ``Dir(alphas)`` draws from one deterministic stream.
+
+    Args:
+        alphas:  Dirichlet parameters (K,).
+        method:  "random", "sobol" or "antithetic" (see src/core/sampling.py).
+        seed:    Stream seed; the same seed always yields the same rows.
+        n_aux:   Auxiliary uniforms per row, from an independent stream.
+        counter: Optional ``(proporcoes, aux) -> {name: count}`` accumulated
+                 over new rows as the pool grows.
+    """
+
+    def __init__(
+        self,
+        alphas,
+        method: str = "random",
+        seed: int = 0,
+        n_aux: int = 0,
+        counter: Callable[[np.ndarray, np.ndarray], dict] | None = None,
+    ):
+        _check_method(method)
+        self.alphas = np.asarray(alphas, dtype=float)
+        self.method = method
+        self.seed = int(seed)
+        self.n_aux = int(n_aux)
+        self.counter = counter
+        self.counts: dict[str, int] = {}
+
+        principal, auxiliar = np.random.SeedSequence(self.seed).spawn(2)
+        self._rng = np.random.Generator(np.random.PCG64(principal))
+        self._rng_aux = np.random.Generator(np.random.PCG64(auxiliar))
+        self._sobol = None
+        self._sobol_n = 0
+        if method == "sobol":
+            self._sobol = self._novo_sobol()
+
+        self._proporcoes = np.empty((0, self.alphas.size))
+        self._aux = np.empty((0, self.n_aux))
+        self._n_contado = 0
+
+    def _novo_sobol(self):
+        from scipy.stats import qmc
+
+        semente = int(np.random.SeedSequence(self.seed).generate_state(1)[0])
+        return qmc.Sobol(d=self.alphas.size, scramble=True, seed=semente)
+
+    # ── stream ────────────────────────────────────────────────────────────────
+
+    def _gerar(self, n: int) -> np.ndarray:
+        """Next ``>= n`` raw rows of the main stream."""
+        if self.method == "random":
+            return self._rng.dirichlet(self.alphas, size=n)
+        if self.method == "sobol":
+            with warnings.catch_warnings():
+                # Balance holds for the pooled total, not for each chunk
+                warnings.simplefilter("ignore", UserWarning)
+                u = self._sobol.random(n)
+            self._sobol_n += n
+        else:
+            base = self._rng.random(((n + 1) // 2, self.alphas.size))
+            u = np.empty((2 * len(base), self.alphas.size))
+            u[0::2], u[1::2] = base, 1.0 - base
+        g = gamma_ppf(np.clip(u, _EPS, 1.0 - _EPS), self.alphas)
+        return g / g.sum(axis=1, keepdims=True)
+
+    @property
+    def n(self) -> int:
+        """Rows available in the pool."""
+        return len(self._proporcoes)
+
+    def extend_to(self, n: int) -> int:
+        """
+        Grows the pool to at least ``n`` rows.
+
+        Returns:
+            Number of new rows drawn (0 when the pool was already large enough).
+        """
+        falta = int(n) - self.n
+        if falta <= 0:
+            return 0
+        novos = self._gerar(falta)
+        self._proporcoes = np.concatenate([self._proporcoes, novos])
+        self._aux = np.concatenate([self._aux, self._rng_aux.random((len(novos), self.n_aux))])
+        self._contar()
+        return len(novos)
+
+    def _contar(self) -> None:
+        """Adds the counts of rows not yet seen by ``counter``."""
+        if self.counter is None or self._n_contado >= self.n:
+            return
+        inicio = self._n_contado
+        novos = self.counter(self._proporcoes[inicio:], self._aux[inicio:])
+        for nome, k in novos.items():
+            self.counts[nome] = self.counts.get(nome, 0) + int(k)
+        self._n_contado = self.n
+
+    def take(self, n: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        First ``n`` rows (all when None), growing the pool if needed.
+
+        Returns:
+            (proporcoes (n, K), aux (n, n_aux))
+        """
+        n = self.n if n is None else int(n)
+        self.extend_to(n)
+        return self._proporcoes[:n], self._aux[:n]
+
+    # ── persistence ───────────────────────────────────────────────────────────
+
+    def save(self, path) -> None:
+        """Writes rows and stream states to an ``.npz`` file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        estado = {
+            "method": self.method,
+            "seed": self.seed,
+            "rng": self._rng.bit_generator.state,
+            "rng_aux": self._rng_aux.bit_generator.state,
+            "sobol_n": self._sobol_n,
+        }
+        np.savez_compressed(
+            path,
+            proporcoes=self._proporcoes,
+            aux=self._aux,
+            alphas=self.alphas,
+            estado=np.array(json.dumps(estado)),
+        )
+
+    @classmethod
+    def load(cls, path, counter=None) -> "SamplePool":
+        """Restores a pool saved by ``save``; the stream continues where it stopped."""
+        with np.load(path) as f:
+            estado = json.loads(str(f["estado"]))
+            pool = cls(f["alphas"], estado["method"], estado["seed"],
+                       f["aux"].shape[1], counter)
+            pool._proporcoes = f["proporcoes"]
+            pool._aux = f["aux"]
+        pool._rng.bit_generator.state = estado["rng"]
+        pool._rng_aux.bit_generator.state = estado["rng_aux"]
+        if pool._sobol is not None:
+            pool._sobol.fast_forward(estado["sobol_n"])
+            pool._sobol_n = estado["sobol_n"]
+        pool._contar()
+        return pool
+
+
+class PoolRegistry:
+    """
+    In-memory LRU of ``SamplePool`` objects keyed by ``pool_key``.
+
+    Args:
+        max_pools: Pools kept; the least recently used one is dropped first.
+    """
+
+    def __init__(self, max_pools: int = DEFAULT_MAX_POOLS):
+        self.max_pools = max_pools
+        self._pools: OrderedDict[str, SamplePool] = OrderedDict()
+
+    def get(self, key: str, factory: Callable[[], SamplePool]) -> SamplePool:
+        """Pool stored under ``key``, created by ``factory()`` when missing."""
+        if key in self._pools:
+            self._pools.move_to_end(key)
+            return self._pools[key]
+        pool = factory()
+        self._pools[key] = pool
+        while len(self._pools) > self.max_pools:
+            self._pools.popitem(last=False)
+        return pool
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+    def clear(self) -> None:
+        self._pools.clear()
+
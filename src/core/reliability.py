@@ -0,0 +1,215 @@
+# src/core/reliability.py
+"""
+Reliability analysis of pooled probability statements.
+
+Every backtest snapshot makes many probability statements — "Lula wins with
+0.83", "Lula × Bolsonaro is the runoff with 0.97", "margin above 5pp with
+0.41" — each later resolved to 0 or 1.  Pooling them gives enough points to
+ask whether the stated probabilities are calibrated:
+
+- **reliability table** — statements binned by stated probability; in a
+  calibrated model the observed frequency in each bin matches the mean
+  stated probability (the reliability diagram plots one against the other);
+- **Brier score** and **log-loss** — proper scores of the whole set;
+- **calibration slope** — ``b`` in the logistic fit
+  ``logit P(y = 1) = a + b · logit(p)``; 1 is calibrated, below 1 means
+  over-confident (probabilities too extreme), above 1 under-confident.
+
+Uncertainty comes from the bootstrap, done as one array operation: each of
+``B`` replicates is a row of multinomial resampling counts, used as weights,
+so all metrics — including the logistic fit, by a vectorised Newton solve of
+the 2×2 normal equations — are computed for all replicates at once.  With
+``groups`` the counts are drawn per group (e.g. per snapshot) and broadcast
+to the group's statements, a cluster bootstrap that respects the correlation
+between statements made from the same polls.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .mcse import wilson_interval
+
+
+DEFAULT_N_BOOT = 10_000
+DEFAULT_BINS = 10
+DEFAULT_EPS = 1e-4
+_NEWTON_STEPS = 50
+_MAX_STEP = 1.0
+_RIDGE = 1e-6
+
+
+@dataclass
+class BootstrapMetrics:
+    """
+    Point estimates and bootstrap intervals.
+
+    Fields
+    ------
+    estimate : dict[str, float]
+        brier, log_loss, slope, intercept on the observed statements.
+    lower, upper : dict[str, float]
+        Percentile interval bounds per metric.
+    level : float
+        Interval coverage.
+    n_boot : int
+        Replicates.
+    """
+
+    estimate: dict[str, float]
+    lower: dict[str, float]
+    upper: dict[str, float]
+    level: float
+    n_boot: int
+
+    def table(self) -> pd.DataFrame:
+        return pd.DataFrame({"estimativa": self.estimate, "ic_inf": self.lower, "ic_sup": self.upper})
+
+
+def _logit(p: np.ndarray, eps: float) -> np.ndarray:
+    p = np.clip(p, eps, 1.0 - eps)
+    return np.log(p) - np.log1p(-p)
+
+
+def weighted_metrics(
+    p: np.ndarray,
+    y: np.ndarray,
+    w: np.ndarray,
+    eps: float = DEFAULT_EPS,
+) -> dict[str, np.ndarray]:
+    """
+    Brier, log-loss and logistic calibration fit under weights ``w``.
+
+    Args:
+        p: (N,) stated probabilities.
+        y: (N,) outcomes in {0, 1}.
+        w: (N,) or (B, N) non-negative weights; each row is one replicate.
+        eps: Clip applied to ``p`` before logs.
+
+    Returns:
+        dict of arrays with shape ``w.shape[:-1]``: brier, log_loss, slope, intercept.
+    """
+    p = np.asarray(p, dtype=float)
+    y = np.asarray(y, dtype=float)
+    w = np.asarray(w, dtype=float)
+    total = w.sum(axis=-1)
+    pc = np.clip(p, eps, 1.0 - eps)
+
+    brier = (w * (p - y) ** 2).sum(axis=-1) / total
+    log_loss = -(w * (y * np.log(pc) + (1 - y) * np.log1p(-pc))).sum(axis=-1) / total
+
+    # Logistic fit y ~ a + b·x by Newton, vectorised over replicates.  Steps
+    # are capped: from b = 1 the full step overshoots badly when many
+    # statements sit at p ≈ 0 or 1, and a (quasi-)separable replicate then
+    # drifts slowly instead of overflowing.
+    x = _logit(p, eps)
+    a = np.zeros(w.shape[:-1])
+    b = np.ones(w.shape[:-1])
+    for _ in range(_NEWTON_STEPS):
+        eta = a[..., np.newaxis] + b[..., np.newaxis] * x
+        mu = 1.0 / (1.0 + np.exp(-np.clip(eta, -30, 30)))
+        r = w * (y - mu)
+        s = w * mu * (1.0 - mu)
+        ga, gb = r.sum(axis=-1), (r * x).sum(axis=-1)
+        haa = s.sum(axis=-1) + _RIDGE
+        hab = (s * x).sum(axis=-1)
+        hbb = (s * x * x).sum(axis=-1) + _RIDGE
+        det = haa * hbb - hab ** 2
+        da = (hbb * ga - hab * gb) / det
+        db = (haa * gb - hab * ga) / det
+        passo = np.minimum(1.0, _MAX_STEP / np.maximum(np.abs(da), np.abs(db)).clip(1e-300))
+        da, db = da * passo, db * passo
+        a, b = a + da, b + db
+        if np.all(np.abs(da) + np.abs(db) < 1e-10):
+            break
+    return {"brier": brier, "log_loss": log_loss, "slope": b, "intercept": a}
+
+
+def bootstrap_weights(
+    n: int,
+    n_boot: int = DEFAULT_N_BOOT,
+    groups: np.ndarray | None = None,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    (n_boot, n) resampling counts; with ``groups`` whole groups are resampled.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    if groups is None:
+        return rng.multinomial(n, np.full(n, 1.0 / n), size=n_boot).astype(float)
+    _, codigo = np.unique(np.asarray(groups), return_inverse=True)
+    g = codigo.max() + 1
+    contagem = rng.multinomial(g, np.full(g, 1.0 / g), size=n_boot).astype(float)
+    return contagem[:, codigo]
+
+
+def bootstrap_metrics(
+    p: np.ndarray,
+    y: np.ndarray,
+    n_boot: int = DEFAULT_N_BOOT,
+    level: float = 0.90,
+    groups: np.ndarray | None = None,
+    eps: float = DEFAULT_EPS,
+    rng: np.random.Generator | None = None,
+) -> BootstrapMetrics:
+    """
+    Brier, log-loss and calibration slope with percentile bootstrap intervals.
+
+    Args:
+        p, y:   Stated probabilities and outcomes.
+        n_boot: Bootstrap replicates (all computed in one array operation).
+        level:  Interval coverage.
+        groups: Optional cluster labels (e.g. snapshot) for a cluster bootstrap.
+        eps:    Probability clip for log-loss and the logistic fit.
+        rng:    numpy Generator.
+    """
+    p = np.asarray(p, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ponto = weighted_metrics(p, y, np.ones_like(p), eps)
+    reps = weighted_metrics(p, y, bootstrap_weights(len(p), n_boot, groups, rng), eps)
+    alfa = (1.0 - level) / 2.0
+    return BootstrapMetrics(
+        estimate={k: float(v) for k, v in ponto.items()},
+        lower={k: float(np.nanquantile(v, alfa)) for k, v in reps.items()},
+        upper={k: float(np.nanquantile(v, 1.0 - alfa)) for k, v in reps.items()},
+        level=level,
+        n_boot=n_boot,
+    )
+
+
+def reliability_table(
+    p: np.ndarray,
+    y: np.ndarray,
+    bins: int = DEFAULT_BINS,
+    level: float = 0.90,
+) -> pd.DataFrame:
+    """
+    Statements binned by stated probability (equal-width bins on [0, 1]).
+
+    Returns:
+        DataFrame with one row per non-empty bin: faixa, n, p_media,
+        freq_observada and a Wilson interval (ic_inf, ic_sup) for the
+        observed frequency.
+    """
+    p = np.asarray(p, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bordas = np.linspace(0.0, 1.0, bins + 1)
+    idx = np.clip(np.digitize(p, bordas[1:-1]), 0, bins - 1)
+    n = np.bincount(idx, minlength=bins)
+    soma_p = np.bincount(idx, weights=p, minlength=bins)
+    soma_y = np.bincount(idx, weights=y, minlength=bins)
+    ok = n > 0
+
+    n_ok = n[ok].astype(float)
+    baixo, alto = wilson_interval(soma_y[ok], n_ok, level)
+    return pd.DataFrame({
+        "faixa":          [f"{bordas[i]:.1f}–{bordas[i + 1]:.1f}" for i in np.flatnonzero(ok)],
+        "n":              n[ok],
+        "p_media":        soma_p[ok] / n_ok,
+        "freq_observada": soma_y[ok] / n_ok,
+        "ic_inf":         np.atleast_1d(baixo),
+        "ic_sup":         np.atleast_1d(alto),
+    })
@@ -0,0 +1,139 @@
+# src/core/sampling.py
+"""
+Dirichlet sampling back-ends: pseudo-random, scrambled Sobol and antithetic.
+
+A Dirichlet(alpha) draw is a vector of independent Gamma(alpha_i, 1) draws
+divided by its sum.  numpy generates the gammas by rejection sampling, so
+the draws can only be plain pseudo-random.  Driving each gamma through its
+inverse CDF instead — ``G_i = F⁻¹(u_i; alpha_i)`` — lets the uniforms ``u``
+come from any source:
+
+``random``
+    ``np.random.dirichlet`` (or ``rng.dirichlet``).  Default; bit-for-bit
+    identical to the historical behaviour under the same seed.
+``sobol``
+    Scrambled Sobol points from ``scipy.stats.qmc``.  The points fill the
+    unit cube far more evenly than independent uniforms, which lowers the
+    error of means, frequencies and quantiles of smooth functions of the
+    shares.  The scramble seed is drawn from the caller's RNG so runs stay
+    reproducible under ``np.random.seed``.
+``antithetic``
+    Pseudo-random uniforms paired with their mirror ``1 - u``.  Each pair is
+    negatively correlated, which cancels much of the first-order noise in
+    monotone statistics such as win probabilities.
+
+Estimates from ``sobol`` and ``antithetic`` draws are not independent across
+rows, so the binomial standard errors of src/core/mcse.py are conservative
+(too wide) for them.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+METHODS = ("random", "sobol", "antithetic")
+
+_EPS = 1e-12
+WH_MIN_SHAPE = 30.0  # gamma_from_normals() uses the exact inverse CDF below this
+
+
+def _check_method(method: str) -> None:
+    if method not in METHODS:
+        raise ValueError(f"Unknown sampling method '{method}'. Valid: {list(METHODS)}")
+
+
+def _seed_from(rng: np.random.Generator | None) -> int:
+    """Derives a 32-bit seed from ``rng`` or the legacy global stream."""
+    if rng is not None:
+        return int(rng.integers(2**32))
+    return int(np.random.randint(0, 2**32, dtype=np.int64))
+
+
+def uniforms(
+    n: int,
+    d: int,
+    method: str = "sobol",
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    (n, d) uniforms in the open unit cube for the inverse-CDF samplers.
+
+    ``sobol`` draws ``2^ceil(log2 n)`` scrambled points (keeping Sobol's
+    balance properties) and returns the first ``n``.  ``antithetic`` returns
+    rows ``u`` followed by ``1 - u`` (one extra plain row when ``n`` is odd).
+    """
+    _check_method(method)
+    if method == "sobol":
+        from scipy.stats import qmc
+
+        sobol = qmc.Sobol(d=d, scramble=True, seed=_seed_from(rng))
+        m = max(0, math.ceil(math.log2(max(n, 1))))
+        u = sobol.random_base2(m)[:n]
+    elif method == "antithetic":
+        half = (n + 1) // 2
+        base = rng.random((half, d)) if rng is not None else np.random.random_sample((half, d))
+        u = np.concatenate([base, 1.0 - base])[:n]
+    else:
+        u = rng.random((n, d)) if rng is not None else np.random.random_sample((n, d))
+    return np.clip(u, _EPS, 1.0 - _EPS)
+
+
+def gamma_ppf(u: np.ndarray, shapes: np.ndarray) -> np.ndarray:
+    """Inverse CDF of Gamma(shape, 1), broadcast over the last axis of ``u``."""
+    from scipy.special import gammaincinv
+
+    return gammaincinv(np.asarray(shapes, dtype=float), u)
+
+
+def gamma_from_normals(z: np.ndarray, shapes: np.ndarray, min_shape: float = WH_MIN_SHAPE) -> np.ndarray:
+    """
+    Gamma(shape, 1) variates from standard normals ``z``, monotone in ``z``.
+
+    Uses the Wilson–Hilferty cube, ``shape · (1 − c + z·sqrt(c))³`` with
+    ``c = 1 / (9·shape)``.  Relative quantile error at ±3σ is about 0.2% at
+    ``min_shape`` and falls as ``1/shape`` (0.02% at 100); smaller shapes
+    fall back to the exact inverse CDF.  Orders of magnitude cheaper than
+    ``gamma_ppf``, which makes it the common-random-number transform when
+    thousands of parameter sets reuse the same ``z``.
+    """
+    shapes = np.asarray(shapes, dtype=float)
+    c = 1.0 / (9.0 * shapes)
+    g = shapes * np.maximum(1.0 - c + z * np.sqrt(c), 0.0) ** 3
+    pequenos = shapes < min_shape
+    if pequenos.any():
+        from scipy.special import ndtr
+
+        g[..., pequenos] = gamma_ppf(np.clip(ndtr(z[..., pequenos]), _EPS, 1.0 - _EPS),
+                                     shapes[pequenos])
+    return g
+
+
+def sample_dirichlet(
+    alphas: np.ndarray,
+    n: int,
+    method: str = "random",
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Draws ``n`` Dirichlet(alphas) vectors.
+
+    Args:
+        alphas: Concentration parameters (K,), all > 0.
+        n:      Number of draws.
+        method: "random", "sobol" or "antithetic" (see module docstring).
+        rng:    numpy Generator; defaults to the legacy global ``np.random``
+                stream so existing ``np.random.seed`` calls keep working.
+
+    Returns:
+        Array (n, K) with rows on the simplex.
+    """
+    _check_method(method)
+    alphas = np.asarray(alphas, dtype=float)
+    if method == "random":
+        return rng.dirichlet(alphas, size=n) if rng is not None else np.random.dirichlet(alphas, size=n)
+
+    g = gamma_ppf(uniforms(n, alphas.size, method, rng), alphas)
+    return g / g.sum(axis=1, keepdims=True)
@@ -0,0 +1,69 @@
+# src/core/scoring.py
+"""
+Distributional scores of a forecast given as Monte Carlo samples.
+
+Medians and top-probability calls ignore most of what a 40k-draw forecast
+says.  Proper scores use the whole sample:
+
+- **CRPS** — ``E|X − y| − ½ E|X − X'|`` for the sample ``X`` and outcome
+  ``y``, in the outcome's units (pp); it reduces to the absolute error for
+  a point forecast and rewards sharpness only when it is earned.  The
+  pairwise term is computed from the sorted sample,
+
+      E|X − X'| = 2 / n² · Σ_i (2i − n − 1) · x_(i),
+
+  so the cost is the O(n log n) sort instead of O(n²) pairs.
+- **log score** — ``−log p`` of the event that happened, with the sample
+  frequency smoothed to ``(k + ½) / (n + 1)`` so an event no draw produced
+  scores a large finite value rather than infinity.
+- **PIT** — ``P(X <= y)`` (mid-rank for ties); over many forecasts a
+  calibrated model gives uniform PIT values, over-confident ones pile up
+  near 0 and 1.
+
+All functions take samples along axis 0, so ``(n, K)`` arrays score ``K``
+quantities (e.g. one column per candidate) at once.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def crps_sample(amostras: np.ndarray, obs) -> np.ndarray | float:
+    """
+    Sample CRPS.
+
+    Args:
+        amostras: (n,) or (n, K) samples.
+        obs:      Scalar or (K,) outcomes.
+
+    Returns:
+        float, or (K,) array for 2-D samples.
+    """
+    x = np.sort(np.asarray(amostras, dtype=float), axis=0)
+    obs = np.asarray(obs, dtype=float)
+    n = x.shape[0]
+    pesos = (2.0 * np.arange(1, n + 1) - n - 1.0) / (n * n)
+    if x.ndim > 1:
+        pesos = pesos.reshape((n,) + (1,) * (x.ndim - 1))
+    crps = np.abs(x - obs).mean(axis=0) - (pesos * x).sum(axis=0)
+    return float(crps) if np.ndim(crps) == 0 else crps
+
+
+def pit(amostras: np.ndarray, obs) -> np.ndarray | float:
+    """
+    Probability integral transform ``P(X < y) + ½ P(X = y)``.
+
+    Args:
+        amostras: (n,) or (n, K) samples.
+        obs:      Scalar or (K,) outcomes.
+    """
+    x = np.asarray(amostras, dtype=float)
+    obs = np.asarray(obs, dtype=float)
+    valor = (x < obs).mean(axis=0) + 0.5 * (x == obs).mean(axis=0)
+    return float(valor) if np.ndim(valor) == 0 else valor
+
+
+def log_score(contagem, n: int) -> float:
+    """``−log`` of the smoothed frequency ``(k + ½) / (n + 1)`` of the realised event."""
+    return float(-np.log((np.asarray(contagem, dtype=float) + 0.5) / (n + 1.0)))
@@ -0,0 +1,183 @@
+# src/core/simulation.py
+"""
+Global-free, batched first-round kernel.
+
+``simulation_v2`` keeps its model parameters in module globals populated by
+``inicializar()``, which makes it awkward to evaluate more than one set of
+inputs per process.  The functions here implement the same first-round
+model on explicit arrays with a leading *scenario* axis ``S``:
+
+1. ``redistribute_undecided`` — undecided voters split by
+   ``vote × (100 − rejection)`` weights, ``blank_fraction`` to blank/null
+   (same formula as ``distribuir_indecisos()``);
+2. ``dirichlet_alphas``       — concentration ``alpha = votes × 100 / desvio``;
+3. ``sample_valid_shares``    — Dirichlet draws as normalised gammas,
+   valid-only renormalisation, rejection ceiling, renormalisation
+   (``valid_shares_from_gammas`` when the caller supplies the gammas);
+4. ``summarize_batch``        — win/majority/runoff frequencies, margin
+   threshold probabilities and quantiles for every scenario at once.
+
+Every array is ``(S, ...)``; a single scenario is simply ``S = 1``.
+No I/O, no globals.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .sampling import gamma_ppf, uniforms
+
+
+DEFAULT_BLANK_FRACTION = 0.15
+
+
+def valid_mask(candidatos: list[str]) -> np.ndarray:
+    """True for declared candidates, False for blank/null categories."""
+    return np.array(["Brancos" not in c and "Nulos" not in c for c in candidatos])
+
+
+def redistribute_undecided(
+    votos: np.ndarray,
+    rejeicao: np.ndarray,
+    indecisos: np.ndarray,
+    blank_fraction: np.ndarray,
+    valid_mask: np.ndarray,
+) -> np.ndarray:
+    """
+    Adds undecided voters to the vote intentions of every scenario.
+
+    Args:
+        votos:          (S, K) vote intentions (%).
+        rejeicao:       (S, K) rejection rates (%).
+        indecisos:      (S,) undecided share (%).
+        blank_fraction: (S,) fraction of undecided sent to blank/null.
+        valid_mask:     (K,) True for declared candidates.
+
+    Returns:
+        (S, K) effective vote intentions (%).
+    """
+    votos = np.asarray(votos, dtype=float)
+    indecisos = np.asarray(indecisos, dtype=float)[:, np.newaxis]
+    blank_fraction = np.asarray(blank_fraction, dtype=float)[:, np.newaxis]
+    valid_mask = np.asarray(valid_mask, dtype=bool)
+
+    espaco = np.maximum(100.0 - rejeicao, 0.0) / 100.0
+    pesos = votos * espaco * valid_mask
+    total = pesos.sum(axis=1, keepdims=True)
+    # Fallback: uniform split among declared candidates when all weights vanish
+    uniforme = np.broadcast_to(valid_mask / max(valid_mask.sum(), 1), pesos.shape)
+    proporcoes = np.where(total > 0, pesos / np.where(total > 0, total, 1.0), uniforme)
+
+    ajustado = votos + proporcoes * indecisos * (1.0 - blank_fraction)
+    n_brancos = (~valid_mask).sum()
+    if n_brancos:
+        ajustado = ajustado + (~valid_mask) * indecisos * blank_fraction / n_brancos
+    return np.where(indecisos > 0, ajustado, votos)
+
+
+def dirichlet_alphas(votos_efetivos: np.ndarray, desvio: np.ndarray) -> np.ndarray:
+    """Dirichlet parameters ``votes × 100 / desvio`` for (S, K) votes and (S,) desvio."""
+    desvio = np.asarray(desvio, dtype=float)[:, np.newaxis]
+    alphas = np.asarray(votos_efetivos, dtype=float) * (100.0 / desvio)
+    if np.any(~np.isfinite(alphas)) or np.any(alphas <= 0):
+        bad = np.argwhere(~np.isfinite(alphas) | (alphas <= 0))
+        raise ValueError(
+            f"Invalid Dirichlet parameters at (scenario, candidate) {bad.tolist()}: "
+            "every vote share must be > 0 after overrides."
+        )
+    return alphas
+
+
+def sample_valid_shares(
+    alphas: np.ndarray,
+    rejeicao: np.ndarray,
+    valid_mask: np.ndarray,
+    n: int,
+    method: str = "random",
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Valid vote shares after the rejection ceiling for every scenario.
+
+    ``method="random"`` draws independent gammas per scenario.  ``"sobol"``
+    and ``"antithetic"`` draw one (n, K) set of uniforms and push it through
+    every scenario's gamma inverse CDF, so the scenarios share common random
+    numbers and their differences are much less noisy.
+
+    Args:
+        alphas:     (S, K) Dirichlet parameters.
+        rejeicao:   (S, K) rejection rates (%).
+        valid_mask: (K,) True for declared candidates.
+        n:          Draws per scenario.
+        method:     "random", "sobol" or "antithetic".
+        rng:        numpy Generator; legacy ``np.random`` when None.
+
+    Returns:
+        (S, n, V) valid vote shares in %, V = valid_mask.sum().
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    s, k = alphas.shape
+    if method == "random":
+        gamma = rng.standard_gamma if rng is not None else np.random.standard_gamma
+        g = gamma(np.broadcast_to(alphas[:, np.newaxis, :], (s, n, k)))
+    else:
+        u = uniforms(n, k, method, rng)
+        g = gamma_ppf(u[np.newaxis, :, :], alphas[:, np.newaxis, :])
+
+    return valid_shares_from_gammas(g, rejeicao, valid_mask)
+
+
+def valid_shares_from_gammas(
+    g: np.ndarray,
+    rejeicao: np.ndarray,
+    valid_mask: np.ndarray,
+) -> np.ndarray:
+    """
+    Maps (S, N, K) gamma draws to valid shares: drop blank/null, renormalise,
+    clip at ``100 − rejection``, renormalise.  Normalising the gammas to the
+    simplex first is unnecessary because only the valid columns are kept.
+    """
+    validos = g[:, :, valid_mask]
+    validos = validos / validos.sum(axis=2, keepdims=True) * 100.0
+    tetos = (100.0 - np.asarray(rejeicao, dtype=float)[:, valid_mask])[:, np.newaxis, :]
+    validos = np.minimum(validos, tetos)
+    return validos / validos.sum(axis=2, keepdims=True) * 100.0
+
+
+def summarize_batch(
+    validos: np.ndarray,
+    thresholds=(3.0, 5.0, 10.0, 15.0, 20.0, 25.0),
+    quantiles=(0.05, 0.50, 0.95),
+) -> dict[str, np.ndarray]:
+    """
+    Per-scenario statistics of (S, N, V) valid shares.
+
+    Returns:
+        dict with
+            win        (S, V) P(finishes first)
+            majority   (S, V) P(> 50% of valid votes)
+            p2t        (S,)   P(second round)
+            mean       (S, V) mean valid share
+            quantiles  (S, V, Q) share quantiles
+            margin_q   (S, Q) first-round margin quantiles
+            above      (S, T) P(margin > threshold)
+    """
+    s, n, v = validos.shape
+    top = np.sort(np.partition(validos, v - 2, axis=2)[:, :, -2:], axis=2) if v > 1 else validos
+    lider_val = top[:, :, -1]
+    margem = top[:, :, -1] - top[:, :, -2] if v > 1 else lider_val
+
+    lider = validos.argmax(axis=2)
+    win = np.stack([(lider == j).mean(axis=1) for j in range(v)], axis=1)
+    thr = np.asarray(thresholds, dtype=float)
+    q = np.asarray(quantiles, dtype=float)
+
+    return {
+        "win":       win,
+        "majority":  (validos > 50.0).mean(axis=1),
+        "p2t":       (lider_val < 50.0).mean(axis=1),
+        "mean":      validos.mean(axis=1),
+        "quantiles": np.moveaxis(np.quantile(validos, q, axis=1), 0, -1),
+        "margin_q":  np.quantile(margem, q, axis=1).T,
+        "above":     (margem[:, :, np.newaxis] > thr).mean(axis=1),
+    }
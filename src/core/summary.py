@@ -0,0 +1,314 @@
+# src/core/summary.py
+"""
+Single-pass summary statistics for Monte Carlo draws.
+
+Every consumer of a simulation run — ``relatorio()``, ``dashboard.py``, the
+``--summary-only`` JSON export — needs the same handful of numbers: per-
+candidate means and quantiles, win and runoff-pair frequencies, the
+probability of a second round and ``P(margin > X)`` for a list of thresholds.
+Computing them column by column through pandas (``quantile`` per candidate,
+``value_counts`` on object columns, one ``mean`` per threshold) repeats the
+same O(N) scans many times.  ``compute_summary()`` does it once:
+
+- all quantiles for all columns in a single ``np.quantile(..., axis=0)``;
+- leader and runner-up per draw via one ``np.argpartition``;
+- win and pair frequencies via ``np.bincount`` on integer codes;
+- every threshold probability via one sort + ``np.searchsorted``.
+
+Statistics are stored as raw counts so that Monte Carlo standard errors and
+intervals for every probability follow from them without touching the draws
+again (see src/core/mcse.py).  Quantiles carry batch-means standard errors
+computed in the same pass.
+
+This module has no side effects and depends only on numpy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .mcse import DEFAULT_LEVEL, batch_means_quantile_se, prob_estimate
+
+
+DEFAULT_QUANTILES = (0.05, 0.50, 0.95)
+DEFAULT_THRESHOLDS = (3.0, 5.0, 10.0, 15.0, 20.0, 25.0)
+
+
+@dataclass
+class SummaryStats:
+    """
+    Precomputed summary block for one set of first-round draws.
+
+    All per-candidate arrays are parallel to ``candidates``.  Shares and
+    margins are in percentage points; ``*_counts`` fields are numbers of
+    draws, so probabilities are ``counts / n_sim``.
+
+    Fields
+    ------
+    candidates : list[str]
+        Valid candidates, in the column order of the share matrix.
+    n_sim : int
+        Number of draws summarised.
+    quantile_levels : np.ndarray
+        Quantile levels in [0, 1].  Shape: ``(Q,)``.
+    mean : np.ndarray
+        Mean valid-vote share per candidate.  Shape: ``(K,)``.
+    quantiles : np.ndarray
+        Valid-vote share quantiles.  Shape: ``(K, Q)``.
+    win_counts : np.ndarray
+        Draws in which each candidate finishes first.  Shape: ``(K,)``.
+    pair_counts : np.ndarray
+        Draws in which ``{i, j}`` are the top two, stored at ``[i, j]`` with
+        ``i < j``.  Shape: ``(K, K)``.
+    majority_counts : np.ndarray
+        Draws in which each candidate exceeds 50% of valid votes.
+    runoff_count : int
+        Draws in which no candidate exceeds 50% (second round needed).
+    margin_mean : float
+        Mean first-round margin (leader minus runner-up).
+    margin_quantiles : np.ndarray
+        Margin quantiles at ``quantile_levels``.  Shape: ``(Q,)``.
+    thresholds : np.ndarray
+        Margin thresholds in pp.  Shape: ``(T,)``.
+    above_counts / below_counts : np.ndarray
+        Draws with margin strictly above / below each threshold.
+    total_candidates, total_mean, total_quantiles :
+        Same statistics for total (not valid-only) shares, including
+        blank/null, when supplied.  Empty otherwise.
+    quantile_errors / margin_quantile_errors : np.ndarray
+        Batch-means Monte Carlo standard errors of ``quantiles`` and
+        ``margin_quantiles``.  Same shapes; NaN when N is too small.
+    """
+
+    candidates: list[str]
+    n_sim: int
+    quantile_levels: np.ndarray
+    mean: np.ndarray
+    quantiles: np.ndarray
+    win_counts: np.ndarray
+    pair_counts: np.ndarray
+    majority_counts: np.ndarray
+    runoff_count: int
+    margin_mean: float
+    margin_quantiles: np.ndarray
+    thresholds: np.ndarray
+    above_counts: np.ndarray
+    below_counts: np.ndarray
+    total_candidates: list[str]
+    total_mean: np.ndarray
+    total_quantiles: np.ndarray
+    quantile_errors: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    margin_quantile_errors: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    # ── Probability views ─────────────────────────────────────────────────────
+
+    @property
+    def win_prob(self) -> dict[str, float]:
+        """P(candidate finishes first), in [0, 1]."""
+        return {c: float(k / self.n_sim) for c, k in zip(self.candidates, self.win_counts)}
+
+    @property
+    def majority_prob(self) -> dict[str, float]:
+        """P(candidate wins outright with > 50% of valid votes), in [0, 1]."""
+        return {c: float(k / self.n_sim) for c, k in zip(self.candidates, self.majority_counts)}
+
+    @property
+    def p2t(self) -> float:
+        """P(second round), in [0, 1]."""
+        return float(self.runoff_count / self.n_sim)
+
+    @property
+    def pair_prob(self) -> dict[tuple[str, str], float]:
+        """P({a, b} are the top two), keyed by ``(a, b)`` in column order."""
+        ii, jj = np.nonzero(self.pair_counts)
+        return {
+            (self.candidates[i], self.candidates[j]): float(self.pair_counts[i, j] / self.n_sim)
+            for i, j in zip(ii, jj)
+        }
+
+    @property
+    def qualify_prob(self) -> dict[str, float]:
+        """P(candidate finishes in the top two), in [0, 1]."""
+        sym = self.pair_counts + self.pair_counts.T
+        return {c: float(k / self.n_sim) for c, k in zip(self.candidates, sym.sum(axis=1))}
+
+    def prob_margin_above(self, threshold: float) -> float:
+        """P(margin > threshold) for a threshold present in ``thresholds``."""
+        return float(self.above_counts[self._threshold_index(threshold)] / self.n_sim)
+
+    def prob_margin_below(self, threshold: float) -> float:
+        """P(margin < threshold) for a threshold present in ``thresholds``."""
+        return float(self.below_counts[self._threshold_index(threshold)] / self.n_sim)
+
+    # ── Monte Carlo error ─────────────────────────────────────────────────────
+
+    def estimate(self, count, level: float = DEFAULT_LEVEL, method: str = "wilson") -> dict:
+        """
+        Probability, MC standard error and interval for a raw count.
+
+        ``count`` is any entry of the ``*_counts`` fields (or ``runoff_count``);
+        returns a dict with keys p, se, low, high.
+        """
+        return prob_estimate(count, self.n_sim, level, method)
+
+    def margin_above_estimate(self, threshold: float, level: float = DEFAULT_LEVEL) -> dict:
+        """estimate() for P(margin > threshold)."""
+        return self.estimate(self.above_counts[self._threshold_index(threshold)], level)
+
+    def margin_below_estimate(self, threshold: float, level: float = DEFAULT_LEVEL) -> dict:
+        """estimate() for P(margin < threshold)."""
+        return self.estimate(self.below_counts[self._threshold_index(threshold)], level)
+
+    def quantile_se(self, candidate: str, level: float) -> float:
+        """Batch-means standard error of a valid-share quantile."""
+        return float(self.quantile_errors[self.candidates.index(candidate), self._level_index(level)])
+
+    def margin_quantile_se(self, level: float) -> float:
+        """Batch-means standard error of a margin quantile."""
+        return float(self.margin_quantile_errors[self._level_index(level)])
+
+    def quantile(self, candidate: str, level: float, total: bool = False) -> float:
+        """Share quantile of ``candidate`` at ``level`` (valid votes unless ``total``)."""
+        cands = self.total_candidates if total else self.candidates
+        table = self.total_quantiles if total else self.quantiles
+        return float(table[cands.index(candidate), self._level_index(level)])
+
+    def margin_quantile(self, level: float) -> float:
+        """First-round margin quantile at ``level``."""
+        return float(self.margin_quantiles[self._level_index(level)])
+
+    def _threshold_index(self, threshold: float) -> int:
+        hits = np.flatnonzero(np.isclose(self.thresholds, threshold))
+        if hits.size == 0:
+            raise KeyError(
+                f"Threshold {threshold} not precomputed; available: {self.thresholds.tolist()}"
+            )
+        return int(hits[0])
+
+    def _level_index(self, level: float) -> int:
+        hits = np.flatnonzero(np.isclose(self.quantile_levels, level))
+        if hits.size == 0:
+            raise KeyError(
+                f"Quantile {level} not precomputed; available: {self.quantile_levels.tolist()}"
+            )
+        return int(hits[0])
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+def quantile_table(matrix: np.ndarray, levels=DEFAULT_QUANTILES) -> np.ndarray:
+    """
+    Quantiles of every column of ``matrix`` in one call.
+
+    Returns an array of shape ``(n_columns, len(levels))``.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.ndim == 1:
+        matrix = matrix[:, np.newaxis]
+    return np.quantile(matrix, np.asarray(levels, dtype=float), axis=0).T
+
+
+def top_two(shares: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Leader index, runner-up index and margin for every draw.
+
+    Uses ``np.argpartition`` so the cost is O(N·K) rather than a full sort.
+    With a single column the runner-up index is -1 and the margin is the
+    leader's share.
+    """
+    n, k = shares.shape
+    rows = np.arange(n)
+    if k == 1:
+        return np.zeros(n, dtype=np.intp), np.full(n, -1, dtype=np.intp), shares[:, 0].copy()
+    top = np.argpartition(shares, k - 2, axis=1)[:, -2:]
+    vals = shares[rows[:, np.newaxis], top]
+    first_is_leader = vals[:, 0] >= vals[:, 1]
+    leader = np.where(first_is_leader, top[:, 0], top[:, 1])
+    runner = np.where(first_is_leader, top[:, 1], top[:, 0])
+    margin = np.abs(vals[:, 0] - vals[:, 1])
+    return leader, runner, margin
+
+
+def compute_summary(
+    shares: np.ndarray,
+    candidates: list[str],
+    quantiles=DEFAULT_QUANTILES,
+    thresholds=DEFAULT_THRESHOLDS,
+    totals: np.ndarray | None = None,
+    total_candidates: list[str] | None = None,
+) -> SummaryStats:
+    """
+    Computes the full summary block for a matrix of valid-vote shares.
+
+    Args:
+        shares:           (N, K) valid-vote shares in pp (rows sum to 100).
+        candidates:       K candidate names, in column order.
+        quantiles:        Quantile levels in [0, 1].
+        thresholds:       Margin thresholds in pp for ``P(margin > X)``.
+        totals:           Optional (N, K') total shares including blank/null.
+        total_candidates: Names for the ``totals`` columns.
+
+    Returns:
+        SummaryStats
+    """
+    shares = np.asarray(shares, dtype=float)
+    n, k = shares.shape
+    if len(candidates) != k:
+        raise ValueError(f"{len(candidates)} candidate names for {k} share columns")
+    if n == 0:
+        raise ValueError("Cannot summarise an empty set of draws")
+
+    levels = np.asarray(quantiles, dtype=float)
+    thr = np.asarray(sorted(thresholds), dtype=float)
+
+    leader, runner, margin = top_two(shares)
+
+    win_counts = np.bincount(leader, minlength=k)
+    if k > 1:
+        lo = np.minimum(leader, runner)
+        hi = np.maximum(leader, runner)
+        pair_counts = np.bincount(lo * k + hi, minlength=k * k).reshape(k, k)
+    else:
+        pair_counts = np.zeros((1, 1), dtype=np.int64)
+    majority_counts = (shares > 50.0).sum(axis=0)
+    leader_share = shares[np.arange(n), leader]
+
+    margin_sorted = np.sort(margin)
+    above = n - np.searchsorted(margin_sorted, thr, side="right")
+    below = np.searchsorted(margin_sorted, thr, side="left")
+
+    if totals is not None:
+        totals = np.asarray(totals, dtype=float)
+        total_names = list(total_candidates) if total_candidates is not None else [
+            str(i) for i in range(totals.shape[1])
+        ]
+        total_mean = totals.mean(axis=0)
+        total_q = quantile_table(totals, levels)
+    else:
+        total_names, total_mean, total_q = [], np.empty(0), np.empty((0, len(levels)))
+
+    return SummaryStats(
+        candidates=list(candidates),
+        n_sim=int(n),
+        quantile_levels=levels,
+        mean=shares.mean(axis=0),
+        quantiles=quantile_table(shares, levels),
+        win_counts=win_counts,
+        pair_counts=pair_counts,
+        majority_counts=majority_counts,
+        runoff_count=int((leader_share < 50.0).sum()),
+        margin_mean=float(margin.mean()),
+        margin_quantiles=np.quantile(margin_sorted, levels),
+        thresholds=thr,
+        above_counts=above,
+        below_counts=below,
+        total_candidates=total_names,
+        total_mean=total_mean,
+        total_quantiles=total_q,
+        quantile_errors=batch_means_quantile_se(shares, levels),
+        margin_quantile_errors=batch_means_quantile_se(margin, levels),
+    )
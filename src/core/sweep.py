@@ -0,0 +1,218 @@
+# src/core/sweep.py
+"""
+Batched what-if sweeps over ``scenario_overrides``.
+
+A scenario is an override dict in the ``SimulationConfig.scenario_overrides``
+format, extended with three scenario-wide keys::
+
+    {
+        "Lula":           {"votos_media": 35.0, "rejeicao": 40.0},
+        "indecisos":      8.0,     # undecided share (%)
+        "blank_fraction": 0.25,    # undecided fraction sent to blank/null
+        "desvio":         2.5,     # Dirichlet noise term (pp)
+    }
+
+Dict values are per-candidate field overrides (``votos_media`` or
+``rejeicao``); scalar values are scenario-wide.  Anything not overridden
+comes from the base ``PollData``.
+
+``run_sweep`` stacks all S scenarios into (S, K) parameter arrays and
+evaluates them with the batched kernel of src/core/simulation.py as
+``(S_chunk, N, K)`` blocks, so memory stays bounded whatever S is.  The
+result is a tidy DataFrame with one row per scenario.
+"""
+
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .config import PollData
+from .simulation import (
+    DEFAULT_BLANK_FRACTION,
+    dirichlet_alphas,
+    redistribute_undecided,
+    sample_valid_shares,
+    summarize_batch,
+    valid_mask as mascara_validos,
+)
+
+
+CANDIDATE_FIELDS = ("votos_media", "rejeicao")
+SCENARIO_FIELDS = ("indecisos", "blank_fraction", "desvio")
+
+# Upper bound on floats per (S_chunk, N, K) block (~160 MB of float64)
+MAX_BLOCK = 20_000_000
+
+
+def expand_grid(grid: dict) -> list[dict]:
+    """
+    Cartesian product of override values.
+
+    Keys are ``"<candidate>.<field>"`` for per-candidate overrides or a
+    scenario-wide field name; values are lists::
+
+        expand_grid({"Lula.votos_media": [33, 35, 37], "indecisos": [5, 10]})
+        # -> 6 scenarios
+
+    Returns:
+        list of override dicts in the ``scenario_overrides`` format.
+    """
+    chaves = list(grid)
+    cenarios = []
+    for valores in itertools.product(*(grid[k] for k in chaves)):
+        cenario: dict = {}
+        for chave, valor in zip(chaves, valores):
+            if "." in chave:
+                cand, campo = chave.rsplit(".", 1)
+                cenario.setdefault(cand, {})[campo] = valor
+            else:
+                cenario[chave] = valor
+        cenarios.append(cenario)
+    return cenarios
+
+
+def scenario_label(override: dict) -> dict:
+    """Flattens an override dict into ``{"<candidate>.<field>": value, <field>: value}``."""
+    flat = {}
+    for chave, valor in override.items():
+        if isinstance(valor, dict):
+            for campo, v in valor.items():
+                flat[f"{chave}.{campo}"] = v
+        else:
+            flat[chave] = valor
+    return flat
+
+
+def stack_scenarios(
+    poll: PollData,
+    scenarios: list[dict],
+    desvio: float | None = None,
+    blank_fraction: float = DEFAULT_BLANK_FRACTION,
+) -> dict[str, np.ndarray]:
+    """
+    Applies every override to the base poll data.
+
+    Args:
+        poll:           Base aggregated polls.
+        scenarios:      Override dicts (see module docstring).
+        desvio:         Base noise term; ``poll.desvio_base`` when None.
+        blank_fraction: Base undecided fraction sent to blank/null.
+
+    Returns:
+        dict with votos (S, K), rejeicao (S, K), indecisos (S,),
+        blank_fraction (S,), desvio (S,).
+
+    Raises:
+        KeyError:   Unknown candidate or field in an override.
+    """
+    s, k = len(scenarios), len(poll.candidatos)
+    indice = {c: i for i, c in enumerate(poll.candidatos)}
+    base = {
+        "votos_media": np.tile(poll.votos_media.astype(float), (s, 1)),
+        "rejeicao":    np.tile(poll.rejeicao.astype(float), (s, 1)),
+    }
+    escalares = {
+        "indecisos":      np.full(s, float(poll.indecisos)),
+        "blank_fraction": np.full(s, float(blank_fraction)),
+        "desvio":         np.full(s, float(poll.desvio_base if desvio is None else desvio)),
+    }
+
+    for j, cenario in enumerate(scenarios):
+        for chave, valor in cenario.items():
+            if isinstance(valor, dict):
+                if chave not in indice:
+                    raise KeyError(f"Unknown candidate '{chave}'. Valid: {poll.candidatos}")
+                for campo, v in valor.items():
+                    if campo not in CANDIDATE_FIELDS:
+                        raise KeyError(f"Unknown candidate field '{campo}'. Valid: {list(CANDIDATE_FIELDS)}")
+                    base[campo][j, indice[chave]] = float(v)
+            elif chave in SCENARIO_FIELDS:
+                escalares[chave][j] = float(valor)
+            else:
+                raise KeyError(f"Unknown scenario field '{chave}'. Valid: {list(SCENARIO_FIELDS)}")
+
+    return {"votos": base["votos_media"], "rejeicao": base["rejeicao"], **escalares}
+
+
+def run_sweep(
+    poll: PollData,
+    scenarios: list[dict],
+    n_sim: int = 40_000,
+    desvio: float | None = None,
+    blank_fraction: float = DEFAULT_BLANK_FRACTION,
+    thresholds=(3.0, 5.0, 10.0, 15.0, 20.0, 25.0),
+    quantiles=(0.05, 0.50, 0.95),
+    method: str = "random",
+    chunk_size: int | None = None,
+    rng: np.random.Generator | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluates every scenario as one batched Monte Carlo run.
+
+    Args:
+        poll:           Base aggregated polls.
+        scenarios:      Override dicts, e.g. from expand_grid().  An empty
+                        dict is the baseline.
+        n_sim:          Draws per scenario.
+        desvio:         Base noise term; ``poll.desvio_base`` when None.
+        blank_fraction: Base undecided fraction sent to blank/null.
+        thresholds:     Margin thresholds (pp) for the ``p_margem_gt_*`` columns.
+        quantiles:      Quantile levels for share and margin columns.
+        method:         Sampling back-end.  "sobol"/"antithetic" reuse the
+                        same uniforms across the scenarios of a chunk.
+        chunk_size:     Scenarios per block; sized from MAX_BLOCK when None.
+        rng:            numpy Generator; legacy ``np.random`` when None.
+
+    Returns:
+        DataFrame, one row per scenario: ``cenario``, the override columns,
+        ``pv_<cand>``, ``maioria_<cand>``, ``media_<cand>``,
+        ``<cand>_p<q>``, ``p2t``, ``margem_p<q>``, ``p_margem_gt_<X>``.
+    """
+    if not scenarios:
+        return pd.DataFrame()
+
+    valid_mask = mascara_validos(poll.candidatos)
+    validos = [c for c, ok in zip(poll.candidatos, valid_mask) if ok]
+    p = stack_scenarios(poll, scenarios, desvio, blank_fraction)
+
+    votos = redistribute_undecided(
+        p["votos"], p["rejeicao"], p["indecisos"], p["blank_fraction"], valid_mask
+    )
+    alphas = dirichlet_alphas(votos, p["desvio"])
+
+    s, k = alphas.shape
+    if chunk_size is None:
+        chunk_size = max(1, MAX_BLOCK // (n_sim * k))
+
+    partes = []
+    for ini in range(0, s, chunk_size):
+        fim = min(ini + chunk_size, s)
+        amostras = sample_valid_shares(
+            alphas[ini:fim], p["rejeicao"][ini:fim], valid_mask, n_sim, method, rng
+        )
+        partes.append(summarize_batch(amostras, thresholds, quantiles))
+    stats = {chave: np.concatenate([parte[chave] for parte in partes]) for chave in partes[0]}
+
+    colunas: dict[str, np.ndarray] = {"cenario": np.arange(s)}
+    rotulos = pd.DataFrame([scenario_label(c) for c in scenarios])
+    for col in rotulos.columns:
+        colunas[col] = rotulos[col].to_numpy()
+
+    niveis = [f"p{round(q * 100):02d}" for q in quantiles]
+    for i, cand in enumerate(validos):
+        colunas[f"pv_{cand}"] = stats["win"][:, i]
+        colunas[f"maioria_{cand}"] = stats["majority"][:, i]
+        colunas[f"media_{cand}"] = stats["mean"][:, i]
+        for j, nivel in enumerate(niveis):
+            colunas[f"{cand}_{nivel}"] = stats["quantiles"][:, i, j]
+    colunas["p2t"] = stats["p2t"]
+    for j, nivel in enumerate(niveis):
+        colunas[f"margem_{nivel}"] = stats["margin_q"][:, j]
+    for j, thr in enumerate(thresholds):
+        colunas[f"p_margem_gt_{thr:g}"] = stats["above"][:, j]
+    colunas["n_sim"] = np.full(s, n_sim)
+
+    return pd.DataFrame(colunas)
@@ -0,0 +1,253 @@
+# src/core/trajectory.py
+"""
+Forecast trajectory: the model re-run for every past date in one batch.
+
+The live aggregation (``agregar_pesquisas_candidato``) answers "what do the
+polls say today?" one candidate at a time.  Re-running it for each day of
+the campaign repeats the same weighted means D times.  Here the D reference
+dates and the P poll rows form one temporal-weight matrix
+
+    W[d, p] = exp(−(t_d − t_p) / tau)   if poll p was published by t_d,
+              0                          otherwise
+
+(undated rows weigh 1 on every date, as in the live path), and every
+weighted mean the aggregation needs — vote, within-poll deviation, second
+moment for the between-institute spread, rejection, undecided — comes out
+of ``(W ∘ M) @ F`` for a (P, ·) feature matrix ``F`` of per-candidate
+one-hot columns, ``M`` being the date-dependent outlier mask.
+
+``run_trajectory`` then pushes the D aggregated states through the batched
+kernel of src/core/simulation.py.  All dates share one (n, K) set of
+standard normals (Wilson–Hilferty gammas), so day-to-day changes in the
+trajectory reflect the polls and not Monte Carlo noise.
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .sampling import gamma_from_normals
+from .simulation import (
+    DEFAULT_BLANK_FRACTION,
+    dirichlet_alphas,
+    redistribute_undecided,
+    summarize_batch,
+    valid_mask as mascara_validos,
+    valid_shares_from_gammas,
+)
+from .sweep import MAX_BLOCK
+
+
+DEFAULT_TAU = 7.0
+OUTLIER_THRESHOLD = 2.5
+MIN_OUTLIER_POLLS = 3
+
+
+def temporal_weights(dias_ref: np.ndarray, dias_pesquisa: np.ndarray, tau: float = DEFAULT_TAU) -> np.ndarray:
+    """
+    (D, P) matrix ``exp(−age / tau)``, zero for polls not yet published.
+
+    Args:
+        dias_ref:      (D,) reference date ordinals.
+        dias_pesquisa: (P,) poll date ordinals; NaN for undated rows (weight 1).
+        tau:           Decay constant in days.
+    """
+    idade = np.asarray(dias_ref, dtype=float)[:, np.newaxis] - np.asarray(dias_pesquisa, dtype=float)
+    sem_data = np.isnan(idade)
+    with np.errstate(invalid="ignore"):
+        w = np.where(idade >= 0, np.exp(-np.maximum(idade, 0.0) / tau), 0.0)
+    return np.where(sem_data, 1.0, w)
+
+
+def outlier_mask(
+    publicadas: np.ndarray,
+    votos: np.ndarray,
+    grupo: np.ndarray,
+    k: int,
+    threshold: float = OUTLIER_THRESHOLD,
+) -> np.ndarray:
+    """
+    Modified z-score outliers per (date, poll row), among the polls of the
+    same candidate already published at each date.
+
+    Same rule as ``detectar_outliers``: median/MAD of the published values,
+    no outliers with fewer than MIN_OUTLIER_POLLS polls or a zero MAD, and
+    every poll kept when all of them would be flagged.
+
+    Args:
+        publicadas: (D, P) True where the poll is published at the date.
+        votos:      (P,) vote intentions.
+        grupo:      (P,) candidate index of each row.
+        k:          Number of candidates.
+
+    Returns:
+        (D, P) True for rows kept in the vote average.
+    """
+    manter = publicadas.copy()
+    for c in range(k):
+        cols = np.flatnonzero(grupo == c)
+        if len(cols) < MIN_OUTLIER_POLLS:
+            continue
+        pub = publicadas[:, cols]
+        x = np.where(pub, votos[cols], np.nan)
+        linhas = pub.sum(axis=1) >= MIN_OUTLIER_POLLS
+        if not linhas.any():
+            continue
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mediana = np.nanmedian(x[linhas], axis=1, keepdims=True)
+            mad = np.nanmedian(np.abs(x[linhas] - mediana), axis=1, keepdims=True)
+            z = 0.6745 * (x[linhas] - mediana) / mad
+        fora = (np.abs(z) > threshold) & pub[linhas] & (mad > 0)
+        todos = fora.sum(axis=1) == pub[linhas].sum(axis=1)
+        fora[todos] = False
+        manter[np.ix_(np.flatnonzero(linhas), cols)] &= ~fora
+    return manter
+
+
+def aggregate_dates(
+    dias_ref: np.ndarray,
+    polls: pd.DataFrame,
+    candidatos: list[str],
+    tau: float = DEFAULT_TAU,
+    threshold: float = OUTLIER_THRESHOLD,
+) -> dict[str, np.ndarray]:
+    """
+    Aggregated poll state at every reference date.
+
+    Args:
+        dias_ref:   (D,) reference date ordinals.
+        polls:      Poll rows with ``candidato``, ``intencao_voto_pct``,
+                    ``desvio_padrao_pct`` and optionally ``rejeicao_pct``,
+                    ``indecisos_pct`` and ``data`` (``datetime.date`` or NaT).
+        candidatos: Candidate order of the output columns.
+        tau:        Temporal decay constant in days.
+        threshold:  Modified z-score outlier threshold.
+
+    Returns:
+        dict with votos, rejeicao, desvio, n_pesquisas (D, K) — NaN where a
+        candidate has no published poll — and indecisos (D,).
+    """
+    k = len(candidatos)
+    indice = {c: i for i, c in enumerate(candidatos)}
+    grupo = polls["candidato"].map(indice).to_numpy()
+    if np.isnan(grupo.astype(float)).any():
+        raise KeyError(f"Poll rows for candidates outside {candidatos}")
+    grupo = grupo.astype(int)
+
+    if "data" in polls.columns:
+        dias_pesq = np.array([d.toordinal() if hasattr(d, "toordinal") and not pd.isna(d) else np.nan
+                              for d in polls["data"]], dtype=float)
+    else:
+        dias_pesq = np.full(len(polls), np.nan)
+    x = polls["intencao_voto_pct"].to_numpy(dtype=float)
+    s = polls["desvio_padrao_pct"].to_numpy(dtype=float)
+    rej = (polls["rejeicao_pct"].to_numpy(dtype=float) if "rejeicao_pct" in polls.columns
+           else np.zeros(len(polls)))
+    ind = (polls["indecisos_pct"].fillna(0).to_numpy(dtype=float) if "indecisos_pct" in polls.columns
+           else np.zeros(len(polls)))
+
+    w = temporal_weights(dias_ref, dias_pesq, tau)
+    publicadas = w > 0
+    manter = outlier_mask(publicadas, x, grupo, k, threshold)
+
+    um = np.zeros((len(polls), k))
+    um[np.arange(len(polls)), grupo] = 1.0
+    tem_rej = (rej > 0)[:, np.newaxis] * um
+
+    # Vote, deviation and second moment over the kept polls: one product
+    f = np.hstack([um, um * x[:, np.newaxis], um * (x * x)[:, np.newaxis], um * s[:, np.newaxis]])
+    soma = (w * manter) @ f
+    # Rejection over rows reporting it (outlier mask not applied) and undecided over all rows
+    g = np.hstack([tem_rej, tem_rej * np.nan_to_num(rej)[:, np.newaxis],
+                   np.ones((len(polls), 1)), ind[:, np.newaxis]])
+    soma_rej = w @ g
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        peso = soma[:, :k]
+        votos = soma[:, k:2 * k] / peso
+        segundo = soma[:, 2 * k:3 * k] / peso
+        desvio_medio = soma[:, 3 * k:] / peso
+        rejeicao = np.where(soma_rej[:, :k] > 0, soma_rej[:, k:2 * k] / soma_rej[:, :k], 0.0)
+        indecisos = np.where(soma_rej[:, -2] > 0, soma_rej[:, -1] / soma_rej[:, -2], 0.0)
+    variancia_entre = np.maximum(segundo - votos ** 2, 0.0)
+    desvio = np.sqrt(desvio_medio ** 2 + variancia_entre)
+
+    n_pesquisas = publicadas.astype(float) @ um
+    sem = n_pesquisas == 0
+    for arr in (votos, rejeicao, desvio):
+        arr[sem] = np.nan
+    return {"votos": votos, "rejeicao": rejeicao, "desvio": desvio,
+            "n_pesquisas": n_pesquisas, "indecisos": indecisos}
+
+
+def run_trajectory(
+    estados: dict[str, np.ndarray],
+    candidatos: list[str],
+    desvio: np.ndarray,
+    n_sim: int = 20_000,
+    blank_fraction: float = DEFAULT_BLANK_FRACTION,
+    thresholds=(3.0, 5.0, 10.0, 15.0, 20.0, 25.0),
+    quantiles=(0.05, 0.50, 0.95),
+    rng: np.random.Generator | None = None,
+) -> list[dict]:
+    """
+    Simulates every aggregated date on common random numbers.
+
+    Dates are grouped into runs sharing the same set of polled candidates
+    and evaluated as ``(D_chunk, n, K)`` blocks bounded by MAX_BLOCK.
+
+    Args:
+        estados:        Output of ``aggregate_dates``.
+        candidatos:     Candidate order of its columns.
+        desvio:         (D,) Dirichlet noise term per date (pp).
+        n_sim:          Draws per date.
+        blank_fraction: Undecided fraction sent to blank/null.
+        thresholds:     Margin thresholds (pp).
+        quantiles:      Share and margin quantile levels.
+        rng:            numpy Generator for the shared normals.
+
+    Returns:
+        One dict per date: ``candidatos`` (valid candidates simulated) and
+        the ``summarize_batch`` statistics for that date; None for dates
+        before any poll.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    votos, rejeicao = estados["votos"], estados["rejeicao"]
+    d, k = votos.shape
+    z = rng.standard_normal((n_sim, k))
+    presentes = ~np.isnan(votos)
+
+    saida: list[dict | None] = [None] * d
+    i = 0
+    while i < d:
+        cols = np.flatnonzero(presentes[i])
+        j = i + 1
+        while j < d and np.array_equal(presentes[j], presentes[i]):
+            j += 1
+        if len(cols):
+            nomes = [candidatos[c] for c in cols]
+            mask = mascara_validos(nomes)
+            validos = [c for c, ok in zip(nomes, mask) if ok]
+            passo = max(1, MAX_BLOCK // (n_sim * len(cols)))
+            for ini in range(i, j, passo):
+                fim = min(ini + passo, j)
+                efetivos = redistribute_undecided(
+                    votos[ini:fim][:, cols], rejeicao[ini:fim][:, cols],
+                    estados["indecisos"][ini:fim], np.full(fim - ini, blank_fraction), mask,
+                )
+                alphas = dirichlet_alphas(efetivos, np.asarray(desvio[ini:fim], dtype=float))
+                zb = np.broadcast_to(z[:, np.newaxis, cols], (n_sim, fim - ini, len(cols)))
+                g = np.moveaxis(gamma_from_normals(zb, alphas), 0, 1)
+                stats = summarize_batch(
+                    valid_shares_from_gammas(g, rejeicao[ini:fim][:, cols], mask),
+                    thresholds, quantiles,
+                )
+                for b in range(fim - ini):
+                    saida[ini + b] = {"candidatos": validos,
+                                      **{chave: v[b] for chave, v in stats.items()}}
+        i = j
+    return saida
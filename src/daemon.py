@@ -0,0 +1,574 @@
+"""
+brazil-election-montecarlo — poll-feed daemon
+=============================================
+Long-running process that republishes the first-round forecast whenever
+the polls change, instead of a cron job paying a cold
+``python src/simulation_v2.py`` start (imports, aggregation, sampling) on
+every refresh.
+
+Sources:
+    - the poll CSV (data/pesquisas.csv), re-read when its size or mtime changes;
+    - optionally a JSONL feed, one poll row per line with the CSV columns::
+
+        {"candidato": "Lula", "intencao_voto_pct": 38.0, "rejeicao_pct": 42.0,
+         "desvio_padrao_pct": 2.0, "indecisos_pct": 6.0,
+         "instituto": "Quaest", "data": "2026-10-18"}
+
+      Only the bytes appended since the last read are parsed (a half-written
+      last line waits for the next pass).  A line that is not a JSON object
+      with the required columns and numeric values is logged and skipped on
+      its own; a feed row with the same (instituto, data, candidato) as an
+      earlier feed row replaces it (CSV rows are used as they are, like
+      carregar_pesquisas() does).
+
+Pipeline on every change (after ``--debounce`` seconds without further
+changes, so a burst of writes triggers one run):
+
+    1. aggregation   — in the daemon, agregar_tabela_pesquisas() with
+                       agregar_pesquisas_candidato() re-run only for
+                       candidates whose poll rows changed (cache reset at
+                       midnight, since the temporal weights depend on the date);
+    2. summary       — first and second round draws reduced to the
+                       --summary-only JSON, in a worker process;
+    3. charts        — the v2.5 dashboard figure, in a process of its own.
+
+A stage runs only when its input changed: polls that aggregate to the same
+numbers publish nothing, and a chart render still running when newer polls
+arrive is discarded instead of published.  Charts have their own process so
+a render (seconds) never delays the next summary; the chart process redraws
+the summary's sample from the same seed.  A pass that fails (unusable polls,
+a crashed worker) is logged and leaves the last published forecast in place.
+Outputs are written to a temporary file in the same directory and moved into
+place with os.replace(), so readers never see a partial file.
+
+Usage:
+    python src/daemon.py
+    python src/daemon.py --feed data/feed.jsonl --n-sim 20000
+    python -m src watch --no-charts
+    python src/daemon.py --once          # publish once and exit
+
+License: MIT
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.core.config import PollData
+from src.core.sampling import METHODS as METODOS_AMOSTRAGEM
+import src.simulation_v2 as sv
+
+# ─── CONFIG ───────────────────────────────────────────────────────────────────
+
+INTERVALO = 0.2      # s between stat() checks of the sources
+DEBOUNCE = 0.5       # s without changes before a run starts
+RESUMO_PATH = sv.OUTPUT_DIR / "resumo_1turno.json"
+COLUNAS_CHAVE = ["instituto", "data", "candidato"]
+COLUNAS_FEED = ["candidato", "intencao_voto_pct", "desvio_padrao_pct"]
+COLUNAS_NUMERICAS = ["intencao_voto_pct", "desvio_padrao_pct", "rejeicao_pct", "indecisos_pct"]
+
+
+def log(msg: str) -> None:
+    """Timestamped line on stdout (the daemon's log)."""
+    print(f"[{datetime.now():%H:%M:%S}] {msg}", flush=True)
+
+
+def publicar_atomico(destino, conteudo) -> Path:
+    """Writes ``conteudo`` (str, bytes or an existing temp file Path) to ``destino`` atomically."""
+    destino = Path(destino)
+    if isinstance(conteudo, Path):
+        os.replace(conteudo, destino)
+        return destino
+    tmp = destino.with_name(f".{destino.name}.tmp")
+    if isinstance(conteudo, str):
+        tmp.write_text(conteudo, encoding="utf-8")
+    else:
+        tmp.write_bytes(conteudo)
+    os.replace(tmp, destino)
+    return destino
+
+
+# ─── SOURCES ──────────────────────────────────────────────────────────────────
+
+def validar_linha_feed(linha: bytes) -> dict:
+    """
+    One JSONL feed line → poll row.
+
+    Raises:
+        ValueError: Not a JSON object, a required column is missing, or a
+                    numeric column holds anything but a finite number
+                    (the optional ones may be null).
+    """
+    linha_dict = json.loads(linha)
+    if not isinstance(linha_dict, dict):
+        raise ValueError(f"expected a JSON object, got {type(linha_dict).__name__}")
+    faltando = [c for c in COLUNAS_FEED if c not in linha_dict]
+    if faltando:
+        raise ValueError(f"missing columns {faltando}")
+    if not isinstance(linha_dict["candidato"], str) or not linha_dict["candidato"]:
+        raise ValueError(f"invalid candidato {linha_dict['candidato']!r}")
+    for coluna in COLUNAS_NUMERICAS:
+        valor = linha_dict.get(coluna)
+        if valor is None and coluna not in COLUNAS_FEED:
+            continue
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not np.isfinite(valor):
+            raise ValueError(f"{coluna} must be a number, got {valor!r}")
+    return linha_dict
+
+
+class FontePesquisas:
+    """
+    Poll CSV plus optional JSONL feed, read incrementally.
+
+    Args:
+        csv_path:  Poll CSV (may be None when only the feed is used).
+        feed_path: JSONL feed of poll rows (may not exist yet).
+        log:       Called with a message for every skipped feed line.
+    """
+
+    def __init__(self, csv_path=None, feed_path=None, log=log):
+        self.csv_path = Path(csv_path) if csv_path else None
+        self.feed_path = Path(feed_path) if feed_path else None
+        self.log = log
+        self._assinaturas: dict[Path, tuple] = {}
+        self._csv = pd.DataFrame()
+        self._feed: list[dict] = []
+        self._offset = 0
+        self._resto = b""
+        self._linha = 0         # feed lines consumed so far, for the log
+
+    @staticmethod
+    def _assinatura(caminho: Path) -> tuple:
+        try:
+            st = caminho.stat()
+        except FileNotFoundError:
+            return ()
+        return (st.st_size, st.st_mtime_ns)
+
+    def verificar(self) -> bool:
+        """True when any source changed since the last call (stat only, no reads)."""
+        mudou = False
+        for caminho in filter(None, (self.csv_path, self.feed_path)):
+            assinatura = self._assinatura(caminho)
+            if self._assinaturas.get(caminho) != assinatura:
+                self._assinaturas[caminho] = assinatura
+                mudou = True
+        return mudou
+
+    def ler(self) -> pd.DataFrame:
+        """Current poll table: the CSV rows followed by the feed rows."""
+        if self.csv_path is not None and self.csv_path.exists():
+            self._csv = pd.read_csv(self.csv_path)
+        if self.feed_path is not None and self.feed_path.exists():
+            self._ler_feed()
+
+        feed = pd.DataFrame(self._feed)
+        if set(COLUNAS_CHAVE) <= set(feed.columns):
+            # Corrections: a later feed row for the same poll replaces the earlier one
+            feed = feed[~feed[COLUNAS_CHAVE].astype(str).duplicated(keep="last")]
+        partes = [p for p in (self._csv, feed) if len(p)]
+        if not partes:
+            raise ValueError("No poll rows in the watched sources")
+        df = pd.concat(partes, ignore_index=True)
+        if "data" in df.columns:
+            df["data"] = pd.to_datetime(df["data"], errors="coerce").dt.date
+        return df
+
+    def _ler_feed(self) -> None:
+        tamanho = self.feed_path.stat().st_size
+        if tamanho < self._offset:          # truncated or rotated: start over
+            self._feed, self._offset, self._resto, self._linha = [], 0, b"", 0
+        with open(self.feed_path, "rb") as f:
+            f.seek(self._offset)
+            novo = f.read()
+        self._offset += len(novo)
+        *linhas, self._resto = (self._resto + novo).split(b"\n")
+        for linha in linhas:
+            self._linha += 1
+            if not linha.strip():
+                continue
+            try:
+                self._feed.append(validar_linha_feed(linha))
+            except ValueError as exc:       # includes JSONDecodeError / UnicodeDecodeError
+                self.log(f"{self.feed_path}:{self._linha}: skipped feed line ({exc})")
+
+
+# ─── INCREMENTAL AGGREGATION ──────────────────────────────────────────────────
+
+class AgregadorIncremental:
+    """
+    carregar_pesquisas() with a per-candidate cache.
+
+    Runs the same agregar_tabela_pesquisas() as the batch path, with each
+    candidate's agregar_pesquisas_candidato() result keyed by a hash of its
+    poll rows; only candidates whose rows changed are re-aggregated.  The
+    cache is dropped when the reference date changes.
+    """
+
+    def __init__(self):
+        self.data_ref: date | None = None
+        self._cache: dict[str, tuple[str, tuple]] = {}
+        self._alterados: list[str] = []
+
+    @staticmethod
+    def _hash(df: pd.DataFrame) -> str:
+        return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+    def atualizar(self, df: pd.DataFrame, data_ref: date | None = None) -> tuple[PollData, list[str]]:
+        """
+        Aggregated polls at ``data_ref`` (default: today).
+
+        Returns:
+            (PollData, candidates re-aggregated in this call)
+
+        Raises:
+            ValueError: A candidate aggregates to a NaN or non-positive share.
+        """
+        data_ref = data_ref or date.today()
+        if data_ref != self.data_ref:
+            self._cache.clear()
+            self.data_ref = data_ref
+
+        self._alterados = []
+        candidatos, votos, rejeicao, desvio_base, indecisos, _ = sv.agregar_tabela_pesquisas(
+            df, data_ref, agregar_candidato=self._agregar_candidato
+        )
+        for cand in set(self._cache) - set(candidatos):
+            del self._cache[cand]
+        with contextlib.redirect_stdout(io.StringIO()):
+            sv.validar_votos_agregados(candidatos, votos)
+
+        poll = PollData(
+            candidatos=candidatos,
+            votos_media=votos,
+            rejeicao=rejeicao,
+            desvio_base=desvio_base,
+            indecisos=indecisos,
+        )
+        return poll, self._alterados
+
+    def _agregar_candidato(self, df_cand: pd.DataFrame, data_ref: date) -> tuple:
+        cand = df_cand["candidato"].iloc[0]
+        chave = self._hash(df_cand)
+        if cand not in self._cache or self._cache[cand][0] != chave:
+            self._cache[cand] = (chave, sv.agregar_pesquisas_candidato(df_cand, data_ref))
+            self._alterados.append(cand)
+        return self._cache[cand][1]
+
+
+def chave_poll(poll: PollData, data_ref: date | None = None) -> str:
+    """
+    Hash of the aggregated numbers and of the reference date, which sets the
+    days to election (hence DESVIO and the error-bank weights): equal keys
+    mean the forecast cannot change.
+    """
+    h = hashlib.sha1(json.dumps(poll.candidatos, ensure_ascii=False).encode())
+    h.update(str(data_ref).encode())
+    for arr in (poll.votos_media, poll.rejeicao, [poll.desvio_base, poll.indecisos]):
+        h.update(np.round(np.asarray(arr, dtype=float), 10).tobytes())
+    return h.hexdigest()[:16]
+
+
+# ─── WORKER STAGES ────────────────────────────────────────────────────────────
+# Run in the worker processes; module-level so they can be pickled.  Each
+# worker keeps the last draws so the chart stage of a version reuses the
+# sample its summary stage drew.
+
+_AMOSTRAS: dict[str, tuple] = {}
+
+
+def _iniciar_worker(banco_erros=None):
+    """Warm start: simulation_v2 is already imported; load the optional error bank."""
+    if banco_erros:
+        with contextlib.redirect_stdout(io.StringIO()):
+            sv.carregar_banco_erros(banco_erros)
+
+
+def _amostras(poll, chave, data_ref, n_sim, metodo, semente):
+    sv.aplicar_poll_data(poll, data_ref)
+    if chave not in _AMOSTRAS:
+        np.random.seed(semente)
+        amostras = sv.amostrar_primeiro_turno(n_sim, verbose=False, metodo=metodo)
+        _AMOSTRAS.clear()
+        _AMOSTRAS[chave] = (amostras, sv.amostrar_segundo_turno(
+            amostras["validos_final"], amostras["candidatos_validos"]
+        ))
+    return _AMOSTRAS[chave]
+
+
+def etapa_resumo(poll, chave, data_ref, n_sim, metodo, semente) -> dict:
+    """Summary stage: the --summary-only JSON for ``poll``."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        amostras, amostras_2t = _amostras(poll, chave, data_ref, n_sim, metodo, semente)
+        return sv.resumo_primeiro_turno(amostras, amostras_2t)
+
+
+def etapa_graficos(poll, chave, data_ref, n_sim, metodo, semente, destino) -> Path:
+    """Chart stage: renders the dashboard figure to ``destino`` (a temp path)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        amostras, _ = _amostras(poll, chave, data_ref, n_sim, metodo, semente)
+        df1, info_lim_1t, info_indecisos, _, _ = sv.simular_primeiro_turno(amostras)
+        pv, p2v, p2t = sv.relatorio(df1, pd.DataFrame(), info_lim_1t, {}, info_indecisos)
+        sv.graficos(df1, pd.DataFrame(), None, pv, p2v, p2t, info_lim_1t, {}, info_indecisos,
+                    destino=destino)
+    return Path(destino)
+
+
+# ─── DAEMON ───────────────────────────────────────────────────────────────────
+
+class DaemonPesquisas:
+    """
+    Watches the sources and republishes the forecast on change.
+
+    Args:
+        fonte:       FontePesquisas to watch.
+        n_sim:       Draws per run (default: simulation_v2.N_SIM).
+        metodo:      Sampling back-end.
+        semente:     Seed of every run (same polls → same forecast).
+        workers:     Worker processes of the summary stage (charts get one
+                     more of their own); 0 runs both stages, one after the
+                     other, in a thread of this process (no isolation, for
+                     tests and debugging).
+        graficos:    Also render the dashboard figure.
+        resumo_path: Where the summary JSON is published.
+        grafico_path: Where the figure is published.
+        banco_erros: Empirical error bank NPZ for the workers (optional).
+        debounce:    Quiet period (s) before a run.
+        intervalo:   Polling interval (s) of the sources.
+    """
+
+    def __init__(self, fonte, n_sim=None, metodo="random", semente=42, workers=1,
+                 graficos=True, resumo_path=RESUMO_PATH, grafico_path=None,
+                 banco_erros=None, debounce=DEBOUNCE, intervalo=INTERVALO):
+        self.fonte = fonte
+        self.agregador = AgregadorIncremental()
+        self.n_sim = n_sim or sv.N_SIM
+        self.metodo = metodo
+        self.semente = semente
+        self.graficos = graficos
+        self.resumo_path = Path(resumo_path)
+        self.grafico_path = Path(grafico_path or sv.GRAFICO_PATH)
+        self.debounce = debounce
+        self.intervalo = intervalo
+        self.versao = 0
+        self.chave: str | None = None
+        self._workers = workers
+        self._banco_erros = banco_erros
+        if workers:
+            self._pool = self._novo_pool(workers)
+            self._pool_graficos = self._novo_pool(1) if graficos else None
+        else:
+            _iniciar_worker(banco_erros)
+            self._pool = self._pool_graficos = ThreadPoolExecutor(1)
+        self._tarefa_graficos: asyncio.Task | None = None
+        self._parar = asyncio.Event()
+
+    def log(self, msg: str) -> None:
+        log(msg)
+
+    def _novo_pool(self, n: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(n, initializer=_iniciar_worker, initargs=(self._banco_erros,))
+
+    def _reiniciar_pool(self, graficos: bool = False) -> None:
+        """Replaces the summary (or chart) pool after one of its processes died."""
+        if not self._workers:
+            return
+        if graficos:
+            self._pool_graficos.shutdown(wait=False, cancel_futures=True)
+            self._pool_graficos = self._novo_pool(1)
+        else:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._novo_pool(self._workers)
+
+    async def _em_worker(self, funcao, *args, pool=None):
+        return await asyncio.get_running_loop().run_in_executor(pool or self._pool, funcao, *args)
+
+    async def processar(self) -> bool:
+        """
+        One pass of the pipeline; True when a new forecast was published.
+
+        Any failure (unusable polls, an exception in a worker, a worker that
+        died) is logged and returns False with the last published forecast
+        and its version left in place, so the daemon keeps running.
+        """
+        chave, versao = self.chave, self.versao
+        try:
+            return await self._processar()
+        except Exception as exc:
+            self.chave, self.versao = chave, versao
+            if isinstance(exc, BrokenProcessPool):
+                self._reiniciar_pool()
+                self.log(f"Worker process died, restarted the pool; keeping the last forecast: {exc}")
+            else:
+                self.log(f"Update failed, keeping the last forecast: {type(exc).__name__}: {exc}")
+            return False
+
+    async def _processar(self) -> bool:
+        inicio = time.perf_counter()
+        poll, alterados = self.agregador.atualizar(self.fonte.ler())
+        chave = chave_poll(poll, self.agregador.data_ref)
+        if chave == self.chave:
+            self.log("Sources changed but the aggregate did not; nothing to publish")
+            return False
+
+        self.chave, self.versao = chave, self.versao + 1
+        versao, data_ref = self.versao, self.agregador.data_ref
+        args = (poll, chave, data_ref, self.n_sim, self.metodo, self.semente)
+        if alterados:
+            self.log(f"v{versao}: re-aggregated {', '.join(alterados)}")
+
+        resumo = await self._em_worker(etapa_resumo, *args)
+        if versao != self.versao:
+            return False
+        resumo["gerado_em"] = datetime.now().isoformat(timespec="seconds")
+        resumo["versao"] = versao
+        texto = json.dumps(resumo, ensure_ascii=False, indent=2, allow_nan=False)
+        publicar_atomico(self.resumo_path, texto)
+        self.log(f"v{versao}: summary published to {self.resumo_path} "
+                 f"({time.perf_counter() - inicio:.2f}s)")
+
+        if self.graficos:
+            # A render already in a worker cannot be interrupted; it finishes
+            # and is discarded by the version check.
+            self._tarefa_graficos = asyncio.create_task(self._publicar_graficos(versao, args))
+        return True
+
+    async def _publicar_graficos(self, versao, args) -> None:
+        tmp = self.grafico_path.with_name(f".{self.grafico_path.stem}.v{versao}.tmp.png")
+        inicio = time.perf_counter()
+        try:
+            await self._em_worker(etapa_graficos, *args, tmp, pool=self._pool_graficos)
+        except Exception as exc:
+            tmp.unlink(missing_ok=True)
+            if isinstance(exc, BrokenProcessPool):
+                self._reiniciar_pool(graficos=True)
+            self.log(f"v{versao}: chart failed: {type(exc).__name__}: {exc}")
+            return
+        if versao != self.versao:
+            tmp.unlink(missing_ok=True)
+            self.log(f"v{versao}: chart superseded by v{self.versao}, discarded")
+            return
+        publicar_atomico(self.grafico_path, tmp)
+        self.log(f"v{versao}: chart published to {self.grafico_path} "
+                 f"({time.perf_counter() - inicio:.2f}s)")
+
+    async def executar(self, uma_vez: bool = False) -> None:
+        """
+        Main loop: stat the sources, debounce, run the pipeline; until stop().
+        A new day also reruns it, since the days to election move DESVIO.
+        """
+        self.fonte.verificar()
+        await self.processar()
+        if uma_vez:
+            if self._tarefa_graficos is not None:
+                await self._tarefa_graficos
+            return
+
+        self.log(f"Watching {', '.join(str(p) for p in (self.fonte.csv_path, self.fonte.feed_path) if p)}")
+        ultima_mudanca = None
+        while not self._parar.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._parar.wait(), self.intervalo)
+            agora = time.monotonic()
+            if self.fonte.verificar():
+                ultima_mudanca = agora
+            elif ultima_mudanca is not None and agora - ultima_mudanca >= self.debounce:
+                ultima_mudanca = None
+                await self.processar()
+            elif self.agregador.data_ref not in (None, date.today()):
+                await self.processar()
+
+    def stop(self) -> None:
+        self._parar.set()
+
+    def fechar(self) -> None:
+        for pool in {self._pool, self._pool_graficos} - {None}:
+            pool.shutdown(cancel_futures=True)
+
+
+# ─── MAIN ─────────────────────────────────────────────────────────────────────
+
+def main(argv=None, prog=None):
+    """
+    Command-line entry point (also ``python -m src watch``).
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:]).
+        prog: Program name shown in usage messages.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Poll-feed daemon: republishes the forecast whenever the polls change.",
+    )
+    parser.add_argument("--polls", default="data/pesquisas.csv", metavar="CSV",
+                        help="Poll CSV to watch (default: data/pesquisas.csv).")
+    parser.add_argument("--feed", default=None, metavar="JSONL",
+                        help="JSONL feed of new poll rows, read incrementally.")
+    parser.add_argument("--n-sim", type=int, default=None, metavar="N",
+                        help=f"Draws per run (default: {sv.N_SIM:,}).")
+    parser.add_argument("--sampling", choices=METODOS_AMOSTRAGEM, default=sv.AMOSTRAGEM,
+                        help="Dirichlet sampling back-end (default: random).")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Seed of every run, so unchanged polls give an unchanged forecast.")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Worker processes for the summary stage (default: 1); "
+                             "charts render in one more process of their own.")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, metavar="S",
+                        help=f"Seconds without changes before a run (default: {DEBOUNCE}).")
+    parser.add_argument("--interval", type=float, default=INTERVALO, metavar="S",
+                        help=f"Seconds between source checks (default: {INTERVALO}).")
+    parser.add_argument("--no-charts", action="store_true",
+                        help="Publish the summary JSON only.")
+    parser.add_argument("--summary-out", default=str(RESUMO_PATH), metavar="PATH",
+                        help=f"Published summary (default: {RESUMO_PATH}).")
+    parser.add_argument("--chart-out", default=str(sv.GRAFICO_PATH), metavar="PNG",
+                        help=f"Published figure (default: {sv.GRAFICO_PATH}).")
+    parser.add_argument("--empirical-error", nargs="?", const=str(sv.BANCO_ERROS_PATH),
+                        default=None, metavar="NPZ",
+                        help="Add historical poll errors to the draws (see simulation_v2).")
+    parser.add_argument("--once", action="store_true",
+                        help="Publish once from the current sources and exit.")
+    args = parser.parse_args(argv)
+
+    async def _rodar():
+        daemon = DaemonPesquisas(
+            FontePesquisas(args.polls, args.feed),
+            n_sim=args.n_sim, metodo=args.sampling, semente=args.seed,
+            workers=args.workers, graficos=not args.no_charts,
+            resumo_path=args.summary_out, grafico_path=args.chart_out,
+            banco_erros=args.empirical_error,
+            debounce=args.debounce, intervalo=args.interval,
+        )
+        loop = asyncio.get_running_loop()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(sinal, daemon.stop)
+        try:
+            await daemon.executar(uma_vez=args.once)
+        finally:
+            daemon.fechar()
+
+    asyncio.run(_rodar())
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ import streamlit as st
 # Allow running from project root or from src/
 sys.path.insert(0, str(Path(__file__).parent))
 import simulation_v2 as sim
+from src.io.history import HistoryStore
 
 # ─── PAGE CONFIG ──────────────────────────────────────────────────────────────
 
@@ -93,12 +94,27 @@ with st.sidebar:
         },
     )
 
+    # ── Analytic preview: recomputed on every edit, no simulation needed ──────
+    previa_path = Path(tempfile.gettempdir()) / "previa_pesquisas.csv"
+    try:
+        df_edited.to_csv(previa_path, index=False, encoding='utf-8')
+        previa = sim.previa_analitica(sim.carregar_poll_data(previa_path))
+        st.markdown("**Prévia analítica** (aproximação, sem simulação)")
+        lideres = sorted(previa.win_prob.items(), key=lambda kv: kv[1], reverse=True)[:2]
+        cols_prev = st.columns(len(lideres) + 1)
+        for col, (cand, prob) in zip(cols_prev, lideres):
+            col.metric(cand.split()[0], f"{prob * 100:.1f}%", help="Liderança no 1º turno")
+        cols_prev[-1].metric("2º turno", f"{previa.p2t * 100:.1f}%")
+    except Exception as e:
+        st.caption(f"Prévia indisponível: {e}")
+
     st.divider()
     n_sim = st.select_slider(
         "Simulações",
-        options=[5_000, 10_000, 20_000, 40_000],
+        options=[5_000, 10_000, 20_000, 40_000, 100_000, 200_000],
         value=40_000,
-        help="Mais simulações = mais precisão, mais tempo de execução",
+        help="Mais simulações = mais precisão, mais tempo de execução. "
+             "Aumentar o número reaproveita as simulações já feitas com os mesmos dados.",
     )
 
     run_btn = st.button("▶ Rodar simulação", type="primary", use_container_width=True)
@@ -136,11 +152,16 @@ if run_btn:
             sim.N_SIM = n_sim
 
             trace = sim.construir_modelo()
+            amostras = sim.amostrar_primeiro_turno_pool(n_sim)
             df1, info_lim_1t, info_indecisos, validos_final, candidatos_validos = (
-                sim.simular_primeiro_turno()
+                sim.simular_primeiro_turno(amostras)
             )
             df2, info_matchups = sim.simular_segundo_turno(validos_final, candidatos_validos)
-            pv, p2v, p2t = sim.relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos)
+            resultado = sim.montar_resultado(df1, df2, info_lim_1t, info_matchups, info_indecisos)
+            sim.registrar_historico(resultado)
+            pv, p2v, p2t = sim.relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos,
+                                         resumo=resultado.summary)
+            sensib = sim.sensibilidades(amostras) if sim.BANCO_ERROS is None else None
 
             # Generate visualization and PDF
             sim.graficos(df1, df2, trace, pv, p2v, p2t,
@@ -151,12 +172,18 @@ if run_btn:
 
             st.session_state.update({
                 'df1': df1, 'df2': df2, 'pv': pv, 'p2v': p2v, 'p2t': p2t,
+                'resumo': resultado.summary,
+                'sensib': sensib,
                 'info_matchups': info_matchups, 'info_indecisos': info_indecisos,
                 'candidatos_validos': candidatos_validos,
                 'pdf_path': str(pdf_path),
                 'ran': True,
             })
-            st.success("Simulação concluída!")
+            pool = amostras['pool']
+            st.success(
+                f"Simulação concluída! {pool['n_reusados']:,} simulações "
+                f"reaproveitadas, {pool['n_novos']:,} novas."
+            )
 
         except Exception as e:
             st.error(f"Erro na simulação: {e}")
@@ -173,6 +200,7 @@ if st.session_state.get('ran'):
     p2t           = st.session_state['p2t']
     info_matchups = st.session_state['info_matchups']
     candidatos_v  = st.session_state['candidatos_validos']
+    resumo        = st.session_state['resumo']
 
     # ── Key metrics ────────────────────────────────────────────────────────────
     st.divider()
@@ -189,21 +217,20 @@ if st.session_state.get('ran'):
         st.image(str(img_path), use_column_width=True)
 
     # ── Tabs: First round / Second round / Absolute votes / Downloads ──────────
-    tab1, tab2, tab3, tab4 = st.tabs(
-        ["1º Turno", "2º Turno", "Votos Absolutos", "Downloads"]
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["1º Turno", "2º Turno", "Votos Absolutos", "Downloads", "Histórico"]
     )
 
     with tab1:
         st.markdown("#### Intenção de voto — 1º turno (votos válidos, IC 90%)")
         rows = []
-        for cand in candidatos_v:
-            col_v = f"{cand}_val"
-            serie = df1[col_v] if col_v in df1.columns else df1[cand]
+        for i, cand in enumerate(resumo.candidates):
             rows.append({
                 "Candidato": cand,
-                "Média (%)": f"{serie.mean():.2f}",
-                "IC 5%": f"{serie.quantile(0.05):.2f}",
-                "IC 95%": f"{serie.quantile(0.95):.2f}",
+                "Média (%)": f"{resumo.mean[i]:.2f}",
+                "EP MC": f"±{resumo.quantile_se(cand, 0.50):.3f}",
+                "IC 5%": f"{resumo.quantile(cand, 0.05):.2f}",
+                "IC 95%": f"{resumo.quantile(cand, 0.95):.2f}",
                 "Rejeição (%)": f"{sim.REJEICAO[sim.CANDIDATOS.index(cand)]:.1f}"
                                 if sim.REJEICAO[sim.CANDIDATOS.index(cand)] > 0 else "N/A",
             })
@@ -213,20 +240,22 @@ if st.session_state.get('ran'):
         if "margem_1t" in df1.columns:
             st.markdown("#### Distribuição da margem — 1º turno")
             m = df1["margem_1t"]
-            p5_m, p50_m, p95_m = m.quantile([0.05, 0.50, 0.95])
             col_m1, col_m2, col_m3 = st.columns(3)
-            col_m1.metric("Mediana da margem", f"{p50_m:.1f}pp")
-            col_m2.metric("Corrida apertada (<3pp)", f"{(m < 3).mean() * 100:.1f}%")
-            col_m3.metric("Confortável (>10pp)", f"{(m > 10).mean() * 100:.1f}%")
-
-            thr_rows = [
-                {
+            col_m1.metric("Mediana da margem", f"{resumo.margin_quantile(0.50):.1f}pp",
+                          help=f"Erro MC (batch means): ±{resumo.margin_quantile_se(0.50):.2f}pp")
+            col_m2.metric("Corrida apertada (<3pp)", f"{resumo.prob_margin_below(3) * 100:.1f}%")
+            col_m3.metric("Confortável (>10pp)", f"{resumo.prob_margin_above(10) * 100:.1f}%")
+
+            thr_rows = []
+            for thr in sim.MARGIN_THRESHOLDS:
+                est = resumo.margin_above_estimate(thr)
+                thr_rows.append({
                     "Threshold": f"> {thr}pp",
-                    "P(margem > X)": f"{(m > thr).mean() * 100:.1f}%",
+                    "P(margem > X)": f"{est['p'] * 100:.1f}%",
+                    "Erro MC": f"±{est['se'] * 100:.2f}pp",
+                    "IC 95% (Wilson)": f"[{est['low'] * 100:.2f} – {est['high'] * 100:.2f}]",
                     "Polymarket": "← mercado" if thr == 15 else "",
-                }
-                for thr in sim.MARGIN_THRESHOLDS
-            ]
+                })
             st.dataframe(
                 pd.DataFrame(thr_rows),
                 use_container_width=True,
@@ -254,6 +283,32 @@ if st.session_state.get('ran'):
         st.markdown("**Probabilidade de vitória no 1º turno**")
         st.dataframe(pv_str, use_container_width=True, hide_index=True)
 
+        # ── Sensitivities (score-function, same draws) ────────────────────────
+        sensib = st.session_state.get('sensib')
+        if sensib is not None and not sensib.empty:
+            st.markdown("#### Sensibilidades — variação por +1pp no input")
+            alvos = sim.alvos_tornado(sensib, resumo, maximo=10) or sorted(set(sensib["alvo"]))
+            alvo = st.selectbox("Probabilidade", alvos, key="alvo_tornado")
+            top = sim.tornado(sensib, alvo, top=10).iloc[::-1]
+
+            fig_t, ax_t = plt.subplots(figsize=(8, 0.35 * len(top) + 1), facecolor="#F7F7F7")
+            ax_t.set_facecolor("#F7F7F7")
+            cores_t = ["#2ecc71" if v > 0 else "#e74c3c" for v in top["efeito"]]
+            ax_t.barh(top["entrada"], top["efeito"] * 100, xerr=top["ep"] * 196,
+                      color=cores_t, alpha=0.8, ecolor="#555555", capsize=2)
+            ax_t.axvline(0, color="#333333", lw=0.8)
+            ax_t.set_xlabel(f"Δ {alvo} (pp) por +1pp  ·  barras: IC 95% MC", fontsize=9)
+            ax_t.tick_params(labelsize=8)
+            for spine in ax_t.spines.values():
+                spine.set_visible(False)
+            st.pyplot(fig_t, use_container_width=True)
+            plt.close(fig_t)
+            st.caption(
+                "Estimador de razão de verossimilhança (score function) sobre os mesmos "
+                "sorteios da simulação; rejeição inclui o efeito do teto por diferença "
+                "finita com números aleatórios comuns."
+            )
+
     with tab2:
         st.markdown("#### Confrontos no 2º turno")
         if info_matchups:
@@ -373,6 +428,24 @@ if st.session_state.get('ran'):
                     f, file_name="relatorio_eleicoes_brasil_2026.pdf",
                     mime="application/pdf",
                 )
+
+    with tab5:
+        st.markdown("#### Evolução da previsão (execuções salvas)")
+        metrica = st.radio(
+            "Métrica", ["pv", "qualifica", "mediana", "p2t"], horizontal=True,
+            format_func={"pv": "Lidera o 1º turno", "qualifica": "Vai ao 2º turno",
+                         "mediana": "Mediana de votos válidos (%)",
+                         "p2t": "Probabilidade de 2º turno"}.get,
+        )
+        serie = HistoryStore(sim.HISTORICO_PATH).series(metrica=metrica)
+        if serie.empty:
+            st.info("Nenhuma execução salva ainda.")
+        else:
+            tabela = serie.pivot_table(index="timestamp", columns="candidato",
+                                       values="valor", aggfunc="last")
+            st.line_chart(tabela.rename(columns={"": "2º turno"}))
+            st.caption(f"{serie['run_id'].nunique()} execuções em {sim.HISTORICO_PATH}")
+
     # ── Polymarket edge calculator (v2.8) ──────────────────────────────────────
     if "margem_1t" in df1.columns:
         with st.expander("Polymarket Edge Calculator (v2.8)"):
@@ -392,10 +465,16 @@ if st.session_state.get('ran'):
             )
             cand_options = ["(margem absoluta)"] + list(candidatos_v)
             pm_cand = col_p3.selectbox("Candidato (opcional)", cand_options)
+            pm_metodo = st.radio(
+                "Estimador", ["auto", "contagem", "cv", "is"], horizontal=True,
+                help="auto: importance sampling abaixo de 5%, contagem acima · "
+                     "cv: variáveis de controle (médias Beta exatas)",
+            )
 
             if st.button("Calcular edge", key="pm_edge_btn"):
                 cand_arg = None if pm_cand == "(margem absoluta)" else pm_cand
-                result = sim.polymarket_edge(df1, pm_threshold, pm_market, cand_arg)
+                result = sim.polymarket_edge(df1, pm_threshold, pm_market, cand_arg,
+                                             metodo=pm_metodo)
                 col_r1, col_r2, col_r3, col_r4 = st.columns(4)
                 col_r1.metric("P(modelo)", f"{result['model_prob']:.1%}")
                 col_r2.metric("P(Polymarket)", f"{result['market_prob']:.1%}")
@@ -406,12 +485,31 @@ if st.session_state.get('ran'):
                     delta_color="normal" if edge_val > 0 else "inverse",
                 )
                 col_r4.metric("Half-Kelly", f"{result['kelly_fraction']:.2%}")
-                if edge_val <= 0:
+                if result["metodo"] == "is":
+                    metodo_txt = f"importance sampling (ESS {result['ess']:,.0f})"
+                elif result["metodo"] == "cv":
+                    metodo_txt = (f"variáveis de controle (bruto {result['prob_bruta']:.2%}, "
+                                  f"redução de variância ×{result['reducao_variancia']:.1f})")
+                else:
+                    metodo_txt = "contagem"
+                st.caption(
+                    f"Erro MC: ±{result['mc_se']:.2%} · IC 95%: "
+                    f"[{result['ci_low']:.2%} – {result['ci_high']:.2%}] · "
+                    f"z = {result['z_score']:+.1f} com n_sim = {result['n_sim']:,} · "
+                    f"estimador: {metodo_txt}"
+                )
+                if not result["significant"]:
+                    st.warning(
+                        "Edge indistinguível do ruído Monte Carlo neste n_sim "
+                        f"(edge mínimo detectável: ±{result['min_detectable_edge']:.2%}). "
+                        "Aumente o número de simulações."
+                    )
+                elif edge_val <= 0:
                     st.warning("Edge negativo — modelo favorece o lado contrário ou não há vantagem.")
-                elif result["model_prob"] < 0.05:
+                elif result["metodo"] == "is" and result["ess"] < 1_000:
                     st.info(
-                        "model_prob < 5%. Considere reexecutar com --n-sim 200000 "
-                        "para reduzir ruído amostral."
+                        "ESS baixo no importance sampling — a proposta está mal ajustada "
+                        "para este threshold; aumente o número de simulações."
                     )
 else:
     st.info("Configure os dados na barra lateral e clique em **▶ Rodar simulação**.")
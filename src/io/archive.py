@@ -0,0 +1,183 @@
+# src/io/archive.py
+"""
+Indexed archive of historical first-round polls.
+
+The backtests used to read one small CSV per ``(year, snapshot)`` and remap
+candidate aliases row by row on every call.  ``PollArchive`` ingests those
+files once — aliases resolved, rows sorted by ``(election, date)`` — and
+keeps everything in one in-memory table with a parallel array of date
+ordinals.  Queries are binary searches on that array:
+
+- ``polls(election, start, end)`` — every poll of an election in a date range;
+- ``snapshot(election, label)``   — the rows of a curated snapshot, i.e. the
+  date window its CSV covered at ingest (stored in ``windows``).
+
+The on-disk form is a SQLite file with primary keys on
+``(eleicao, data, instituto, candidato)`` and ``(eleicao, snapshot)``; it is
+rebuilt from the CSVs with ``backtesting.py --build-archive``.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+COLUNAS = [
+    "eleicao", "data", "instituto", "candidato", "intencao_voto_pct",
+    "rejeicao_pct", "desvio_padrao_pct", "indecisos_pct",
+]
+_PADRAO_ARQUIVO = re.compile(r"(?P<eleicao>\d{4})_1t_(?P<snapshot>T-\d+)\.csv$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pesquisas (
+    eleicao           TEXT NOT NULL,
+    data              TEXT NOT NULL,
+    instituto         TEXT NOT NULL,
+    candidato         TEXT NOT NULL,
+    intencao_voto_pct REAL NOT NULL,
+    rejeicao_pct      REAL,
+    desvio_padrao_pct REAL NOT NULL,
+    indecisos_pct     REAL,
+    ordem             INTEGER NOT NULL,
+    PRIMARY KEY (eleicao, data, instituto, candidato)
+);
+CREATE TABLE IF NOT EXISTS janelas (
+    eleicao  TEXT NOT NULL,
+    snapshot TEXT NOT NULL,
+    inicio   TEXT NOT NULL,
+    fim      TEXT NOT NULL,
+    PRIMARY KEY (eleicao, snapshot)
+);
+"""
+
+
+class PollArchive:
+    """
+    Date-sorted poll table with binary-search lookups.
+
+    Args:
+        df:      Rows with the COLUNAS columns (``data`` as ``datetime.date``).
+        windows: ``{(eleicao, snapshot): (inicio, fim)}`` snapshot date windows.
+    """
+
+    def __init__(self, df: pd.DataFrame, windows: dict[tuple[str, str], tuple[date, date]] | None = None):
+        df = df.copy()
+        df["eleicao"] = df["eleicao"].astype(str)
+        if "ordem" not in df.columns:
+            df["ordem"] = np.arange(len(df))
+        df["_ord"] = np.array([d.toordinal() for d in df["data"]], dtype=np.int64)
+        df = df.sort_values(["eleicao", "_ord", "ordem"], kind="stable").reset_index(drop=True)
+
+        self._ord = df.pop("_ord").to_numpy()
+        self._df = df[COLUNAS]
+        self.windows = dict(windows or {})
+
+        eleicoes = df["eleicao"].to_numpy()
+        self._faixas: dict[str, tuple[int, int]] = {}
+        for e in pd.unique(eleicoes):
+            idx = np.flatnonzero(eleicoes == e)
+            self._faixas[e] = (int(idx[0]), int(idx[-1]) + 1)
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    @property
+    def elections(self) -> list[str]:
+        return list(self._faixas)
+
+    # ── queries ───────────────────────────────────────────────────────────────
+
+    def polls(self, eleicao: str, inicio: date | None = None, fim: date | None = None) -> pd.DataFrame:
+        """Polls of ``eleicao`` dated in ``[inicio, fim]`` (open ends when None), date-sorted."""
+        lo, hi = self._faixas.get(str(eleicao), (0, 0))
+        ords = self._ord[lo:hi]
+        a = lo if inicio is None else lo + int(np.searchsorted(ords, inicio.toordinal(), side="left"))
+        b = hi if fim is None else lo + int(np.searchsorted(ords, fim.toordinal(), side="right"))
+        return self._df.iloc[a:b].drop(columns="eleicao")
+
+    def has_snapshot(self, eleicao: str, snapshot: str) -> bool:
+        return (str(eleicao), snapshot) in self.windows
+
+    def snapshot(self, eleicao: str, snapshot: str) -> pd.DataFrame:
+        """Rows of a curated snapshot (its ingest date window)."""
+        chave = (str(eleicao), snapshot)
+        if chave not in self.windows:
+            raise FileNotFoundError(f"Snapshot {snapshot} of {eleicao} not in the poll archive")
+        return self.polls(str(eleicao), *self.windows[chave])
+
+    # ── ingest / persistence ──────────────────────────────────────────────────
+
+    @classmethod
+    def from_csvs(cls, diretorio: Path, aliases: dict[str, str] | None = None) -> "PollArchive":
+        """
+        Ingests every ``<year>_1t_<snapshot>.csv`` in ``diretorio``.
+
+        Aliases are mapped once here; a poll present in several files is
+        kept once (last file wins).  Each file's date range becomes its
+        snapshot window.
+        """
+        aliases = aliases or {}
+        partes, windows = [], {}
+        for caminho in sorted(Path(diretorio).glob("*_1t_T-*.csv")):
+            m = _PADRAO_ARQUIVO.search(caminho.name)
+            if m is None:
+                continue
+            df = pd.read_csv(caminho)
+            df["data"] = pd.to_datetime(df["data"], errors="coerce").dt.date
+            df = df.dropna(subset=["data"])
+            faltando = {"candidato", "intencao_voto_pct", "desvio_padrao_pct"} - set(df.columns)
+            if faltando:
+                raise ValueError(f"Missing columns in {caminho.name}: {faltando}")
+            df["candidato"] = df["candidato"].map(lambda x: aliases.get(x, x))
+            df["eleicao"] = m["eleicao"]
+            for col in ("instituto", "rejeicao_pct", "indecisos_pct"):
+                if col not in df.columns:
+                    df[col] = "" if col == "instituto" else np.nan
+            partes.append(df[COLUNAS])
+            windows[(m["eleicao"], m["snapshot"])] = (df["data"].min(), df["data"].max())
+
+        if not partes:
+            raise FileNotFoundError(f"No <year>_1t_<snapshot>.csv files in {diretorio}")
+        df = pd.concat(partes, ignore_index=True)
+        df["ordem"] = np.arange(len(df))
+        df = df.drop_duplicates(subset=["eleicao", "data", "instituto", "candidato"], keep="last")
+        return cls(df, windows)
+
+    def save(self, path) -> None:
+        """Writes the archive to a SQLite file (replacing its contents)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        linhas = self._df.assign(data=self._df["data"].map(date.isoformat),
+                                 ordem=np.arange(len(self._df)))
+        linhas = linhas.astype(object).where(linhas.notna(), None)
+        with sqlite3.connect(path) as con:
+            con.executescript("DROP TABLE IF EXISTS pesquisas; DROP TABLE IF EXISTS janelas;" + _SCHEMA)
+            con.executemany(
+                f"INSERT INTO pesquisas ({', '.join(COLUNAS)}, ordem) "
+                f"VALUES ({', '.join('?' * (len(COLUNAS) + 1))})",
+                linhas[COLUNAS + ["ordem"]].itertuples(index=False, name=None),
+            )
+            con.executemany(
+                "INSERT INTO janelas VALUES (?, ?, ?, ?)",
+                [(e, s, i.isoformat(), f.isoformat()) for (e, s), (i, f) in self.windows.items()],
+            )
+        con.close()
+
+    @classmethod
+    def load(cls, path) -> "PollArchive":
+        """Reads an archive written by ``save``."""
+        with sqlite3.connect(Path(path)) as con:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(COLUNAS)}, ordem FROM pesquisas ORDER BY eleicao, data, ordem", con
+            )
+            janelas = con.execute("SELECT eleicao, snapshot, inicio, fim FROM janelas").fetchall()
+        con.close()
+        df["data"] = pd.to_datetime(df["data"]).dt.date
+        windows = {(e, s): (date.fromisoformat(i), date.fromisoformat(f)) for e, s, i, f in janelas}
+        return cls(df, windows)
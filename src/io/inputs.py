@@ -0,0 +1,53 @@
+# src/io/inputs.py
+"""
+Input-file arguments for the command-line entry points.
+
+Every script that reads poll CSVs (or sweep grids) accepts several paths
+or shell-style globs in one invocation, so a batch refresh runs in one warm
+interpreter instead of paying the numpy/pandas import once per file.
+Globs are expanded here rather than by the shell so quoted patterns work
+the same on every platform.
+"""
+
+from __future__ import annotations
+
+import glob
+from pathlib import Path
+
+
+def expand_inputs(padroes) -> list[Path]:
+    """
+    Paths and glob patterns → existing files, in argument order, without repeats.
+
+    Args:
+        padroes: Iterable of paths or patterns (``*``, ``?``, ``[...]``, ``**``).
+
+    Returns:
+        list of Paths; empty when ``padroes`` is empty.
+
+    Raises:
+        FileNotFoundError: A plain path does not exist or a pattern matches nothing.
+    """
+    arquivos: list[Path] = []
+    for padrao in padroes or ():
+        padrao = str(padrao)
+        if glob.has_magic(padrao):
+            encontrados = sorted(glob.glob(padrao, recursive=True))
+            if not encontrados:
+                raise FileNotFoundError(f"No file matches {padrao!r}")
+        elif Path(padrao).exists():
+            encontrados = [padrao]
+        else:
+            raise FileNotFoundError(f"File not found: {padrao}")
+        for caminho in map(Path, encontrados):
+            if caminho not in arquivos:
+                arquivos.append(caminho)
+    return arquivos
+
+
+def output_for(base: Path, entrada: Path | None, varias: bool) -> Path:
+    """``base`` itself for a single input, ``<base stem>_<input stem><suffix>`` for several."""
+    base = Path(base)
+    if not varias or entrada is None:
+        return base
+    return base.with_name(f"{base.stem}_{Path(entrada).stem}{base.suffix}")
@@ -37,14 +37,17 @@ License: MIT
 import sys
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.patches import Wedge, FancyBboxPatch
-import matplotlib.gridspec as gridspec
 from pathlib import Path
 from datetime import date
 
 # Allow running from project root or from src/
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.adaptive import DEFAULT_TARGET_SE, n_sim_arg, sample_until
+from src.core.runoff import exact_runoff
+from src.core.sampling import METHODS as METODOS_AMOSTRAGEM, sample_dirichlet
+from src.io.inputs import expand_inputs, output_for
 
 from simulation_v2 import (
     agregar_pesquisas_candidato,
@@ -62,9 +65,13 @@ from simulation_v2 import (
 OUTPUT_DIR    = Path("outputs")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+RESULTADOS_PATH = OUTPUT_DIR / "resultados_2turno_standalone.csv"
+GRAFICO_PATH    = OUTPUT_DIR / "simulacao_2turno.png"
+
 DATA_ELEICAO  = date(2026, 10, 4)
 DATA_2T       = date(2026, 10, 25)   # Historical pattern: runoff ~3 weeks after 1st round
 N_SIM         = 40_000
+LIMIARES_2T   = [1, 3, 5]              # pp — close-race thresholds tracked by --n-sim auto
 DESVIO_BASE   = 2.0                  # Overridden by aggregated value from CSV
 
 np.random.seed(42)
@@ -243,9 +250,75 @@ def redistribuir_residual(voto_a, voto_b, rej_a, rej_b, residual, blank_fraction
 
 # ─── SIMULATION ───────────────────────────────────────────────────────────────
 
-def simular(cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual):
+def parametros_dirichlet(voto_a, voto_b, rej_a, rej_b, desvio, residual):
+    """
+    Dirichlet parameters [A, B, blank/null] and rejection ceilings (%) of the runoff.
+
+    Shared by the Monte Carlo sampler and the exact engine so both describe
+    the same model.
+    """
+    # Ensure all Dirichlet alphas are positive (required by numpy)
+    blank_pool = max(residual, 0.1)
+    fator = max(100.0 / desvio, 1.0)
+    alphas = np.array([voto_a, voto_b, blank_pool]) * fator
+    teto_a = max(100.0 - rej_a, 1.0)
+    teto_b = max(100.0 - rej_b, 1.0)
+    return alphas, teto_a, teto_b
+
+
+def amostrar(voto_a, voto_b, rej_a, rej_b, desvio, residual, n_sim, metodo="random"):
+    """
+    Draws ``n_sim`` runoff samples as plain arrays — no DataFrame, no output.
+
+    Sampling core of simular(); also used chunk by chunk by --n-sim auto.
+    ``metodo`` selects the Dirichlet back-end ("random", "sobol" or
+    "antithetic"; see src/core/sampling.py).
+
+    Returns:
+        dict with keys voto_a, voto_b (valid vote shares, %) and
+        abstencao (abstention rate), each of shape (n_sim,)
+    """
+    alphas, teto_a, teto_b = parametros_dirichlet(voto_a, voto_b, rej_a, rej_b, desvio, residual)
+
+    proporcoes = sample_dirichlet(alphas, n_sim, metodo)  # (n_sim, 3)
+
+    # Apply electoral ceiling before computing valid vote shares
+    p_a_raw = proporcoes[:, 0] * 100
+    p_b_raw = proporcoes[:, 1] * 100
+
+    p_a_raw = np.minimum(p_a_raw, teto_a)
+    p_b_raw = np.minimum(p_b_raw, teto_b)
+
+    # Valid vote share excludes blank/null (Brazilian runoff rule)
+    total_valido = p_a_raw + p_b_raw
+
+    # Absolute vote projections
+    abstencao_sim = np.random.normal(ABSTENCAO_2T_MU, ABSTENCAO_2T_SIGMA, n_sim).clip(0.05, 0.45)
+
+    return {
+        "voto_a":    p_a_raw / total_valido * 100,
+        "voto_b":    p_b_raw / total_valido * 100,
+        "abstencao": abstencao_sim,
+    }
+
+
+def contar(amostras, limiares=LIMIARES_2T):
     """
-    Runs 40,000 second-round simulations using a 3-category Dirichlet.
+    Success counts tracked by --n-sim auto: A's victory and P(margin < X).
+
+    B's victory is the complement of A's, so it has the same standard error.
+    """
+    diferenca = np.abs(amostras["voto_a"] - amostras["voto_b"])
+    out = {"vitoria_a": int((amostras["voto_a"] > amostras["voto_b"]).sum())}
+    for thr in limiares:
+        out[f"margem<{thr:g}"] = int((diferenca < thr).sum())
+    return out
+
+
+def simular(cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual,
+            n_sim=None, target_se=DEFAULT_TARGET_SE, metodo="random", destino=None):
+    """
+    Runs the second-round simulations using a 3-category Dirichlet.
 
     The three Dirichlet categories are:
         [candidate A votes, candidate B votes, blank/null votes]
@@ -266,6 +339,11 @@ def simular(cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual):
         rej_b: Rejection rate for B (%)
         desvio: Combined standard deviation for Dirichlet concentration factor
         residual: Final blank/null proportion (Dirichlet third category) (%)
+        n_sim: Number of draws (default: N_SIM), or "auto" to sample until
+               P(A wins) and the close-race probabilities reach ``target_se``
+        target_se: Target Monte Carlo standard error for n_sim="auto"
+        metodo: Dirichlet sampling method — "random", "sobol" or "antithetic"
+        destino: Results CSV (default: RESULTADOS_PATH)
 
     Returns:
         pd.DataFrame: One row per simulation with columns:
@@ -273,38 +351,31 @@ def simular(cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual):
             abstencao_pct, votos_validos,
             votos_a_abs, votos_b_abs, margem_votos
     """
-    print(f"\n[SIM] Running {N_SIM:,} second-round simulations...")
+    n_sim = N_SIM if n_sim is None else n_sim
+    rotulo = f"adaptive (target SE {target_se})" if n_sim == "auto" else f"{n_sim:,}"
+    print(f"\n[SIM] Running {rotulo} second-round simulations...")
     print(f"   {cand_a}: {voto_a:.2f}%  (rejection: {rej_a:.1f}%,  ceiling: {100-rej_a:.1f}%)")
     print(f"   {cand_b}: {voto_b:.2f}%  (rejection: {rej_b:.1f}%,  ceiling: {100-rej_b:.1f}%)")
     print(f"   Blank/null pool: {residual:.2f}%")
 
-    # Ensure all Dirichlet alphas are positive (required by numpy)
-    blank_pool = max(residual, 0.1)
-    fator = max(100.0 / desvio, 1.0)
-    alphas = np.array([voto_a, voto_b, blank_pool]) * fator
-
-    proporcoes = np.random.dirichlet(alphas, size=N_SIM)  # (N_SIM, 3)
-
-    # Apply electoral ceiling before computing valid vote shares
-    teto_a = max(100.0 - rej_a, 1.0)
-    teto_b = max(100.0 - rej_b, 1.0)
-
-    p_a_raw = proporcoes[:, 0] * 100
-    p_b_raw = proporcoes[:, 1] * 100
+    if n_sim == "auto":
+        run = sample_until(
+            lambda n: amostrar(voto_a, voto_b, rej_a, rej_b, desvio, residual, n, metodo),
+            contar,
+            target_se=target_se,
+        )
+        amostras = {k: np.concatenate([c[k] for c in run.chunks]) for k in run.chunks[0]}
+        print(f"   {run.n_sim:,} draws (max SE {run.max_se:.5f} on {run.worst})")
+    else:
+        amostras = amostrar(voto_a, voto_b, rej_a, rej_b, desvio, residual, n_sim, metodo)
 
-    p_a_raw = np.minimum(p_a_raw, teto_a)
-    p_b_raw = np.minimum(p_b_raw, teto_b)
-
-    # Valid vote share excludes blank/null (Brazilian runoff rule)
-    total_valido = p_a_raw + p_b_raw
-    voto_a_sim = p_a_raw / total_valido * 100
-    voto_b_sim = p_b_raw / total_valido * 100
+    voto_a_sim = amostras["voto_a"]
+    voto_b_sim = amostras["voto_b"]
+    abstencao_sim = amostras["abstencao"]
 
     diferenca = np.abs(voto_a_sim - voto_b_sim)
     vencedor  = np.where(voto_a_sim > voto_b_sim, cand_a, cand_b)
 
-    # Absolute vote projections
-    abstencao_sim = np.random.normal(ABSTENCAO_2T_MU, ABSTENCAO_2T_SIGMA, N_SIM).clip(0.05, 0.45)
     votos_validos  = (ELEITORADO * (1.0 - abstencao_sim)).astype(np.int64)
     votos_a_abs    = (votos_validos * voto_a_sim / 100).astype(np.int64)
     votos_b_abs    = (votos_validos * voto_b_sim / 100).astype(np.int64)
@@ -321,43 +392,84 @@ def simular(cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual):
         "margem_votos": np.abs(votos_a_abs - votos_b_abs),
     })
 
-    out = OUTPUT_DIR / "resultados_2turno_standalone.csv"
+    out = destino or RESULTADOS_PATH
     df.to_csv(out, index=False)
     print(f"   Results saved: {out}")
     print("   OK")
     return df
 
 
+def exato(voto_a, voto_b, rej_a, rej_b, desvio, residual, limiares=LIMIARES_2T):
+    """
+    Exact runoff probabilities by quadrature (src/core/runoff.py).
+
+    Same model as amostrar() without sampling error: victory probability,
+    close-race probabilities and share/margin quantiles to ~1e-9 in a
+    fraction of a second.  Absolute vote projections still come from
+    simular(), which adds the abstention draw.
+
+    Returns:
+        RunoffExact (prob_a, mean_a, share_quantiles, margin_quantiles, close_prob)
+    """
+    alphas, teto_a, teto_b = parametros_dirichlet(voto_a, voto_b, rej_a, rej_b, desvio, residual)
+    return exact_runoff(alphas, teto_a, teto_b, thresholds=limiares)
+
+
 # ─── REPORT ───────────────────────────────────────────────────────────────────
 
-def relatorio(df, cand_a, cand_b, rej_a, rej_b):
-    """Prints a structured summary of second-round simulation results."""
+def relatorio(df, cand_a, cand_b, rej_a, rej_b, exata=None):
+    """
+    Prints a structured summary of second-round simulation results.
+
+    With ``exata`` (the RunoffExact from exato()) the victory, vote-share and
+    margin sections use the exact values; the absolute vote projections
+    always come from the simulated ``df``.
+    """
     sep = "=" * 60
     print(f"\n{sep}")
     print("  SECOND ROUND STANDALONE REPORT [v2.7]")
     print(sep)
+    fonte = " (exact)" if exata is not None else ""
 
-    n = len(df)
-    prob_a = (df["vencedor"] == cand_a).mean() * 100
-    prob_b = (df["vencedor"] == cand_b).mean() * 100
+    if exata is not None:
+        prob_a = exata.prob_a * 100
+        prob_b = exata.prob_b * 100
+    else:
+        prob_a = (df["vencedor"] == cand_a).mean() * 100
+        prob_b = (df["vencedor"] == cand_b).mean() * 100
 
-    print(f"\nVictory probability:")
+    print(f"\nVictory probability{fonte}:")
     print(f"  {cand_a:26s} {prob_a:.2f}%")
     print(f"  {cand_b:26s} {prob_b:.2f}%")
 
-    print(f"\nVote share distribution (valid votes, IC 90%):")
-    for label, col, rej in [(cand_a, "voto_a", rej_a), (cand_b, "voto_b", rej_b)]:
-        mean_v = df[col].mean()
-        ci_lo  = df[col].quantile(0.05)
-        ci_hi  = df[col].quantile(0.95)
+    print(f"\nVote share distribution (valid votes, IC 90%){fonte}:")
+    if exata is not None:
+        q = exata.share_quantiles
+        linhas = [
+            (cand_a, rej_a, exata.mean_a, q[0.05], q[0.95]),
+            (cand_b, rej_b, 100 - exata.mean_a, 100 - q[0.95], 100 - q[0.05]),
+        ]
+    else:
+        linhas = [
+            (label, rej, df[col].mean(), df[col].quantile(0.05), df[col].quantile(0.95))
+            for label, col, rej in [(cand_a, "voto_a", rej_a), (cand_b, "voto_b", rej_b)]
+        ]
+    for label, rej, mean_v, ci_lo, ci_hi in linhas:
         print(f"  {label:26s} {mean_v:.2f}%  90% CI: [{ci_lo:.2f}% – {ci_hi:.2f}%]"
               f"  (rej: {rej:.1f}%)")
 
-    print(f"\nMargin of victory:")
-    print(f"  Close race (<3pp):      {(df['diferenca'] < 3).mean() * 100:.1f}% of scenarios")
-    print(f"  Photo-finish (<1pp):    {(df['diferenca'] < 1).mean() * 100:.1f}% of scenarios")
-    print(f"  Comfortable (>5pp):     {(df['diferenca'] >= 5).mean() * 100:.1f}% of scenarios")
-    print(f"  Median margin:          {df['diferenca'].median():.2f}pp")
+    if exata is not None:
+        p_3, p_1 = exata.close_prob[3.0], exata.close_prob[1.0]
+        p_5, mediana = 1.0 - exata.close_prob[5.0], exata.margin_quantiles[0.5]
+    else:
+        p_3, p_1 = (df["diferenca"] < 3).mean(), (df["diferenca"] < 1).mean()
+        p_5, mediana = (df["diferenca"] >= 5).mean(), df["diferenca"].median()
+
+    print(f"\nMargin of victory{fonte}:")
+    print(f"  Close race (<3pp):      {p_3 * 100:.1f}% of scenarios")
+    print(f"  Photo-finish (<1pp):    {p_1 * 100:.1f}% of scenarios")
+    print(f"  Comfortable (>5pp):     {p_5 * 100:.1f}% of scenarios")
+    print(f"  Median margin:          {mediana:.2f}pp")
 
     p5m, p50m, p95m = df["margem_votos"].quantile([0.05, 0.50, 0.95])
     med_abs = df["abstencao_pct"].median()
@@ -377,7 +489,7 @@ def relatorio(df, cand_a, cand_b, rej_a, rej_b):
 
 # ─── VISUALIZATIONS ───────────────────────────────────────────────────────────
 
-def graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b):
+def graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b, destino=None):
     """
     Generates a three-panel visualization for the standalone second-round simulation.
 
@@ -385,7 +497,13 @@ def graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b):
         Left:   Semicircle showing outcome distribution by margin category.
         Top right:  Overlapping vote share distributions for each candidate.
         Bottom right: Absolute margin distribution (millions of votes).
+
+    The figure is saved to ``destino`` (default: GRAFICO_PATH).
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import Wedge, FancyBboxPatch
+    import matplotlib.gridspec as gridspec
+
     print("\n[VIZ] Generating visualization...")
 
     BG = "#F7F7F7"
@@ -547,7 +665,7 @@ def graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b):
     ax_dist.set_xlabel("Votos válidos (%)", fontsize=9, color="#666666", labelpad=6)
     ax_dist.set_ylabel("Frequência", fontsize=9, color="#666666")
     ax_dist.set_title(
-        "Distribuição de votos válidos\n40.000 simulações",
+        f"Distribuição de votos válidos\n{len(df):,} simulações".replace(",", "."),
         fontsize=11, fontweight="bold", pad=12, loc="left", color="#222222",
     )
     ax_dist.legend(fontsize=9, frameon=False)
@@ -598,7 +716,7 @@ def graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b):
         transform=fig.transFigure, color="#dddddd", lw=1.2,
     ))
 
-    out = OUTPUT_DIR / "simulacao_2turno.png"
+    out = destino or GRAFICO_PATH
     plt.savefig(out, dpi=300, bbox_inches="tight", facecolor=BG)
     print(f"   Graph saved: {out}")
     plt.close()
@@ -606,28 +724,94 @@ def graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b):
 
 # ─── MAIN ─────────────────────────────────────────────────────────────────────
 
-if __name__ == "__main__":
+def main(argv=None, prog=None):
+    """
+    Command-line entry point (also ``python -m src runoff``).
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:]).
+        prog: Program name shown in usage messages.
+    """
+    global N_SIM
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Brazil Election — standalone second round (v2.7)"
+    )
+    parser.add_argument(
+        "csv",
+        nargs="*",
+        metavar="CSV",
+        help="Second-round poll CSV files or glob patterns (default: "
+             "data/pesquisas_2turno.csv); several inputs run one after another "
+             "in this process, each writing <output stem>_<input stem> files.",
+    )
+    parser.add_argument(
+        "--n-sim",
+        type=n_sim_arg,
+        default=N_SIM,
+        metavar="N|auto",
+        help=f"Monte Carlo iterations (default: {N_SIM:,}); 'auto' samples until "
+             "the win and close-race probabilities reach --target-se.",
+    )
+    parser.add_argument(
+        "--sampling",
+        choices=METODOS_AMOSTRAGEM,
+        default="random",
+        help="Dirichlet sampling back-end (sobol/antithetic need fewer draws; default: random).",
+    )
+    parser.add_argument(
+        "--target-se",
+        type=float,
+        default=DEFAULT_TARGET_SE,
+        metavar="SE",
+        help=f"Target Monte Carlo standard error for --n-sim auto (default: {DEFAULT_TARGET_SE}).",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Report victory, vote-share and margin probabilities by exact quadrature; "
+             "Monte Carlo is still used for absolute vote projections.",
+    )
+    args = parser.parse_args(argv)
+
     print("=" * 60)
     print("  BRAZIL ELECTION — STANDALONE SECOND ROUND [v2.7]")
     print("  Monte Carlo · Dirichlet (3 categories) · PyMC-free")
     print("  Imports aggregation functions from simulation_v2")
     print("=" * 60)
 
-    cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual = (
-        carregar_pesquisas_2t()
-    )
+    entradas = expand_inputs(args.csv) or [None]
+    varias = len(entradas) > 1
+    for entrada in entradas:
+        cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual = (
+            carregar_pesquisas_2t(entrada)
+        )
 
-    voto_a_adj, voto_b_adj, residual_final = redistribuir_residual(
-        voto_a, voto_b, rej_a, rej_b, residual
-    )
+        voto_a_adj, voto_b_adj, residual_final = redistribuir_residual(
+            voto_a, voto_b, rej_a, rej_b, residual
+        )
+
+        df = simular(cand_a, cand_b, voto_a_adj, voto_b_adj, rej_a, rej_b,
+                     desvio, residual_final, n_sim=args.n_sim, target_se=args.target_se,
+                     metodo=args.sampling,
+                     destino=output_for(RESULTADOS_PATH, entrada, varias))
+        N_SIM = len(df)
 
-    df = simular(cand_a, cand_b, voto_a_adj, voto_b_adj, rej_a, rej_b,
-                 desvio, residual_final)
+        exata = None
+        if args.exact:
+            exata = exato(voto_a_adj, voto_b_adj, rej_a, rej_b, desvio, residual_final)
 
-    prob_a, prob_b = relatorio(df, cand_a, cand_b, rej_a, rej_b)
+        prob_a, prob_b = relatorio(df, cand_a, cand_b, rej_a, rej_b, exata=exata)
 
-    graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b)
+        graficos(df, cand_a, cand_b, rej_a, rej_b, prob_a, prob_b,
+                 destino=output_for(GRAFICO_PATH, entrada, varias))
 
     print("\nSimulation completed. Results in /outputs:")
     print("  resultados_2turno_standalone.csv")
     print("  simulacao_2turno.png")
+
+
+if __name__ == "__main__":
+    main()
@@ -337,7 +337,7 @@ def graficos_combinados(
              fontsize=10, color="#555555", va="bottom")
     fig.text(0.03, 0.916,
              f"1T: {s1.N_SIM:,} simulações (PyMC)  ·  "
-             f"2T: {N_SIM_2T:,} simulações (standalone)  ·  "
+             f"2T: {len(df_2t):,} simulações (standalone)  ·  "
              f"σ = {s1.DESVIO:.2f}%",
              fontsize=8.5, color="#999999", va="bottom")
     fig.add_artist(plt.Line2D(
@@ -353,7 +353,44 @@ def graficos_combinados(
 
 # ─── MAIN ─────────────────────────────────────────────────────────────────────
 
-if __name__ == "__main__":
+def main(argv=None, prog=None):
+    """
+    Command-line entry point (also ``python -m src combined``).
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:]).
+        prog: Program name shown in usage messages.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Brazil Election — combined first + second round (v2.7+)",
+    )
+    parser.add_argument(
+        "--n-sim",
+        type=int,
+        default=None,
+        metavar="N",
+        help=f"Monte Carlo iterations for both stages (default: {s1.N_SIM:,} / {N_SIM_2T:,}).",
+    )
+    parser.add_argument(
+        "--polls",
+        default=None,
+        metavar="CSV",
+        help="First-round poll CSV (default: data/pesquisas.csv).",
+    )
+    parser.add_argument(
+        "--polls-2t",
+        default=None,
+        metavar="CSV",
+        help="Second-round poll CSV (default: data/pesquisas_2turno.csv).",
+    )
+    args = parser.parse_args(argv)
+    if args.n_sim is not None:
+        s1.N_SIM = args.n_sim
+    n_sim_2t = args.n_sim or N_SIM_2T
+
     print("=" * 65)
     print("  BRAZIL ELECTION — COMBINED SIMULATION [v2.7+]")
     print("  Stage 1: simulation_v2  (1T · PyMC · pesquisas.csv)")
@@ -362,7 +399,7 @@ if __name__ == "__main__":
 
     # ── Stage 1: First Round ──────────────────────────────────────────────────
     print("\n[STAGE 1] First Round")
-    s1.inicializar()
+    s1.inicializar(args.polls)
     s1.validar_viabilidade()
     trace = s1.construir_modelo()
     df1, info_lim_1t, info_indecisos, validos_final, candidatos_validos = (
@@ -374,13 +411,14 @@ if __name__ == "__main__":
     # ── Stage 2: Second Round (standalone) ───────────────────────────────────
     print("\n[STAGE 2] Second Round (standalone model)")
     cand_a, cand_b, voto_a, voto_b, rej_a, rej_b, desvio, residual = (
-        carregar_pesquisas_2t()
+        carregar_pesquisas_2t(args.polls_2t)
     )
     voto_a_adj, voto_b_adj, residual_final = redistribuir_residual(
         voto_a, voto_b, rej_a, rej_b, residual
     )
     df_2t = simular_2t(
-        cand_a, cand_b, voto_a_adj, voto_b_adj, rej_a, rej_b, desvio, residual_final
+        cand_a, cand_b, voto_a_adj, voto_b_adj, rej_a, rej_b, desvio, residual_final,
+        n_sim=n_sim_2t,
     )
     prob_a, prob_b = relatorio_2t(df_2t, cand_a, cand_b, rej_a, rej_b)
 
@@ -393,5 +431,9 @@ if __name__ == "__main__":
     print("  resultados_2turno_standalone.csv")
     print("  simulacao_combinada.png")
     print("\nModel sources:")
-    print(f"  1T data:  data/pesquisas.csv  ({s1.N_SIM:,} sims · PyMC)")
-    print(f"  2T data:  data/pesquisas_2turno.csv  ({N_SIM_2T:,} sims · Dirichlet)")
+    print(f"  1T data:  {args.polls or 'data/pesquisas.csv'}  ({s1.N_SIM:,} sims · PyMC)")
+    print(f"  2T data:  {args.polls_2t or 'data/pesquisas_2turno.csv'}  ({n_sim_2t:,} sims · Dirichlet)")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,14 +34,47 @@ License: MIT
 """
 
 import sys
+import json
+import contextlib
+import io
 import numpy as np
 import pandas as pd
-import pymc as pm
-import arviz as az
-import matplotlib.pyplot as plt
 from pathlib import Path
 from datetime import datetime, date
 
+# Project root on sys.path so the v3 core package resolves as ``src.core``
+# both when this file runs as a script and when it is imported from src/.
+_ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
+
+from src.core.config import PollData, SimulationConfig, SimulationResult
+from src.core.analytic import preview
+from src.core.adaptive import DEFAULT_MAX, DEFAULT_TARGET_SE, n_sim_arg, sample_until
+from src.core.control_variates import cv_estimate, dirichlet_controls
+from src.core.error_bank import DEFAULT_TAU_DIAS, ErrorBank, apply_errors
+from src.core.mcse import edge_significance, edge_significance_se, prob_estimate
+from src.core.paired import paired_compare
+from src.core.pool import PoolRegistry, SamplePool, pool_key
+from src.core.reweight import (
+    DEFAULT_MAX_KHAT, DEFAULT_MIN_ESS_FRAC, reweight_dirichlet, systematic_resample,
+)
+from src.core.sampling import METHODS as METODOS_AMOSTRAGEM, sample_dirichlet
+from src.core.sensitivity import ceiling_difference, numeric_jacobian, score_gradient, tornado
+from src.core.simulation import (
+    dirichlet_alphas, redistribute_undecided, valid_mask, valid_shares_from_gammas,
+)
+from src.core.summary import compute_summary, quantile_table, top_two
+from src.core.sweep import expand_grid, run_sweep
+from src.core.tail import estimate_tail, estimate_tail_strata
+from src.core.trajectory import aggregate_dates, run_trajectory
+from src.io.history import save_result
+from src.io.inputs import expand_inputs, output_for
+
+# pymc and matplotlib are imported lazily inside construir_modelo() and
+# graficos(): --summary-only runs never build the MCMC model nor render
+# figures, so they should not pay for either import.
+
 # ─── CONFIG ───────────────────────────────────────────────────────────────────
 
 OUTPUT_DIR = Path("outputs")
@@ -59,6 +92,8 @@ ABSTENCAO_1T_SIGMA = 0.02         # First round abstention: std dev (90% CI: 16.
 ABSTENCAO_2T_MU    = 0.22         # Second round abstention: mean (higher than 1st round)
 ABSTENCAO_2T_SIGMA = 0.03         # Second round abstention: std dev (90% CI: 17.1–26.9%)
 MARGIN_THRESHOLDS  = [5, 10, 15, 20, 25] #  pp — P(margin > X) reported per threshold
+LIMIARES_RESUMO    = sorted({3, 10, *MARGIN_THRESHOLDS})  # close/comfortable + markets
+TAIL_IS_CUTOFF     = 0.05  # polymarket_edge() uses importance sampling below this
 
 
 # ─── POLL AGGREGATION FUNCTIONS (v2.3) ────────────────────────────────────────
@@ -305,7 +340,6 @@ def carregar_pesquisas(csv_path=None):
         raise ValueError(f"Colunas faltando no CSV: {missing}")
     
     # Detect if multiple polls per candidate
-    candidatos_unicos = df['candidato'].unique()
     contagem_por_candidato = df['candidato'].value_counts()
     multiplas_pesquisas = (contagem_por_candidato > 1).any()
     
@@ -321,26 +355,16 @@ def carregar_pesquisas(csv_path=None):
         print(f"\nData loaded from {csv_path} (single poll per candidate)")
         print(f"   Aggregation mode: DISABLED (backward compatible)")
     
-    # Aggregate polls for each candidate
-    candidatos = []
-    votos_agregados = []
-    rejeicao_agregada = []
-    desvios_agregados = []
-    
+    candidatos, votos_media, rejeicao, desvio_base, indecisos, infos = agregar_tabela_pesquisas(
+        df, data_referencia
+    )
+
     print("\n" + "=" * 70)
     print("  POLL AGGREGATION SUMMARY")
     print("=" * 70)
-    
-    for candidato in candidatos_unicos:
-        df_cand = df[df['candidato'] == candidato].copy()
-        
-        voto, rej, desv, info = agregar_pesquisas_candidato(df_cand, data_referencia)
-        
-        candidatos.append(candidato)
-        votos_agregados.append(voto)
-        rejeicao_agregada.append(rej)
-        desvios_agregados.append(desv)
-        
+
+    for candidato, voto, rej, info in zip(candidatos, votos_media, rejeicao, infos):
+        desv = info['desvio_agregado']
         # Report aggregation details
         if info['n_pesquisas'] > 1:
             print(f"\nCandidate: {candidato}")
@@ -366,33 +390,53 @@ def carregar_pesquisas(csv_path=None):
             print(f"   Std dev: {desv:.2f}%")
     
     print("=" * 70)
-    
-    # Convert to arrays
-    votos_media = np.array(votos_agregados, dtype=float)
-    rejeicao = np.array(rejeicao_agregada, dtype=float)
-    desvio_base = float(np.mean(desvios_agregados))
 
-    # Detect NaN or zero values that would break the Dirichlet model
-    nan_mask = np.isnan(votos_media)
-    zero_mask = votos_media <= 0
-    if nan_mask.any() or zero_mask.any():
-        for i, cand in enumerate(candidatos):
-            if nan_mask[i]:
-                print(f"   WARNING: {cand} has NaN vote share — check CSV for missing intencao_voto_pct")
-            if zero_mask[i]:
-                print(f"   WARNING: {cand} has zero/negative vote share ({votos_media[i]:.2f}%)")
-        raise ValueError(
-            "Invalid vote shares detected after aggregation. "
-            "All candidates must have intencao_voto_pct > 0 in the CSV."
-        )
+    validar_votos_agregados(candidatos, votos_media)
     
     # Check if rejection data exists
     tem_rejeicao = (rejeicao > 0).any()
     if not tem_rejeicao:
         print("\nNote: 'rejeicao_pct' column not found - running without electoral ceiling")
     
-    # Aggregate undecided voters (v2.4)
-    # indecisos_pct is a poll-level statistic: aggregate as weighted mean across all rows
+    if 'indecisos_pct' in df.columns:
+        print(f"\nUndecided voters: {indecisos:.2f}% (will be redistributed before simulation)")
+    else:
+        print("\nNote: 'indecisos_pct' column not found - running without undecided voter redistribution")
+    
+    return candidatos, votos_media, rejeicao, desvio_base, indecisos
+
+
+def agregar_tabela_pesquisas(df, data_referencia, agregar_candidato=None):
+    """
+    Aggregates a whole poll table at ``data_referencia`` (no printing).
+
+    The computation behind carregar_pesquisas(), shared with the poll-feed
+    daemon: one agregar_pesquisas_candidato() call per candidate (in order
+    of first appearance) and the undecided share as a temporally weighted
+    mean across all rows.
+
+    Args:
+        df:                Poll rows (``data`` already parsed to dates, if present).
+        data_referencia:   Reference date for temporal weighting.
+        agregar_candidato: Replacement for agregar_pesquisas_candidato with
+                           the same signature (e.g. a caching wrapper).
+
+    Returns:
+        tuple: (candidatos, votos_media, rejeicao, desvio_base, indecisos, infos)
+            - infos: per-candidate info dicts, with the combined deviation
+              added as ``desvio_agregado``
+    """
+    agregar_candidato = agregar_candidato or agregar_pesquisas_candidato
+    candidatos, votos, rejeicoes, desvios, infos = [], [], [], [], []
+    for candidato in df['candidato'].unique():
+        voto, rej, desv, info = agregar_candidato(df[df['candidato'] == candidato].copy(), data_referencia)
+        candidatos.append(candidato)
+        votos.append(voto)
+        rejeicoes.append(rej)
+        desvios.append(desv)
+        infos.append({**info, 'desvio_agregado': float(desv)})
+
+    # indecisos_pct is a poll-level statistic: aggregate as weighted mean across all rows (v2.4)
     indecisos = 0.0
     if 'indecisos_pct' in df.columns:
         if 'data' in df.columns:
@@ -402,13 +446,38 @@ def carregar_pesquisas(csv_path=None):
             pesos_globais = pesos_globais / pesos_globais.sum()
         else:
             pesos_globais = np.ones(len(df)) / len(df)
-        
         indecisos = float(np.average(df['indecisos_pct'].fillna(0).values, weights=pesos_globais))
-        print(f"\nUndecided voters: {indecisos:.2f}% (will be redistributed before simulation)")
-    else:
-        print("\nNote: 'indecisos_pct' column not found - running without undecided voter redistribution")
-    
-    return candidatos, votos_media, rejeicao, desvio_base, indecisos
+
+    return (
+        list(candidatos),
+        np.array(votos, dtype=float),
+        np.array(rejeicoes, dtype=float),
+        float(np.mean(desvios)),
+        indecisos,
+        infos,
+    )
+
+
+def validar_votos_agregados(candidatos, votos_media):
+    """
+    Rejects NaN or zero aggregated vote shares, which would break the Dirichlet model.
+
+    Raises:
+        ValueError: Some share is NaN or ≤ 0 (each offending candidate is printed first).
+    """
+    nan_mask = np.isnan(votos_media)
+    zero_mask = votos_media <= 0
+    if nan_mask.any() or zero_mask.any():
+        for i, cand in enumerate(candidatos):
+            if nan_mask[i]:
+                print(f"   WARNING: {cand} has NaN vote share — check CSV for missing intencao_voto_pct")
+            if zero_mask[i]:
+                print(f"   WARNING: {cand} has zero/negative vote share ({votos_media[i]:.2f}%)")
+        invalidos = [c for c, ruim in zip(candidatos, nan_mask | zero_mask) if ruim]
+        raise ValueError(
+            f"Invalid vote shares detected after aggregation ({', '.join(invalidos)}). "
+            "All candidates must have intencao_voto_pct > 0 in the CSV."
+        )
 
 
 # ─── GLOBALS (populated by inicializar()) ─────────────────────────────────────
@@ -416,6 +485,8 @@ def carregar_pesquisas(csv_path=None):
 # CSV loading or console output, allowing safe import from dashboard.py.
 
 N_SIM: int = 40_000
+AMOSTRAGEM: str = "random"  # Dirichlet back-end: random | sobol | antithetic
+CSV_PATH: Path = Path("data/pesquisas.csv")
 CANDIDATOS: list = []
 VOTOS_MEDIA: np.ndarray = np.array([])
 REJEICAO: np.ndarray = np.array([])
@@ -423,6 +494,12 @@ DESVIO_BASE: float = 2.0
 INDECISOS: float = 0.0
 CORES: list = []
 DESVIO: float = 2.0
+BANCO_ERROS = None  # ErrorBank; set by carregar_banco_erros() / --empirical-error
+BANCO_ERROS_PATH: Path = OUTPUT_DIR / "banco_erros.npz"
+HISTORICO_PATH: Path = OUTPUT_DIR / "historico.sqlite"
+TRAJETORIA_PATH: Path = OUTPUT_DIR / "trajetoria.csv"
+GRAFICO_PATH: Path = OUTPUT_DIR / "simulacao_eleicoes_brasil_2026_v2.5.png"
+RESULTADOS_1T_PATH: Path = OUTPUT_DIR / "resultados_1turno_v2.8.csv"
 
 
 # ─── COLOR GENERATION ─────────────────────────────────────────────────────────
@@ -432,24 +509,32 @@ def gerar_cores(n):
     cores_base = ["#e74c3c", "#3498db", "#2ecc71", "#f39c12", "#9b59b6", "#34495e", "#95a5a6"]
     if n <= len(cores_base):
         return cores_base[:n]
-    import matplotlib.cm as cm
-    cmap = cm.get_cmap("tab10")
-    return [cmap(i / n) for i in range(n)]
+    # matplotlib "tab10" palette sampled at i / n, kept as hex strings so that
+    # _hex_lighten() works and colour generation never imports matplotlib
+    tab10 = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+             "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
+    return [tab10[min(int(i / n * len(tab10)), len(tab10) - 1)] for i in range(n)]
 
 
 # ─── TEMPORAL UNCERTAINTY (FUNNEL EFFECT) ─────────────────────────────────────
 
-def calcular_desvio_ajustado():
+def calcular_desvio_ajustado(desvio_base=None, data_referencia=None):
     """
     Adjusts standard deviation based on days until election.
 
     Implements funnel effect: uncertainty increases with time to election.
+
+    Args:
+        desvio_base:     Base deviation (%); defaults to the DESVIO_BASE global.
+        data_referencia: Date the forecast is made on; defaults to DATA_ATUAL.
     """
-    dias_restantes = (DATA_ELEICAO - DATA_ATUAL).days
+    if desvio_base is None:
+        desvio_base = DESVIO_BASE
+    dias_restantes = (DATA_ELEICAO - (data_referencia or DATA_ATUAL)).days
     if dias_restantes < 0:
-        return DESVIO_BASE
+        return desvio_base
     fator_temporal = np.sqrt(dias_restantes / 30)
-    return max(DESVIO_BASE, DESVIO_BASE * fator_temporal)
+    return max(desvio_base, desvio_base * fator_temporal)
 
 
 # ─── INITIALIZATION ────────────────────────────────────────────────────────────
@@ -465,7 +550,8 @@ def inicializar(csv_path=None):
     Args:
         csv_path: Path to poll CSV file (str or Path). Defaults to data/pesquisas.csv.
     """
-    global CANDIDATOS, VOTOS_MEDIA, REJEICAO, DESVIO_BASE, INDECISOS, CORES, DESVIO
+    global CANDIDATOS, VOTOS_MEDIA, REJEICAO, DESVIO_BASE, INDECISOS, CORES, DESVIO, CSV_PATH
+    CSV_PATH = Path(csv_path) if csv_path else Path("data/pesquisas.csv")
     CANDIDATOS, VOTOS_MEDIA, REJEICAO, DESVIO_BASE, INDECISOS = carregar_pesquisas(csv_path)
     CORES = gerar_cores(len(CANDIDATOS))
     DESVIO = calcular_desvio_ajustado()
@@ -652,13 +738,12 @@ def distribuir_indecisos(votos_base, indecisos_total, rejeicao_array, blank_frac
     return votos_ajustados, info
 
 
-validar_viabilidade()
-
-
 # ─── BAYESIAN MODEL WITH DIRICHLET ────────────────────────────────────────────
 
 def construir_modelo():
     """Builds Bayesian model using Dirichlet distribution."""
+    import pymc as pm
+
     print("\n[1/4] Building Bayesian model with PyMC (Dirichlet)...")
 
     # Apply undecided redistribution to priors (v2.4)
@@ -704,10 +789,13 @@ def construir_modelo():
 
 # ─── FIRST ROUND WITH REJECTION CEILING ───────────────────────────────────────
 
-def simular_primeiro_turno():
-    """Simulates first round applying undecided voter redistribution and rejection ceiling."""
-    print("\n[2/4] Simulating first round (40,000 iterations) with rejection ceiling...")
-    
+def parametros_dirichlet():
+    """
+    First-round Dirichlet parameters after undecided redistribution (v2.4).
+
+    Returns:
+        tuple: (alphas, votos_efetivos, info_indecisos)
+    """
     # Redistribute undecided voters before parameterizing the Dirichlet (v2.4)
     votos_efetivos = VOTOS_MEDIA.copy()
     info_indecisos = {}
@@ -715,12 +803,7 @@ def simular_primeiro_turno():
         votos_efetivos, info_indecisos = distribuir_indecisos(
             VOTOS_MEDIA, INDECISOS, REJEICAO
         )
-        print(f"\n    Undecided voter redistribution ({INDECISOS:.2f}%):")
-        for cand, ganho in info_indecisos['ganho_por_candidato'].items():
-            idx = CANDIDATOS.index(cand)
-            print(f"       {cand}: +{ganho:.2f}pp ({VOTOS_MEDIA[idx]:.2f}% → {votos_efetivos[idx]:.2f}%)")
-        print(f"       → Blank/Null: +{info_indecisos['indecisos_para_brancos']:.2f}pp")
-    
+
     if np.any(np.isnan(votos_efetivos)) or np.any(votos_efetivos <= 0):
         bad = [(CANDIDATOS[i], float(v)) for i, v in enumerate(votos_efetivos)
                if np.isnan(v) or v <= 0]
@@ -730,17 +813,84 @@ def simular_primeiro_turno():
         )
 
     fator_concentracao = 100 / DESVIO
-    alphas = votos_efetivos * fator_concentracao
+    return votos_efetivos * fator_concentracao, votos_efetivos, info_indecisos
 
-    proporcoes = np.random.dirichlet(alphas, size=N_SIM)
-    votos_norm = proporcoes * 100
-    
+
+def _chave_modelo():
+    """
+    Hash of the module state that maps Dirichlet proportions to valid shares:
+    candidates, alphas, rejection, poll order and the error bank (with the
+    record weights in effect).  None before inicializar().
+    """
+    if not CANDIDATOS:
+        return None
+    alphas, _, _ = parametros_dirichlet()
+    banco = () if BANCO_ERROS is None else (
+        BANCO_ERROS.erros, BANCO_ERROS.weights(max((DATA_ELEICAO - DATA_ATUAL).days, 0))
+    )
+    return pool_key(np.array(CANDIDATOS), alphas, REJEICAO, VOTOS_MEDIA, *banco)
+
+
+def carregar_banco_erros(caminho=None):
+    """
+    Enables the empirical-error sampling mode with a bank built by
+    ``python src/backtesting.py --build-error-bank``.
+    """
+    global BANCO_ERROS
+    caminho = Path(caminho or BANCO_ERROS_PATH)
+    if not caminho.exists():
+        raise FileNotFoundError(
+            f"Error bank not found: {caminho}\n"
+            "Build it with: python src/backtesting.py --build-error-bank"
+        )
+    BANCO_ERROS = ErrorBank.load(caminho)
+    return BANCO_ERROS
+
+
+def erros_empiricos(u, tau=DEFAULT_TAU_DIAS):
+    """
+    Historical errors for one uniform per draw, from the records closest to
+    the current days-to-election (None when the mode is off).
+    """
+    if BANCO_ERROS is None:
+        return None
+    dias = max((DATA_ELEICAO - DATA_ATUAL).days, 0)
+    return BANCO_ERROS.gather(u, dias, tau)
+
+
+def _exigir_sem_banco_erros(funcao):
+    """Closed-form and batched paths that cannot add the empirical errors refuse to run."""
+    if BANCO_ERROS is not None:
+        raise ValueError(
+            f"{funcao}() does not apply the empirical error bank; "
+            "run it without --empirical-error (BANCO_ERROS = None)"
+        )
+
+
+def validos_de_proporcoes(proporcoes, erros=None):
+    """
+    Maps raw Dirichlet proportions to valid vote shares.
+
+    Drops blank/null, renormalises, adds the empirical errors (if any),
+    applies the rejection ceiling and renormalises again.
+
+    Args:
+        proporcoes: Array (n, n_candidatos) on the simplex
+        erros: Optional (n, R) historical errors by poll rank from
+               erros_empiricos() (src/core/error_bank.py)
+
+    Returns:
+        tuple: (validos_final (n, n_validos) in %, candidatos_validos, info_limitacoes)
+    """
     indices_validos = [i for i, c in enumerate(CANDIDATOS) 
                       if "Brancos" not in c and "Nulos" not in c]
     candidatos_validos = [CANDIDATOS[i] for i in indices_validos]
     
-    validos = votos_norm[:, indices_validos]
+    validos = proporcoes[:, indices_validos] * 100
     validos_norm = validos / validos.sum(axis=1, keepdims=True) * 100
+    if erros is not None:
+        ordem = np.argsort(-VOTOS_MEDIA[indices_validos], kind="stable")
+        validos_norm = apply_errors(validos_norm, erros, ordem)
     
     # Apply rejection ceiling
     rejeicao_validos = REJEICAO[indices_validos]
@@ -748,7 +898,334 @@ def simular_primeiro_turno():
     
     # Re-normalize after ceiling
     validos_final = validos_com_teto / validos_com_teto.sum(axis=1, keepdims=True) * 100
+    return validos_final, candidatos_validos, info_limitacoes
+
+
+def amostrar_primeiro_turno(n_sim=None, verbose=True, metodo=None):
+    """
+    Draws first-round samples as plain arrays — no DataFrame, no disk I/O.
+
+    This is the sampling core shared by simular_primeiro_turno() (which wraps
+    the arrays into the per-simulation DataFrame and CSV) and by the
+    --summary-only mode (which reduces them straight to summary statistics).
+
+    Args:
+        n_sim: Number of draws (default: N_SIM).
+        verbose: Print progress and redistribution details (default: True).
+        metodo: Dirichlet sampling method — "random", "sobol" (scrambled
+                Sobol + gamma inverse CDF) or "antithetic" (default: AMOSTRAGEM).
+
+    Returns:
+        dict with keys:
+            votos_norm         – (n_sim, n_candidatos) total vote shares (%)
+            validos_final      – (n_sim, n_validos) valid vote shares after ceiling (%)
+            candidatos_validos – Valid candidate names (validos_final column order)
+            abstencao_1t       – (n_sim,) sampled first-round abstention rate
+            info_limitacoes    – Rejection ceiling diagnostics
+            info_indecisos     – Undecided redistribution diagnostics
+            alphas             – Dirichlet parameters the draws came from
+    """
+    n_sim = N_SIM if n_sim is None else n_sim
+    if verbose:
+        print(f"\n[2/4] Simulating first round ({n_sim:,} iterations) with rejection ceiling...")
     
+    alphas, votos_efetivos, info_indecisos = parametros_dirichlet()
+    if info_indecisos and verbose:
+        print(f"\n    Undecided voter redistribution ({INDECISOS:.2f}%):")
+        for cand, ganho in info_indecisos['ganho_por_candidato'].items():
+            idx = CANDIDATOS.index(cand)
+            print(f"       {cand}: +{ganho:.2f}pp ({VOTOS_MEDIA[idx]:.2f}% → {votos_efetivos[idx]:.2f}%)")
+        print(f"       → Blank/Null: +{info_indecisos['indecisos_para_brancos']:.2f}pp")
+
+    proporcoes = sample_dirichlet(alphas, n_sim, metodo or AMOSTRAGEM)
+    votos_norm = proporcoes * 100
+    erros = erros_empiricos(np.random.random_sample(n_sim)) if BANCO_ERROS is not None else None
+    validos_final, candidatos_validos, info_limitacoes = validos_de_proporcoes(proporcoes, erros)
+
+    # ── Absolute vote projections (v2.6) ──────────────────────────────────────
+    # Abstention is sampled independently per simulation as Normal(mu, sigma),
+    # clipped to [5%, 45%] to avoid degenerate scenarios.
+    abstencao_1t_sim = np.random.normal(
+        ABSTENCAO_1T_MU, ABSTENCAO_1T_SIGMA, n_sim
+    ).clip(0.05, 0.45)
+
+    return {
+        'votos_norm': votos_norm,
+        'validos_final': validos_final,
+        'candidatos_validos': candidatos_validos,
+        'abstencao_1t': abstencao_1t_sim,
+        'info_limitacoes': info_limitacoes,
+        'info_indecisos': info_indecisos,
+        'alphas': alphas,
+    }
+
+
+def concatenar_amostras(blocos):
+    """
+    Joins several amostrar_primeiro_turno() outputs into one.
+
+    Arrays are stacked in draw order; ceiling diagnostics are re-pooled over
+    the total number of draws.
+    """
+    if len(blocos) == 1:
+        return blocos[0]
+    n_total = sum(len(b['validos_final']) for b in blocos)
+
+    info_limitacoes = {}
+    for bloco in blocos:
+        for cand, info in bloco['info_limitacoes'].items():
+            acc = info_limitacoes.setdefault(cand, {**info, 'n_simulacoes_limitadas': 0})
+            acc['n_simulacoes_limitadas'] += info['n_simulacoes_limitadas']
+    for info in info_limitacoes.values():
+        info['pct_simulacoes_limitadas'] = info['n_simulacoes_limitadas'] / n_total * 100
+
+    return {
+        'votos_norm': np.concatenate([b['votos_norm'] for b in blocos]),
+        'validos_final': np.concatenate([b['validos_final'] for b in blocos]),
+        'candidatos_validos': blocos[0]['candidatos_validos'],
+        'abstencao_1t': np.concatenate([b['abstencao_1t'] for b in blocos]),
+        'info_limitacoes': info_limitacoes,
+        'info_indecisos': blocos[0]['info_indecisos'],
+        'alphas': blocos[0]['alphas'],
+    }
+
+
+def contar_primeiro_turno(amostras, limiares=MARGIN_THRESHOLDS):
+    """
+    Success counts tracked by the adaptive --n-sim auto mode.
+
+    Returns:
+        dict: {'vitoria:<cand>': k, 'p2t': k, 'margem>X': k}
+    """
+    validos = amostras['validos_final']
+    lider, _, margem = top_two(validos)
+    contagem = np.bincount(lider, minlength=validos.shape[1])
+    out = {f"vitoria:{c}": int(k) for c, k in zip(amostras['candidatos_validos'], contagem)}
+    out['p2t'] = int((validos.max(axis=1) < 50).sum())
+    for thr in limiares:
+        out[f"margem>{thr:g}"] = int((margem > thr).sum())
+    return out
+
+
+def amostrar_primeiro_turno_auto(target_se=DEFAULT_TARGET_SE, limiares=MARGIN_THRESHOLDS,
+                                 n_max=DEFAULT_MAX):
+    """
+    First-round sampling with adaptive sample size (--n-sim auto).
+
+    Draws in growing chunks until each candidate's win probability, the
+    second-round probability and P(margin > X) for every threshold in
+    ``limiares`` have Monte Carlo standard error <= ``target_se``.
+
+    Returns:
+        dict: same keys as amostrar_primeiro_turno(), plus 'adaptativo'
+              (the AdaptiveRun without its chunks).
+    """
+    print(f"\n[2/4] Simulating first round (adaptive, target SE {target_se}) "
+          f"with rejection ceiling...")
+    run = sample_until(
+        lambda n: amostrar_primeiro_turno(n, verbose=False),
+        lambda bloco: contar_primeiro_turno(bloco, limiares),
+        target_se=target_se,
+        n_max=n_max,
+    )
+    amostras = concatenar_amostras(run.chunks)
+    run.chunks = []
+    amostras['adaptativo'] = run
+    status = "converged" if run.converged else "stopped at n_max"
+    print(f"    {run.n_sim:,} draws ({status}; max SE {run.max_se:.5f} on {run.worst})")
+    return amostras
+
+
+def salvar_amostras(amostras, caminho):
+    """
+    Stores first-round draws for later reweighted updates.
+
+    Only the raw Dirichlet proportions, abstention draws, the alphas they
+    came from and the candidate list are kept; everything else is derived.
+    """
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        caminho,
+        proporcoes=amostras['votos_norm'] / 100,
+        abstencao_1t=amostras['abstencao_1t'],
+        alphas=amostras['alphas'],
+        candidatos=np.array(CANDIDATOS),
+    )
+
+
+def atualizar_primeiro_turno(caminho, min_ess_frac=DEFAULT_MIN_ESS_FRAC,
+                             max_k_hat=DEFAULT_MAX_KHAT, verbose=True):
+    """
+    First-round draws for the current polls, reusing a previous run when possible.
+
+    The draws stored at ``caminho`` by salvar_amostras() are reweighted by
+    the Dirichlet density ratio between the current and stored alphas with
+    Pareto-smoothed weights (see src/core/reweight.py), then turned into an
+    equally weighted set by systematic resampling, so every downstream
+    function works unchanged.  The rejection ceiling is re-applied with the
+    current rejection rates.
+
+    Fresh draws are taken — and stored for the next update — when there is
+    no previous run, the candidate list changed, or the reweighting is
+    unreliable (ESS / N < ``min_ess_frac`` or k_hat > ``max_k_hat``).
+
+    Returns:
+        dict: same keys as amostrar_primeiro_turno(), plus 'reponderacao'
+              with reamostrado, motivo, ess, ess_frac, k_hat.
+    """
+    caminho = Path(caminho)
+    motivo = None
+    if not caminho.exists():
+        motivo = "no stored draws"
+    else:
+        salvo = np.load(caminho)
+        if list(salvo['candidatos']) != list(CANDIDATOS):
+            motivo = "candidate list changed"
+
+    if motivo is None:
+        alphas, _, info_indecisos = parametros_dirichlet()
+        ajuste = reweight_dirichlet(salvo['proporcoes'], salvo['alphas'], alphas,
+                                    min_ess_frac, max_k_hat)
+        diag = {
+            'ess': round(ajuste.ess, 1),
+            'ess_frac': round(ajuste.ess_frac, 4),
+            'k_hat': round(ajuste.k_hat, 3),
+        }
+        if ajuste.ok:
+            idx = systematic_resample(ajuste.weights)
+            proporcoes = salvo['proporcoes'][idx]
+            erros = (erros_empiricos(np.random.random_sample(len(idx)))
+                     if BANCO_ERROS is not None else None)
+            validos_final, candidatos_validos, info_limitacoes = validos_de_proporcoes(proporcoes, erros)
+            if verbose:
+                print(f"\n[2/4] Reweighted {ajuste.n:,} stored draws "
+                      f"(ESS {ajuste.ess:,.0f} = {ajuste.ess_frac:.0%}, k_hat {ajuste.k_hat:.2f})")
+            return {
+                'votos_norm': proporcoes * 100,
+                'validos_final': validos_final,
+                'candidatos_validos': candidatos_validos,
+                'abstencao_1t': salvo['abstencao_1t'][idx],
+                'info_limitacoes': info_limitacoes,
+                'info_indecisos': info_indecisos,
+                'alphas': alphas,
+                'reponderacao': {'reamostrado': False, 'motivo': None, **diag},
+            }
+        motivo = (f"ESS {ajuste.ess_frac:.0%} < {min_ess_frac:.0%}"
+                  if ajuste.ess_frac < min_ess_frac else f"k_hat {ajuste.k_hat:.2f} > {max_k_hat}")
+
+    if verbose:
+        print(f"\n    Full resample ({motivo})")
+    amostras = amostrar_primeiro_turno(verbose=verbose)
+    salvar_amostras(amostras, caminho)
+    amostras['reponderacao'] = {'reamostrado': True, 'motivo': motivo}
+    return amostras
+
+
+_POOLS = PoolRegistry()
+
+
+def amostrar_primeiro_turno_pool(n_sim=None, metodo=None, semente=42, diretorio=None,
+                                 verbose=True):
+    """
+    First-round draws from an appendable pool (src/core/pool.py).
+
+    The pool is keyed by a hash of the current inputs (candidates, alphas,
+    rejection rates), the sampling method and ``semente``.  Asking for more
+    draws than the pool holds only generates the missing ones, as a
+    deterministic continuation of the same stream, so growing a run from 40k
+    to 200k costs 160k draws.  Win, P(2nd round) and margin counts are
+    accumulated on the new draws only.
+
+    Args:
+        n_sim: Number of draws (default: N_SIM).
+        metodo: Dirichlet sampling method (default: AMOSTRAGEM).
+        semente: Stream seed.
+        diretorio: Optional directory where pools persist between runs
+                   as ``<key>.npz``; in-memory only when None.
+        verbose: Print how many draws were reused.
+
+    Returns:
+        dict: same keys as amostrar_primeiro_turno(), plus 'pool' with
+              chave, n_reusados, n_novos, n_total and contagens (counts over
+              the whole pool).
+    """
+    n_sim = N_SIM if n_sim is None else n_sim
+    metodo = metodo or AMOSTRAGEM
+    alphas, _, info_indecisos = parametros_dirichlet()
+    # Empirical errors are picked by a second auxiliary uniform per draw
+    banco = () if BANCO_ERROS is None else (
+        BANCO_ERROS.erros, BANCO_ERROS.weights(max((DATA_ELEICAO - DATA_ATUAL).days, 0))
+    )
+    chave = pool_key(np.array(CANDIDATOS), alphas, REJEICAO, metodo, semente, *banco)
+    caminho = Path(diretorio) / f"{chave}.npz" if diretorio else None
+
+    def contar(proporcoes, aux):
+        validos, candidatos_validos, _ = validos_de_proporcoes(
+            proporcoes, erros_empiricos(aux[:, 1]) if banco else None
+        )
+        return contar_primeiro_turno({'validos_final': validos,
+                                      'candidatos_validos': candidatos_validos})
+
+    def criar():
+        if caminho is not None and caminho.exists():
+            return SamplePool.load(caminho, counter=contar)
+        return SamplePool(alphas, metodo, semente, n_aux=2 if banco else 1, counter=contar)
+
+    pool = _POOLS.get(chave, criar)
+    n_antes = pool.n
+    n_novos = pool.extend_to(n_sim)
+    if verbose:
+        print(f"\n[2/4] First round from sample pool {chave}: "
+              f"{min(n_antes, n_sim):,} reused + {n_novos:,} new draws")
+    if caminho is not None and n_novos:
+        pool.save(caminho)
+
+    from scipy.special import ndtri
+
+    proporcoes, aux = pool.take(n_sim)
+    validos_final, candidatos_validos, info_limitacoes = validos_de_proporcoes(
+        proporcoes, erros_empiricos(aux[:, 1]) if banco else None
+    )
+    abstencao_1t_sim = (ABSTENCAO_1T_MU + ABSTENCAO_1T_SIGMA * ndtri(aux[:, 0])).clip(0.05, 0.45)
+
+    return {
+        'votos_norm': proporcoes * 100,
+        'validos_final': validos_final,
+        'candidatos_validos': candidatos_validos,
+        'abstencao_1t': abstencao_1t_sim,
+        'info_limitacoes': info_limitacoes,
+        'info_indecisos': info_indecisos,
+        'alphas': alphas,
+        'pool': {
+            'chave': chave,
+            'n_reusados': min(n_antes, n_sim),
+            'n_novos': n_novos,
+            'n_total': pool.n,
+            'contagens': dict(pool.counts),
+        },
+    }
+
+
+def simular_primeiro_turno(amostras=None, metodo=None, destino=None):
+    """
+    Simulates first round applying undecided voter redistribution and rejection ceiling.
+
+    Args:
+        amostras: Optional pre-drawn output of amostrar_primeiro_turno() or
+                  amostrar_primeiro_turno_auto(); sampled with N_SIM when omitted.
+        metodo: Dirichlet sampling method when sampling here ("random",
+                "sobol" or "antithetic"; default: AMOSTRAGEM).
+        destino: Per-draw results CSV (default: RESULTADOS_1T_PATH).
+    """
+    if amostras is None:
+        amostras = amostrar_primeiro_turno(metodo=metodo)
+    votos_norm = amostras['votos_norm']
+    validos_final = amostras['validos_final']
+    candidatos_validos = amostras['candidatos_validos']
+    info_limitacoes = amostras['info_limitacoes']
+    info_indecisos = amostras['info_indecisos']
+
     idx_vencedor_local = np.argmax(validos_final, axis=1)
     vencedores = np.array(candidatos_validos)[idx_vencedor_local]
     
@@ -763,11 +1240,7 @@ def simular_primeiro_turno():
     data["tem_2turno"] = validos_final.max(axis=1) < 50
 
     # ── Absolute vote projections (v2.6) ──────────────────────────────────────
-    # Abstention is sampled independently per simulation as Normal(mu, sigma),
-    # clipped to [5%, 45%] to avoid degenerate scenarios.
-    abstencao_1t_sim = np.random.normal(
-        ABSTENCAO_1T_MU, ABSTENCAO_1T_SIGMA, N_SIM
-    ).clip(0.05, 0.45)
+    abstencao_1t_sim = amostras['abstencao_1t']
     votos_validos_1t = (ELEITORADO * (1 - abstencao_1t_sim)).astype(np.int64)
     data["abstencao_1t_pct"] = abstencao_1t_sim * 100
     data["votos_validos_1t"] = votos_validos_1t
@@ -788,7 +1261,9 @@ def simular_primeiro_turno():
         )
         df[f"margem_{cand}"] = validos_final[:, i] - others_max
 
-    df.to_csv(OUTPUT_DIR / "resultados_1turno_v2.8.csv", index=False)
+    # Lets polymarket_edge() check that the module state still describes these draws
+    df.attrs["chave_modelo"] = _chave_modelo()
+    df.to_csv(destino or RESULTADOS_1T_PATH, index=False)
     
     if info_indecisos:
         print(f"\n    Undecided redistribution summary:")
@@ -853,34 +1328,33 @@ def _simular_confronto(v_a, v_b, outros_votos, rej_a, rej_b, n):
     return p_a, p_b
 
 
-def simular_segundo_turno(validos_final, candidatos_validos):
+def amostrar_segundo_turno(validos_final, candidatos_validos):
     """
-    Simulates second round using actual top-2 finalists from each first-round simulation.
+    Draws second-round samples as plain arrays — no DataFrame, no disk I/O.
 
-    For each simulation in validos_final, the two candidates with the highest
-    valid vote share are identified as finalists. Simulations are then grouped
-    by matchup pair, and each group runs an independent rejection-based transfer.
-
-    This replaces the previous fixed-matchup approach where the same two candidates
-    were always assumed to be the finalists regardless of first-round outcomes.
+    Sampling core of simular_segundo_turno(): identifies the top-2 finalists of
+    each first-round draw, groups draws by matchup and runs the rejection-based
+    transfer for every group. Groups are processed in sorted label order so the
+    RNG stream is identical to the DataFrame path.
 
     Args:
-        validos_final: Array (N_SIM, n_candidatos_validos) of per-simulation
-                       valid vote shares after rejection ceiling
-        candidatos_validos: List of valid candidate names (same order as validos_final columns)
+        validos_final: Array (N_SIM, n_candidatos_validos) of valid vote shares
+        candidatos_validos: Valid candidate names (validos_final column order)
 
     Returns:
-        tuple: (df, info_matchups)
-            df columns: matchup, finalista_a, finalista_b, voto_a, voto_b,
-                        vencedor_2T, diferenca
-            info_matchups: dict keyed by matchup label with probability and winner stats
+        dict with keys:
+            matchup_labels, finalista_a, finalista_b  – (N_SIM,) object arrays
+            voto_a, voto_b                            – (N_SIM,) vote shares (%)
+            abstencao_2t                              – (N_SIM,) abstention rate
+            info_matchups                             – Per-matchup statistics
+        or None when fewer than two valid candidates are available.
     """
     print("\n[3/4] Simulating second round (dynamic top-2 per simulation)...")
 
     n_validos = len(candidatos_validos)
     if n_validos < 2:
         print("    Warning: Less than 2 valid candidates")
-        return pd.DataFrame(), {}
+        return None
 
     # Build REJEICAO lookup for valid candidates
     rej_validos = np.array([
@@ -893,17 +1367,20 @@ def simular_segundo_turno(validos_final, candidatos_validos):
     # Sort within each row so pair is always (lower_idx, higher_idx) → canonical order
     top2_sorted = np.sort(top2_indices, axis=1)
 
-    # Build matchup labels for each simulation
-    matchup_labels = np.array([
-        f"{candidatos_validos[a]} vs {candidatos_validos[b]}"
-        for a, b in top2_sorted
-    ])
-
-    unique_matchups = np.unique(matchup_labels)
+    # Build matchup labels once per distinct pair, then gather per simulation
+    codigos = top2_sorted[:, 0] * n_validos + top2_sorted[:, 1]
+    codigos_unicos, inverso = np.unique(codigos, return_inverse=True)
+    labels_unicos = np.array([
+        f"{candidatos_validos[c // n_validos]} vs {candidatos_validos[c % n_validos]}"
+        for c in codigos_unicos
+    ], dtype=object)
+    matchup_labels = labels_unicos[inverso]
+
+    unique_matchups = sorted(labels_unicos)
+    contagens = dict(zip(labels_unicos, np.bincount(inverso)))
     print(f"    Unique matchups detected: {len(unique_matchups)}")
     for mu in unique_matchups:
-        count = (matchup_labels == mu).sum()
-        print(f"      {mu}: {count / len(matchup_labels) * 100:.1f}% of simulations")
+        print(f"      {mu}: {contagens[mu] / len(matchup_labels) * 100:.1f}% of simulations")
 
     # Pre-allocate result arrays
     voto_a_arr = np.zeros(len(validos_final))
@@ -915,7 +1392,6 @@ def simular_segundo_turno(validos_final, candidatos_validos):
     abstencao_2t_sim = np.random.normal(
         ABSTENCAO_2T_MU, ABSTENCAO_2T_SIGMA, len(validos_final)
     ).clip(0.05, 0.45)
-    votos_validos_2t = (ELEITORADO * (1 - abstencao_2t_sim)).astype(np.int64)
 
     info_matchups = {}
 
@@ -957,16 +1433,58 @@ def simular_segundo_turno(validos_final, candidatos_validos):
             'rej_b': float(rej_b),
         }
 
-    vencedor_arr = np.where(voto_a_arr > voto_b_arr, finalista_a_arr, finalista_b_arr)
+    return {
+        'matchup_labels': matchup_labels,
+        'finalista_a': finalista_a_arr,
+        'finalista_b': finalista_b_arr,
+        'voto_a': voto_a_arr,
+        'voto_b': voto_b_arr,
+        'abstencao_2t': abstencao_2t_sim,
+        'info_matchups': info_matchups,
+    }
+
+
+def simular_segundo_turno(validos_final, candidatos_validos):
+    """
+    Simulates second round using actual top-2 finalists from each first-round simulation.
+
+    For each simulation in validos_final, the two candidates with the highest
+    valid vote share are identified as finalists. Simulations are then grouped
+    by matchup pair, and each group runs an independent rejection-based transfer.
+
+    This replaces the previous fixed-matchup approach where the same two candidates
+    were always assumed to be the finalists regardless of first-round outcomes.
+
+    Args:
+        validos_final: Array (N_SIM, n_candidatos_validos) of per-simulation
+                       valid vote shares after rejection ceiling
+        candidatos_validos: List of valid candidate names (same order as validos_final columns)
+
+    Returns:
+        tuple: (df, info_matchups)
+            df columns: matchup, finalista_a, finalista_b, voto_a, voto_b,
+                        vencedor_2T, diferenca
+            info_matchups: dict keyed by matchup label with probability and winner stats
+    """
+    amostras = amostrar_segundo_turno(validos_final, candidatos_validos)
+    if amostras is None:
+        return pd.DataFrame(), {}
+
+    voto_a_arr = amostras['voto_a']
+    voto_b_arr = amostras['voto_b']
+    abstencao_2t_sim = amostras['abstencao_2t']
+    votos_validos_2t = (ELEITORADO * (1 - abstencao_2t_sim)).astype(np.int64)
+
+    vencedor_arr = np.where(voto_a_arr > voto_b_arr, amostras['finalista_a'], amostras['finalista_b'])
     diferenca_arr = np.abs(voto_a_arr - voto_b_arr)
 
     votos_a_abs = (votos_validos_2t * voto_a_arr / 100).astype(np.int64)
     votos_b_abs = (votos_validos_2t * voto_b_arr / 100).astype(np.int64)
 
     df = pd.DataFrame({
-        'matchup': matchup_labels,
-        'finalista_a': finalista_a_arr,
-        'finalista_b': finalista_b_arr,
+        'matchup': amostras['matchup_labels'],
+        'finalista_a': amostras['finalista_a'],
+        'finalista_b': amostras['finalista_b'],
         'voto_a': voto_a_arr,
         'voto_b': voto_b_arr,
         'vencedor_2T': vencedor_arr,
@@ -981,13 +1499,235 @@ def simular_segundo_turno(validos_final, candidatos_validos):
     df.to_csv(OUTPUT_DIR / "resultados_2turno_v2.6.csv", index=False)
 
     print("    OK")
-    return df, info_matchups
+    return df, amostras['info_matchups']
+
+
+# ─── SUMMARY-ONLY MODE ────────────────────────────────────────────────────────
+
+def calcular_resumo(validos_final, candidatos_validos, votos_norm=None):
+    """
+    Builds the single-pass SummaryStats block for a set of first-round draws.
+
+    Args:
+        validos_final: Array (N_SIM, n_validos) of valid vote shares (%)
+        candidatos_validos: Valid candidate names (column order)
+        votos_norm: Optional (N_SIM, n_candidatos) total shares incl. blank/null
+
+    Returns:
+        SummaryStats (see src/core/summary.py)
+    """
+    return compute_summary(
+        validos_final, candidatos_validos,
+        thresholds=LIMIARES_RESUMO,
+        totals=votos_norm,
+        total_candidates=CANDIDATOS if votos_norm is not None else None,
+    )
+
+
+def resumo_df(df1):
+    """SummaryStats for a first-round DataFrame produced by simular_primeiro_turno()."""
+    cands_v = [c for c in CANDIDATOS if f"{c}_val" in df1.columns]
+    totais = [c for c in CANDIDATOS if c in df1.columns]
+    return compute_summary(
+        df1[[f"{c}_val" for c in cands_v]].to_numpy(), cands_v,
+        thresholds=LIMIARES_RESUMO,
+        totals=df1[totais].to_numpy() if totais else None,
+        total_candidates=totais or None,
+    )
+
+
+def _quantis_dict(media, quantis, niveis):
+    """Mean plus quantiles as a plain dict keyed media/p5/p50/p95."""
+    out = {'media': float(media)}
+    out.update({f"p{int(round(n * 100))}": float(v) for n, v in zip(niveis, quantis)})
+    return out
+
+
+def _inflar_erro(est, fator):
+    """Widens a prob_estimate() dict in place by ``fator`` (normal approximation)."""
+    est['se'] *= fator
+    est['low'] = max(0.0, est['p'] - (est['p'] - est['low']) * fator)
+    est['high'] = min(1.0, est['p'] + (est['high'] - est['p']) * fator)
+
+
+def _json_finito(obj):
+    """Replaces NaN/±inf floats by None, recursively, so json.dumps emits strict JSON."""
+    if isinstance(obj, dict):
+        return {k: _json_finito(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_finito(v) for v in obj]
+    if isinstance(obj, (float, np.floating)) and not np.isfinite(obj):
+        return None
+    return obj
+
+
+def resumo_primeiro_turno(amostras, amostras_2t=None, controles=False):
+    """
+    Reduces sampled arrays to the statistics printed by relatorio().
+
+    Operates directly on the outputs of amostrar_primeiro_turno() and
+    amostrar_segundo_turno(), so no per-draw DataFrame is ever built.
+    Probabilities are fractions in [0, 1]; vote shares and margins are in pp.
+    Non-finite numbers (e.g. the variance reduction of a target pinned at
+    0 or 1) are reported as None.
+
+    Args:
+        amostras: dict returned by amostrar_primeiro_turno()
+        amostras_2t: Optional dict returned by amostrar_segundo_turno()
+        controles: Add the 'variaveis_controle' block (estimar_com_controles(),
+                   which costs more than the rest of the summary)
+
+    Returns:
+        dict: JSON-serialisable summary (pv, p2t, p2v, matchups, quantiles,
+              margin thresholds and ceiling/undecided diagnostics)
+    """
+    stats = calcular_resumo(
+        amostras['validos_final'], amostras['candidatos_validos'], amostras['votos_norm']
+    )
+    niveis = stats.quantile_levels
+    n = stats.n_sim
+
+    resumo = {
+        'n_sim': n,
+        'candidatos': list(CANDIDATOS),
+        'votos': {
+            c: _quantis_dict(stats.total_mean[i], stats.total_quantiles[i], niveis)
+            for i, c in enumerate(stats.total_candidates)
+        },
+        'votos_validos': {
+            c: _quantis_dict(stats.mean[i], stats.quantiles[i], niveis)
+            for i, c in enumerate(stats.candidates)
+        },
+        'pv': stats.win_prob,
+        'p_maioria_1t': stats.majority_prob,
+        'p2t': stats.p2t,
+        'margem_1t': {
+            **_quantis_dict(stats.margin_mean, stats.margin_quantiles, niveis),
+            'apertada_3pp': stats.prob_margin_below(3),
+            'confortavel_10pp': stats.prob_margin_above(10),
+            'thresholds': {str(t): stats.prob_margin_above(t) for t in MARGIN_THRESHOLDS},
+        },
+        'info_lim_1t': amostras['info_limitacoes'],
+        'info_indecisos': amostras['info_indecisos'],
+        # Monte Carlo error: {p, se, low, high} per probability (95% Wilson),
+        # batch-means SE for margin quantiles
+        'erro_mc': {
+            'pv': {c: stats.estimate(k) for c, k in zip(stats.candidates, stats.win_counts)},
+            'p2t': stats.estimate(stats.runoff_count),
+            'thresholds': {str(t): stats.margin_above_estimate(t) for t in MARGIN_THRESHOLDS},
+            'margem_1t_se': {
+                f"p{int(round(q * 100))}": float(e)
+                for q, e in zip(niveis, stats.margin_quantile_errors)
+            },
+        },
+    }
+    if controles:
+        # Raw vs control-variate estimates and variance reduction per target
+        resumo['variaveis_controle'] = estimar_com_controles(
+            amostras['votos_norm'], amostras['validos_final'], amostras['candidatos_validos']
+        )
+
+    if 'reponderacao' in amostras:
+        resumo['reponderacao'] = amostras['reponderacao']
+        ess = amostras['reponderacao'].get('ess')
+        if ess:
+            # Resampled draws repeat: the Monte Carlo error follows the ESS
+            fator = float(np.sqrt(n / ess))
+            erro = resumo['erro_mc']
+            for est in [*erro['pv'].values(), erro['p2t'], *erro['thresholds'].values()]:
+                _inflar_erro(est, fator)
+            for est in resumo.get('variaveis_controle', {}).values():
+                est['raw_se'] *= fator
+                est['se'] *= fator
+
+    if amostras_2t is not None:
+        voto_a, voto_b = amostras_2t['voto_a'], amostras_2t['voto_b']
+        vencedor = np.where(voto_a > voto_b, amostras_2t['finalista_a'], amostras_2t['finalista_b'])
+        nomes, freq = np.unique(vencedor.astype(str), return_counts=True)
+        resumo['p2v'] = {str(c): float(f / n) for c, f in zip(nomes, freq)}
+        resumo['matchups'] = {
+            mu: {
+                **info,
+                'n_sims': int(info['n_sims']),
+                'prob_matchup': info['prob_matchup'] / 100,
+                'prob_a': info['prob_a'] / 100,
+                'prob_b': info['prob_b'] / 100,
+            }
+            for mu, info in amostras_2t['info_matchups'].items()
+        }
+        resumo['apertada_2t_3pp'] = float((np.abs(voto_a - voto_b) < 3).mean())
+
+    return _json_finito(resumo)
+
+
+def montar_resultado(df1, df2, info_lim_1t, info_matchups, info_indecisos, resumo=None):
+    """
+    Packs one run into a SimulationResult with its summary block precomputed.
+
+    The SummaryStats block is computed once here (or reused when ``resumo`` is
+    given) and cached on the result, so relatorio(), the dashboard and any
+    other consumer read identical numbers without rescanning the draws.
+    """
+    resumo = resumo if resumo is not None else resumo_df(df1)
+    if not df2.empty:
+        p2v = (df2["vencedor_2T"].value_counts() / len(df2)).to_dict()
+    else:
+        p2v = {}
+    return SimulationResult(
+        df1=df1,
+        df2=df2,
+        pv=resumo.win_prob,
+        p2v={str(c): float(p) for c, p in p2v.items()},
+        p2t=resumo.p2t,
+        info_matchups=info_matchups,
+        info_lim_1t=info_lim_1t,
+        info_indecisos=info_indecisos or {},
+        margins=df1["margem_1t"].to_numpy() if "margem_1t" in df1.columns else np.empty(0),
+        config=SimulationConfig(csv_path=CSV_PATH, n_sim=len(df1)),
+        summary=resumo,
+    )
+
+
+def registrar_historico(resultado, caminho=None):
+    """
+    Appends a run to the forecast history (src/io/history.py).
+
+    The sampling back-end and whether the empirical error bank was active
+    are recorded with the config, so they count in the run's input hash.
+
+    Returns:
+        The run id in the history database.
+    """
+    extra = {'amostragem': AMOSTRAGEM, 'erro_empirico': BANCO_ERROS is not None}
+    return save_result(resultado, caminho or HISTORICO_PATH, extra=extra)
 
 
 # ─── REPORT ───────────────────────────────────────────────────────────────────
 
-def relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos=None):
-    """Generates comprehensive report."""
+def _fmt_mc(est):
+    """'± SE  [low–high]' suffix (pp) for a prob_estimate() dict."""
+    return (f"± {est['se'] * 100:.2f}  "
+            f"95% MC:[{est['low'] * 100:.2f}–{est['high'] * 100:.2f}]")
+
+
+def relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos=None, resumo=None,
+              amostras=None):
+    """
+    Generates comprehensive report.
+
+    All first-round statistics are read from a single SummaryStats block
+    (``resumo``, computed with resumo_df() when not supplied) instead of one
+    pandas scan per candidate, quantile and threshold.
+
+    Every probability is followed by its Monte Carlo standard error and a
+    95% Wilson interval; margin quantiles carry batch-means errors.  These
+    quantify simulation noise only (what a different seed would change).
+
+    The sensitivity tornado is printed only when the first-round draws that
+    produced ``df1`` are passed as ``amostras`` (see sensibilidades()).
+    """
+    if resumo is None:
+        resumo = resumo_df(df1)
     sep = "=" * 60
     print(f"\n{sep}\n  REPORT - BRAZIL 2026 ELECTIONS [v2.4]\n{sep}")
     
@@ -1022,22 +1762,28 @@ def relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos=None):
         print(f"  {status} {cand:20s} Rej: {rej:5.1f}% → Ceiling: {teto:5.1f}%")
     
     print("\nFIRST ROUND - Total votes:")
-    for cand in CANDIDATOS:
-        p5, p95 = df1[cand].quantile([0.05, 0.95])
-        print(f"  {cand:22s} {df1[cand].mean():5.2f}%  90% CI:[{p5:.2f}-{p95:.2f}%]")
-    
-    pv = df1["vencedor"].value_counts() / N_SIM * 100
-    print("\nFirst round victory probability:")
+    for i, cand in enumerate(resumo.total_candidates):
+        p5 = resumo.quantile(cand, 0.05, total=True)
+        p95 = resumo.quantile(cand, 0.95, total=True)
+        print(f"  {cand:22s} {resumo.total_mean[i]:5.2f}%  90% CI:[{p5:.2f}-{p95:.2f}%]")
+    
+    pv = pd.Series(
+        {c: p * 100 for c, p in resumo.win_prob.items() if p > 0}, dtype=float
+    ).sort_values(ascending=False)
+    n = resumo.n_sim
+    vitorias = dict(zip(resumo.candidates, resumo.win_counts))
+    print(f"\nFirst round victory probability (MC error at n_sim={n:,}):")
     for c, p in pv.items():
-        print(f"  {c:22s} {p:.2f}%")
+        print(f"  {c:22s} {p:.2f}%  {_fmt_mc(prob_estimate(vitorias[c], n))}")
     
-    p2t = df1["tem_2turno"].mean() * 100
-    print(f"\nSecond round probability: {p2t:.2f}%")
+    p2t = resumo.p2t * 100
+    print(f"\nSecond round probability: {p2t:.2f}%  {_fmt_mc(prob_estimate(resumo.runoff_count, n))}")
     
     lider = candidatos_validos[0]
-    if f"{lider}_val" in df1.columns:
-        prob_lider_1t = (df1[f"{lider}_val"] > 50).mean() * 100
-        print(f"{lider} first round victory: {prob_lider_1t:.2f}%")
+    if lider in resumo.candidates:
+        k_lider = resumo.majority_counts[resumo.candidates.index(lider)]
+        prob_lider_1t = k_lider / n * 100
+        print(f"{lider} first round victory: {prob_lider_1t:.2f}%  {_fmt_mc(prob_estimate(k_lider, n))}")
     
     if not df2.empty:
         print("\nSECOND ROUND MATCHUP PROBABILITIES (v2.5):")
@@ -1047,12 +1793,15 @@ def relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos=None):
             print(f"    {info['cand_a']:22s} Rej:{info['rej_a']:5.1f}%  Victory: {info['prob_a']:.1f}%")
             print(f"    {info['cand_b']:22s} Rej:{info['rej_b']:5.1f}%  Victory: {info['prob_b']:.1f}%")
 
-        p2v = df2["vencedor_2T"].value_counts() / len(df2) * 100
+        contagem_2v = df2["vencedor_2T"].value_counts()
+        p2v = contagem_2v / len(df2) * 100
         print("\nOVERALL SECOND ROUND VICTORY PROBABILITY:")
         for c, p in p2v.items():
-            print(f"  {c:22s} {p:.2f}%")
+            print(f"  {c:22s} {p:.2f}%  {_fmt_mc(prob_estimate(contagem_2v[c], len(df2)))}")
 
-        print(f"\nClose race (<3pp): {(df2['diferenca'] < 3).mean() * 100:.2f}% of scenarios")
+        k_apertada = int((df2['diferenca'] < 3).sum())
+        print(f"\nClose race (<3pp): {k_apertada / len(df2) * 100:.2f}% of scenarios  "
+              f"{_fmt_mc(prob_estimate(k_apertada, len(df2)))}")
 
         # ── Absolute vote projections (v2.6) ──────────────────────────────────
         if 'votos_validos_2t' in df2.columns and not df2.empty:
@@ -1062,43 +1811,171 @@ def relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos=None):
             med_turn = df2['votos_validos_2t'].median()
             print(f"  Median turnout:   {med_turn:>14,.0f}  (abstention: {med_abs:.1f}%)")
             dominant = max(info_matchups.items(), key=lambda x: x[1]['prob_matchup'])[1]
+            # One pass over every absolute-vote column
+            colunas = ['votos_a_abs', 'votos_b_abs', 'margem_votos']
+            tabela = dict(zip(colunas, quantile_table(df2[colunas].to_numpy(), (0.05, 0.50, 0.95))))
             for col, label in [('votos_a_abs', dominant['cand_a']),
                                 ('votos_b_abs', dominant['cand_b'])]:
-                if col in df2.columns:
-                    p5, p50, p95 = df2[col].quantile([0.05, 0.50, 0.95])
-                    print(f"  {label:22s} {p50:>12,.0f} votes  "
-                          f"90% CI: [{p5:,.0f} – {p95:,.0f}]")
-            p5m, p50m, p95m = df2['margem_votos'].quantile([0.05, 0.50, 0.95])
+                p5, p50, p95 = tabela[col]
+                print(f"  {label:22s} {p50:>12,.0f} votes  "
+                      f"90% CI: [{p5:,.0f} – {p95:,.0f}]")
+            p5m, p50m, p95m = tabela['margem_votos']
             print(f"  Median margin:    {p50m:>12,.0f} votes  "
                   f"90% CI: [{p5m:,.0f} – {p95m:,.0f}]")
     # ── First-round margin analysis (v2.8) ────────────────────────────────────
     if "margem_1t" in df1.columns:
-        m = df1["margem_1t"]
-        p5_m, p50_m, p95_m = m.quantile([0.05, 0.50, 0.95])
+        p5_m, p50_m, p95_m = (resumo.margin_quantile(q) for q in (0.05, 0.50, 0.95))
         print("\nFIRST-ROUND MARGIN ANALYSIS (v2.8):")
-        print(f"  Median margin (1st vs 2nd):  {p50_m:.1f}pp   "
+        print(f"  Median margin (1st vs 2nd):  {p50_m:.1f}pp ± {resumo.margin_quantile_se(0.50):.2f}   "
               f"90% CI: [{p5_m:.1f} – {p95_m:.1f}]")
         print(f"  Close race  (<3pp):          "
-              f"{(m < 3).mean() * 100:.1f}% of simulations")
+              f"{resumo.prob_margin_below(3) * 100:.1f}% of simulations")
         print(f"  Comfortable (>10pp):         "
-              f"{(m > 10).mean() * 100:.1f}% of simulations")
-        print(f"\n  Threshold probabilities:")
+              f"{resumo.prob_margin_above(10) * 100:.1f}% of simulations")
+        print(f"\n  Threshold probabilities (± MC standard error, 95% Wilson interval):")
         for thr in MARGIN_THRESHOLDS:
             marker = "   ← Polymarket market" if thr == 15 else ""
-            print(f"    P(margin > {thr:2d}pp):  {(m > thr).mean() * 100:5.1f}%{marker}")
+            est = resumo.margin_above_estimate(thr)
+            print(f"    P(margin > {thr:2d}pp):  {est['p'] * 100:5.1f}%  "
+                  f"{_fmt_mc(est)}{marker}")
 
         if "lider_1t" in df1.columns:
             print(f"\n  First-round leader distribution:")
-            for cand, freq in df1["lider_1t"].value_counts().items():
-                print(f"    {cand:26s} led in {freq / len(df1) * 100:.1f}% of simulations")
+            for cand, freq in sorted(zip(resumo.candidates, resumo.win_counts),
+                                     key=lambda x: x[1], reverse=True):
+                if freq > 0:
+                    print(f"    {cand:26s} led in {freq / resumo.n_sim * 100:.1f}% of simulations")
+
+    # ── Sensitivities (score-function, same draws) ────────────────────────────
+    if amostras is not None:
+        tabela = sensibilidades(amostras)
+        print("\nSENSITIVITIES — change in probability per +1pp of input (± SE):")
+        for alvo in alvos_tornado(tabela, resumo):
+            print(f"\n  {alvo}  (now {_prob_alvo(resumo, alvo) * 100:.1f}%)")
+            for _, linha in tornado(tabela, alvo, top=6).iterrows():
+                print(f"    {linha['entrada']:34s} {linha['efeito'] * 100:+7.2f}pp "
+                      f"± {linha['ep'] * 100:.2f}")
     print(sep)
     return pv, p2v if not df2.empty else pd.Series(), p2t
 
+
+def _prob_alvo(resumo, alvo):
+    """Current probability of a sensibilidades() target from a SummaryStats block."""
+    if alvo == "p2t":
+        return resumo.p2t
+    if alvo.startswith("pv "):
+        return resumo.win_prob.get(alvo[3:], 0.0)
+    return resumo.prob_margin_above(float(alvo.split("> ")[1].rstrip("p")))
+
+
+def alvos_tornado(tabela, resumo, maximo=3):
+    """
+    Targets worth a tornado: the leader's win probability, P(2nd round) and
+    margin thresholds, keeping those not already pinned at 0 or 1.
+    """
+    lider = max(resumo.win_prob, key=resumo.win_prob.get)
+    candidatos = [f"pv {lider}", "p2t"] + [f"margem > {t:g}pp" for t in MARGIN_THRESHOLDS]
+    vivos = [a for a in candidatos
+             if a in set(tabela["alvo"]) and 0.01 < _prob_alvo(resumo, a) < 0.99]
+    return vivos[:maximo]
+
+def _controles(votos_norm):
+    """Dirichlet control variates (src/core/control_variates.py) for total shares in %."""
+    alphas, _, _ = parametros_dirichlet()
+    indices_validos = [i for i, c in enumerate(CANDIDATOS)
+                       if "Brancos" not in c and "Nulos" not in c]
+    return dirichlet_controls(np.asarray(votos_norm) / 100, alphas, indices_validos)
+
+
+def estimar_com_controles(votos_norm, validos_final, candidatos_validos,
+                          limiares=MARGIN_THRESHOLDS):
+    """
+    Control-variate estimates of pv, p2t and P(margin > X).
+
+    Uses the exact Beta means of the raw and ceiling-free valid shares and
+    the ceiling-free majority probabilities as controls. Requires the module
+    state of the run that produced the draws (inicializar()).
+
+    Args:
+        votos_norm: (N, n_candidatos) total shares in % (raw Dirichlet × 100)
+        validos_final: (N, n_validos) valid shares after ceiling (%)
+        candidatos_validos: Column names of validos_final
+        limiares: Margin thresholds (pp)
+
+    Returns:
+        dict: {name: {raw, raw_se, estimate, se, variance_reduction}} with
+              names 'pv:<cand>', 'p2t' and 'margem>X'
+    """
+    lider, _, margem = top_two(validos_final)
+    alvos = [lider == i for i in range(len(candidatos_validos))]
+    nomes = [f"pv:{c}" for c in candidatos_validos]
+    alvos.append(validos_final.max(axis=1) < 50)
+    nomes.append("p2t")
+    for thr in limiares:
+        alvos.append(margem > thr)
+        nomes.append(f"margem>{thr:g}")
+
+    controles, medias, _ = _controles(votos_norm)
+    resultado = cv_estimate(np.column_stack(alvos), controles, medias, nomes).as_dict()
+    for est in resultado.values():
+        est['estimate'] = min(max(est['estimate'], 0.0), 1.0)
+    return resultado
+
+
+def estimar_cauda(threshold, candidate=None, n_sim=None):
+    """
+    Importance-sampling estimate of P(margin > threshold) for tail markets.
+
+    Samples from a Dirichlet tilted toward the candidate expected to open the
+    margin (``candidate`` when given, otherwise the leader by mean valid
+    share) and reweights by the density ratio; see src/core/tail.py.  With
+    the empirical error bank loaded, the estimate is stratified by bank
+    record (same record probabilities as erros_empiricos()), so the tail
+    opened by the historical errors is covered too.  Requires inicializar()
+    to have run.
+
+    Args:
+        threshold: Margin threshold in pp.
+        candidate: Optional candidate name for the signed margin market.
+        n_sim:     Proposal draws (default: N_SIM).
+
+    Returns:
+        TailEstimate (prob, se, low, high, ess, n, hits, tilt, proposal_alphas)
+    """
+    alphas, _, _ = parametros_dirichlet()
+    transform = lambda props: validos_de_proporcoes(props)[0]
+    candidatos_validos = [c for c in CANDIDATOS if "Brancos" not in c and "Nulos" not in c]
+
+    if candidate is not None:
+        if candidate not in candidatos_validos:
+            raise KeyError(f"Unknown candidate '{candidate}'. Valid: {candidatos_validos}")
+        alvo, coluna = CANDIDATOS.index(candidate), candidatos_validos.index(candidate)
+    else:
+        media = transform((alphas / alphas.sum())[np.newaxis, :])[0]
+        alvo, coluna = CANDIDATOS.index(candidatos_validos[int(np.argmax(media))]), None
+
+    n = N_SIM if n_sim is None else n_sim
+    if BANCO_ERROS is None:
+        return estimate_tail(alphas, transform, threshold, alvo, coluna, n=n)
+
+    def com_erro(erro):
+        return lambda props: validos_de_proporcoes(
+            props, np.broadcast_to(erro, (len(props), erro.size))
+        )[0]
+
+    pesos = BANCO_ERROS.weights(max((DATA_ELEICAO - DATA_ATUAL).days, 0))
+    return estimate_tail_strata(
+        alphas, [com_erro(e) for e in BANCO_ERROS.erros], pesos,
+        threshold, alvo, coluna, n=n,
+    )
+
+
 def polymarket_edge(
     df1: pd.DataFrame,
     threshold: float,
     market_prob: float,
     candidate: str | None = None,
+    metodo: str = "auto",
 ) -> dict:
     """
     Computes edge between model and Polymarket for a first-round margin threshold market.
@@ -1115,6 +1992,16 @@ def polymarket_edge(
         candidate:    Optional candidate name to condition on (e.g. "Lula").
                       When supplied, uses ``df1["margem_<candidate>"]`` so only
                       simulations where that candidate is leading count.
+        metodo:       "contagem" counts draws in ``df1``; "is" uses the
+                      importance-sampling estimator (estimar_cauda()) with
+                      ``len(df1)`` proposal draws; "cv" applies Dirichlet
+                      control variates to the draws in ``df1``; "auto"
+                      (default) switches to "is" when the counted probability
+                      is below TAIL_IS_CUTOFF and counts otherwise. "is" and
+                      "cv" rebuild the model from the module state, so they
+                      need ``df1`` straight from simular_primeiro_turno()
+                      with the same polls still loaded; otherwise they raise
+                      ValueError and "auto" counts.
 
     Returns:
         dict with keys:
@@ -1125,6 +2012,19 @@ def polymarket_edge(
             threshold_pp  – Echo of the threshold argument
             candidate     – Echo of the candidate argument (or None)
             n_sim         – Number of simulations used
+            mc_se         – Monte Carlo standard error of model_prob
+            ci_low / ci_high – 95% Wilson interval for model_prob
+            z_score       – edge / mc_se
+            significant   – True when market_prob lies outside the interval,
+                            i.e. the edge is distinguishable from MC noise
+            min_detectable_edge – Interval half-width at this n_sim
+            metodo        – Estimator actually used ("contagem", "is" or "cv")
+            ess           – Effective sample size (importance sampling only)
+            prob_bruta, reducao_variancia – Raw count estimate and
+                            Var(raw) / Var(cv) (control variates only)
+
+        A non-significant edge means the simulation is too short to tell the
+        model and the market apart; rerun with a larger ``--n-sim``.
     """
     if candidate is not None:
         col = f"margem_{candidate}"
@@ -1141,7 +2041,42 @@ def polymarket_edge(
             )
         series = df1["margem_1t"]
 
-    model_prob = float((series > threshold).mean())
+    if metodo not in ("auto", "contagem", "is", "cv"):
+        raise ValueError(f"metodo must be 'auto', 'contagem', 'is' or 'cv', got '{metodo}'")
+
+    n = len(series)
+    k = int((series > threshold).sum())
+    model_prob = k / n
+    if metodo != "contagem":
+        chave = df1.attrs.get("chave_modelo")
+        mesmo_modelo = chave is not None and chave == _chave_modelo()
+        if metodo in ("is", "cv") and not mesmo_modelo:
+            raise ValueError(
+                f"metodo='{metodo}' rebuilds the model from the loaded polls, which "
+                "did not produce df1 (polls reloaded since simular_primeiro_turno(), "
+                "or df1 read back from disk); use metodo='contagem'"
+            )
+    usar_is = metodo == "is" or (
+        metodo == "auto" and model_prob < TAIL_IS_CUTOFF and mesmo_modelo
+    )
+    if metodo == "cv":
+        controles, medias, _ = _controles(df1[CANDIDATOS].to_numpy())
+        est = cv_estimate((series > threshold).to_numpy(), controles, medias).as_dict()["0"]
+        model_prob = min(max(est["estimate"], 0.0), 1.0)
+        significancia = edge_significance_se(model_prob, est["se"], market_prob)
+        extra = {
+            "metodo": "cv",
+            "prob_bruta": round(k / n, 4),
+            "reducao_variancia": round(est["variance_reduction"], 2),
+        }
+    elif usar_is:
+        cauda = estimar_cauda(threshold, candidate, n_sim=n)
+        model_prob = cauda.prob
+        significancia = edge_significance_se(cauda.prob, cauda.se, market_prob)
+        extra = {"metodo": "is", "ess": round(cauda.ess, 1)}
+    else:
+        significancia = edge_significance(k, n, market_prob)
+        extra = {"metodo": "contagem"}
     edge = model_prob - market_prob
     # Half-Kelly: f* = (bp - q) / b  where b = (1/market_prob - 1), halved
     if edge > 0 and market_prob < 1.0:
@@ -1159,8 +2094,332 @@ def polymarket_edge(
         "threshold_pp":   threshold,
         "candidate":      candidate,
         "n_sim":          len(df1),
+        **significancia,
+        **extra,
     }
 
+# ─── ANALYTIC PREVIEW ─────────────────────────────────────────────────────────
+
+def previa_analitica(poll=None):
+    """
+    Closed-form first-round preview (src/core/analytic.py): pv, p2t, majority
+    and top-two probabilities from Beta CDFs and normal approximations, in
+    well under a millisecond.  Use it for live feedback; the Monte Carlo
+    run remains the reference.
+
+    Args:
+        poll: PollData (e.g. from carregar_poll_data()); defaults to the
+              polls loaded by inicializar().
+
+    Returns:
+        AnalyticPreview
+
+    Raises:
+        ValueError: The empirical error bank is loaded (not modelled here).
+    """
+    _exigir_sem_banco_erros("previa_analitica")
+    poll = poll if poll is not None else poll_data_atual()
+    return preview(poll, desvio=calcular_desvio_ajustado(poll.desvio_base))
+
+
+def imprimir_previa(previa, resumo=None):
+    """Prints an analytic preview, next to a Monte Carlo SummaryStats when given."""
+    mc = resumo is not None
+    print("\nANALYTIC PREVIEW" + ("  (Monte Carlo confirmation on the right)" if mc else ""))
+    print(f"  {'':26s} {'analytic':>9s}" + (f" {'MC':>9s}" if mc else ""))
+    for c in previa.candidates:
+        linha = f"  pv {c:23s} {previa.win_prob[c] * 100:8.2f}%"
+        if mc:
+            linha += f" {resumo.win_prob.get(c, 0.0) * 100:8.2f}%"
+        print(linha)
+    print(f"  {'p2t':26s} {previa.p2t * 100:8.2f}%" + (f" {resumo.p2t * 100:8.2f}%" if mc else ""))
+    pares = sorted(previa.top2_prob.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    for (a, b), p in pares:
+        linha = f"  2T {a} × {b}"[:28].ljust(28) + f" {p * 100:8.2f}%"
+        if mc:
+            linha += f" {resumo.pair_prob.get((a, b), resumo.pair_prob.get((b, a), 0.0)) * 100:8.2f}%"
+        print(linha)
+
+
+# ─── SENSITIVITIES ────────────────────────────────────────────────────────────
+
+def _alvos_sensibilidade(validos, candidatos_validos, limiares):
+    """(N, T) per-draw targets and their names: pv, p2t, P(margin > X)."""
+    lider, _, margem = top_two(validos)
+    cols = [(lider == i) for i in range(len(candidatos_validos))]
+    nomes = [f"pv {c}" for c in candidatos_validos]
+    cols.append(validos.max(axis=1) < 50)
+    nomes.append("p2t")
+    for thr in limiares:
+        cols.append(margem > thr)
+        nomes.append(f"margem > {thr:g}pp")
+    return np.column_stack(cols).astype(float), nomes
+
+
+def sensibilidades(amostras, limiares=MARGIN_THRESHOLDS):
+    """
+    d(probability) / d(input) from the draws of one run (src/core/sensitivity.py).
+
+    Vote means, rejection rates and DESVIO enter the Dirichlet parameters;
+    their effect is estimated with the likelihood-ratio (score-function)
+    estimator.  Rejection rates also set the ceiling, whose effect is added
+    as a finite difference on the same draws.  No new draws are made.
+
+    The estimator needs plain draws from Dir(``amostras['alphas']``) mapped
+    to valid shares by the ceiling alone, so it refuses draws carrying
+    empirical errors or reweighted from an earlier run.
+
+    Args:
+        amostras: First-round draws from amostrar_primeiro_turno() (or its
+                  _auto / _pool variants) for the polls currently loaded.
+        limiares: Margin thresholds (pp) included as targets.
+
+    Returns:
+        DataFrame (long format) with columns entrada, candidato, parametro,
+        alvo, efeito, ep — ``efeito`` is the change in probability per +1pp
+        of the input.
+
+    Raises:
+        ValueError: The draws are not plain Dirichlet draws for the current polls.
+    """
+    if BANCO_ERROS is not None:
+        raise ValueError("sensibilidades() does not support draws with empirical errors")
+    if amostras.get('reponderacao', {}).get('reamostrado') is False:
+        raise ValueError("sensibilidades() needs fresh draws, not draws reweighted from an earlier run")
+    mascara = valid_mask(CANDIDATOS)
+    cands_v = [c for c, ok in zip(CANDIDATOS, mascara) if ok]
+    x = amostras['votos_norm'] / 100
+    k = len(CANDIDATOS)
+    fracao_brancos = amostras['info_indecisos'].get('blank_fraction', 0.0)
+
+    def alphas_de(theta):
+        votos, rej, desvio = theta[:k], theta[k:2 * k], theta[2 * k]
+        efetivos = redistribute_undecided(votos[np.newaxis], rej[np.newaxis],
+                                          [INDECISOS], [fracao_brancos], mascara)
+        return dirichlet_alphas(efetivos, [desvio])[0]
+
+    def alvos_com_rejeicao(rej):
+        validos = valid_shares_from_gammas(x[np.newaxis], rej[np.newaxis], mascara)[0]
+        return _alvos_sensibilidade(validos, cands_v, limiares)[0]
+
+    theta = np.concatenate([VOTOS_MEDIA, REJEICAO, [DESVIO]]).astype(float)
+    alphas = np.asarray(amostras['alphas'], dtype=float)
+    if alphas.shape != (k,) or not np.allclose(alphas_de(theta), alphas):
+        raise ValueError("sensibilidades(): the draws were not made with the polls currently loaded")
+    alvos, nomes_alvos = _alvos_sensibilidade(amostras['validos_final'], cands_v, limiares)
+    grad, se = score_gradient(alvos, x, alphas, numeric_jacobian(alphas_de, theta))
+
+    entradas = ([(c, "votos_media") for c in CANDIDATOS]
+                + [(c, "rejeicao") for c in CANDIDATOS] + [("—", "desvio")])
+    linhas = []
+    for p, (cand, param) in enumerate(entradas):
+        if param == "rejeicao" and not mascara[p - k]:
+            continue
+        g, e = grad[:, p], se[:, p]
+        if param == "rejeicao":
+            # Ceiling channel: same draws, rejection rate ± 0.5pp
+            dg, de = ceiling_difference(alvos_com_rejeicao, REJEICAO, p - k)
+            g, e = g + dg, np.hypot(e, de)
+        rotulo = "DESVIO" if param == "desvio" else f"{cand} · {param}"
+        for t, alvo in enumerate(nomes_alvos):
+            linhas.append({"entrada": rotulo, "candidato": cand, "parametro": param,
+                           "alvo": alvo, "efeito": float(g[t]), "ep": float(e[t])})
+    return pd.DataFrame(linhas)
+
+
+# ─── SCENARIO SWEEP ───────────────────────────────────────────────────────────
+
+def poll_data_atual():
+    """The aggregated polls loaded by inicializar() as a PollData."""
+    return PollData(
+        candidatos=list(CANDIDATOS),
+        votos_media=np.array(VOTOS_MEDIA, dtype=float),
+        rejeicao=np.array(REJEICAO, dtype=float),
+        desvio_base=float(DESVIO_BASE),
+        indecisos=float(INDECISOS),
+    )
+
+
+def aplicar_poll_data(poll, data_referencia=None):
+    """
+    Loads an aggregated PollData into the module globals, like inicializar()
+    does from a CSV but without re-reading or printing anything.
+
+    Args:
+        poll:            Aggregated polls.
+        data_referencia: Forecast date for the funnel-effect deviation
+                         (updates DATA_ATUAL; default: unchanged).
+    """
+    global CANDIDATOS, VOTOS_MEDIA, REJEICAO, DESVIO_BASE, INDECISOS, CORES, DESVIO, DATA_ATUAL
+    if data_referencia is not None:
+        DATA_ATUAL = data_referencia
+    CANDIDATOS = list(poll.candidatos)
+    VOTOS_MEDIA = np.asarray(poll.votos_media, dtype=float)
+    REJEICAO = np.asarray(poll.rejeicao, dtype=float)
+    DESVIO_BASE = float(poll.desvio_base)
+    INDECISOS = float(poll.indecisos)
+    CORES = gerar_cores(len(CANDIDATOS))
+    DESVIO = calcular_desvio_ajustado()
+
+
+def carregar_poll_data(csv_path):
+    """Aggregates a poll CSV into a PollData without printing or touching the globals."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        candidatos, votos, rejeicao, desvio_base, indecisos = carregar_pesquisas(csv_path)
+    return PollData(
+        candidatos=list(candidatos),
+        votos_media=np.asarray(votos, dtype=float),
+        rejeicao=np.asarray(rejeicao, dtype=float),
+        desvio_base=float(desvio_base),
+        indecisos=float(indecisos),
+    )
+
+
+def varrer_cenarios(cenarios, n_sim=None, metodo=None):
+    """
+    What-if sweep over scenario overrides using the current aggregated polls.
+
+    All scenarios are evaluated in one batched run (see src/core/sweep.py):
+    no globals are rebuilt, nothing is printed and nothing is written.
+
+    Args:
+        cenarios: List of override dicts in the ``scenario_overrides`` format,
+                  or a grid dict ``{"Lula.votos_media": [33, 35], ...}``
+                  expanded with expand_grid().
+        n_sim:    Draws per scenario (default: N_SIM).
+        metodo:   Sampling back-end (default: AMOSTRAGEM).
+
+    Returns:
+        DataFrame with one row per scenario.
+
+    Raises:
+        ValueError: The empirical error bank is loaded (not modelled here).
+    """
+    _exigir_sem_banco_erros("varrer_cenarios")
+    if isinstance(cenarios, dict):
+        cenarios = expand_grid(cenarios)
+    return run_sweep(
+        poll_data_atual(), cenarios,
+        n_sim=n_sim or N_SIM,
+        desvio=DESVIO,
+        thresholds=LIMIARES_RESUMO,
+        method=metodo or AMOSTRAGEM,
+    )
+
+# ─── PAIRED POLL COMPARISON ───────────────────────────────────────────────────
+
+def comparar_pesquisas(csv_antigo, csv_novo, n_sim=None, metodo=None):
+    """
+    How much did a poll update move the forecast?
+
+    Aggregates both CSVs and runs the two configurations on common random
+    numbers (see src/core/paired.py), so the deltas carry paired standard
+    errors far smaller than those of two independent runs.  Does not touch
+    the module globals.
+
+    Args:
+        csv_antigo: Poll CSV before the update.
+        csv_novo:   Poll CSV after the update.
+        n_sim:      Shared number of draws (default: N_SIM).
+        metodo:     Uniform source (default: AMOSTRAGEM).
+
+    Returns:
+        DataFrame indexed by metric with antes, depois, delta, ep_pareado,
+        ep_independente, z, ganho_variancia.
+
+    Raises:
+        ValueError: The empirical error bank is loaded (not modelled here).
+    """
+    _exigir_sem_banco_erros("comparar_pesquisas")
+    antigo, novo = carregar_poll_data(csv_antigo), carregar_poll_data(csv_novo)
+    return paired_compare(
+        antigo, novo,
+        n_sim=n_sim or N_SIM,
+        desvio_a=calcular_desvio_ajustado(antigo.desvio_base),
+        desvio_b=calcular_desvio_ajustado(novo.desvio_base),
+        thresholds=LIMIARES_RESUMO,
+        method=metodo or AMOSTRAGEM,
+    )
+
+# ─── FORECAST TRAJECTORY (BACKFILL) ───────────────────────────────────────────
+
+def backfill_trajetoria(csv_path=None, inicio=None, fim=None, n_sim=None, semente=42, caminho=None):
+    """
+    Recomputes the first-round forecast for every day of the campaign.
+
+    Each day is aggregated only from the polls published by then (same
+    temporal weights, outlier rule and combined deviation as
+    carregar_pesquisas(), with the funnel-effect deviation of that day), all
+    days in one matrix product, and simulated in one batched pass on common
+    random numbers (see src/core/trajectory.py).  The empirical error bank
+    is not applied.  Does not touch the module globals.
+
+    Args:
+        csv_path: Poll CSV (default: data/pesquisas.csv).
+        inicio:   First day (date or ISO string); default: first poll date.
+        fim:      Last day; default: the later of DATA_ATUAL and the last poll.
+        n_sim:    Draws per day (default: N_SIM).
+        semente:  Seed of the shared normals.
+        caminho:  Output CSV (default: TRAJETORIA_PATH); '' skips writing.
+
+    Returns:
+        DataFrame, one row per day: ``data``, ``n_pesquisas``, ``desvio``,
+        ``indecisos``, ``votos_<cand>`` (poll average), ``pv_<cand>``,
+        ``media_<cand>``, ``p2t``, ``margem_p<q>``, ``p_margem_gt_<X>``.
+    """
+    csv_path = Path(csv_path) if csv_path else Path("data/pesquisas.csv")
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Arquivo {csv_path} não encontrado!")
+    df = pd.read_csv(csv_path)
+    if 'data' in df.columns:
+        df['data'] = pd.to_datetime(df['data'], errors='coerce').dt.date
+    datas_pesq = sorted(d for d in df.get('data', pd.Series(dtype=object)).dropna())
+    if not datas_pesq:
+        raise ValueError(f"{csv_path} has no dated polls to backfill")
+
+    inicio = pd.Timestamp(inicio).date() if inicio else datas_pesq[0]
+    fim = pd.Timestamp(fim).date() if fim else max(DATA_ATUAL, datas_pesq[-1])
+    dias = [d.date() for d in pd.date_range(inicio, fim, freq="D")]
+    candidatos = list(df['candidato'].unique())
+
+    estados = aggregate_dates(np.array([d.toordinal() for d in dias]), df, candidatos)
+    with np.errstate(invalid="ignore"):
+        desvio_base = np.nanmean(np.where(np.isnan(estados["votos"]), np.nan, estados["desvio"]), axis=1)
+    desvio = np.array([calcular_desvio_ajustado(b, d) if np.isfinite(b) else np.nan
+                       for b, d in zip(desvio_base, dias)])
+    resultados = run_trajectory(
+        estados, candidatos, desvio,
+        n_sim=n_sim or N_SIM,
+        thresholds=LIMIARES_RESUMO,
+        rng=np.random.default_rng(semente),
+    )
+
+    linhas = []
+    for i, (dia, res) in enumerate(zip(dias, resultados)):
+        linha = {
+            "data": dia,
+            "n_pesquisas": int(np.nanmax(estados["n_pesquisas"][i])),
+            "desvio": desvio[i],
+            "indecisos": estados["indecisos"][i],
+        }
+        linha.update({f"votos_{c}": estados["votos"][i, j] for j, c in enumerate(candidatos)})
+        if res is not None:
+            for j, cand in enumerate(res["candidatos"]):
+                linha[f"pv_{cand}"] = res["win"][j]
+                linha[f"media_{cand}"] = res["mean"][j]
+            linha["p2t"] = res["p2t"]
+            for q, v in zip((5, 50, 95), res["margin_q"]):
+                linha[f"margem_p{q:02d}"] = v
+            for thr, v in zip(LIMIARES_RESUMO, res["above"]):
+                linha[f"p_margem_gt_{thr:g}"] = v
+        linhas.append(linha)
+    tabela = pd.DataFrame(linhas)
+
+    caminho = TRAJETORIA_PATH if caminho is None else caminho
+    if caminho:
+        tabela.to_csv(caminho, index=False)
+    return tabela
+
 # ─── VISUALIZATIONS (v2.8 redesign) ───────────────────────────────────────────
 
 def _render_qualify_panel(ax, df1: "pd.DataFrame", candidatos_validos: list, bg: str) -> None:
@@ -1302,10 +2561,13 @@ def _hex_lighten(hex_color, factor):
     )
 
 
-def graficos(df1, df2, trace, pv, p2v, p2t, info_lim_1t, info_matchups, info_indecisos=None):
+def graficos(df1, df2, trace, pv, p2v, p2t, info_lim_1t, info_matchups, info_indecisos=None,
+             destino=None):
     """
     Generates redesigned visualizations (v2.5).
 
+    Saved to ``destino`` (default: outputs/simulacao_eleicoes_brasil_2026_v2.5.png).
+
     Layout:
         Left (main):   Semicircle showing 2nd round outcome distribution by margin category.
         Top right:     1st round vote intention with 90% CI (dot + error bar).
@@ -1315,6 +2577,7 @@ def graficos(df1, df2, trace, pv, p2v, p2t, info_lim_1t, info_matchups, info_ind
     to Brazil's binary presidential runoff: left = leading candidate wins,
     right = trailing candidate wins, shading encodes margin of victory.
     """
+    import matplotlib.pyplot as plt
     from matplotlib.patches import Wedge, FancyBboxPatch
     import matplotlib.gridspec as gridspec
 
@@ -1625,34 +2888,337 @@ def graficos(df1, df2, trace, pv, p2v, p2t, info_lim_1t, info_matchups, info_ind
         transform=fig.transFigure, color='#dddddd', lw=1.2,
     ))
 
-    out = OUTPUT_DIR / "simulacao_eleicoes_brasil_2026_v2.5.png"
+    out = destino or GRAFICO_PATH
     plt.savefig(out, dpi=300, bbox_inches='tight', facecolor=BG)
     print(f"    Graph saved: {out}")
     plt.close()
 
 # ─── MAIN ─────────────────────────────────────────────────────────────────────
 
-if __name__ == "__main__":
+def _salvar_sweep(grade, destino, n_sim=None):
+    """Runs the sweep in the JSON file ``grade`` on the loaded polls, writes and prints it."""
+    cenarios = json.loads(Path(grade).read_text(encoding="utf-8"))
+    tabela = varrer_cenarios(cenarios, n_sim=n_sim)
+    tabela.to_csv(destino, index=False)
+    resumo_cols = [c for c in tabela.columns
+                   if not c.startswith(("maioria_", "media_", "margem_"))
+                   and not c.endswith(("_p05", "_p50", "_p95"))]
+    print(tabela[resumo_cols].to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"\nSweep saved: {destino} ({len(tabela)} scenarios)")
+
+
+def main_sweep(argv=None, prog=None):
+    """
+    ``python -m src sweep``: one or more scenario grids on the same polls.
+
+    The polls are aggregated once and every grid reuses them; with several
+    grids each one is written to ``outputs/sweep_<grid stem>.csv``.
+    """
+    global N_SIM, AMOSTRAGEM
     import argparse
 
-    _parser = argparse.ArgumentParser(
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Batched what-if sweeps over scenario_overrides (see src/core/sweep.py).",
+    )
+    parser.add_argument("grades", nargs="+", metavar="JSON",
+                        help="Scenario list or grid files, or glob patterns.")
+    parser.add_argument("--polls", default=None, metavar="CSV",
+                        help="Poll CSV (default: data/pesquisas.csv).")
+    parser.add_argument("--n-sim", type=int, default=None, metavar="N",
+                        help="Draws per scenario (default: N_SIM).")
+    parser.add_argument("--sampling", choices=METODOS_AMOSTRAGEM, default=AMOSTRAGEM,
+                        help="Dirichlet sampling back-end (default: random).")
+    args = parser.parse_args(argv)
+    AMOSTRAGEM = args.sampling
+    if args.n_sim is not None:
+        N_SIM = args.n_sim
+
+    grades = expand_inputs(args.grades)
+    with contextlib.redirect_stdout(sys.stderr):
+        inicializar(args.polls)
+    for grade in grades:
+        _salvar_sweep(grade, output_for(OUTPUT_DIR / "sweep.csv", grade, len(grades) > 1))
+
+
+def main(argv=None, prog=None):
+    """
+    Command-line entry point (also ``python -m src first-round``).
+
+    Args:
+        argv: Arguments without the program name (default: sys.argv[1:]).
+        prog: Program name shown in usage messages.
+    """
+    global N_SIM, AMOSTRAGEM
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
         description="Brazil Election Monte Carlo — v2.8"
     )
-    _parser.add_argument(
+    parser.add_argument(
+        "csv",
+        nargs="*",
+        metavar="CSV",
+        help=(
+            "Poll CSV files or glob patterns (default: data/pesquisas.csv). Several "
+            "inputs run one after another in this process, and every output file "
+            "gets a _<csv stem> suffix."
+        ),
+    )
+    parser.add_argument(
         "--n-sim",
-        type=int,
+        type=n_sim_arg,
+        default=None,
+        metavar="N|auto",
+        help=(
+            "Override N_SIM for this run. 'auto' samples in growing chunks until "
+            "every win probability, P(2nd round) and tracked margin threshold "
+            "reaches --target-se."
+        ),
+    )
+    parser.add_argument(
+        "--sampling",
+        choices=METODOS_AMOSTRAGEM,
+        default=AMOSTRAGEM,
+        help=(
+            "Dirichlet sampling back-end: 'sobol' (scrambled Sobol points through the "
+            "gamma inverse CDF) or 'antithetic' pairs reach the same precision with "
+            "fewer draws (default: random)."
+        ),
+    )
+    parser.add_argument(
+        "--target-se",
+        type=float,
+        default=DEFAULT_TARGET_SE,
+        metavar="SE",
+        help=f"Target Monte Carlo standard error for --n-sim auto (default: {DEFAULT_TARGET_SE}).",
+    )
+    parser.add_argument(
+        "--track-thresholds",
+        type=float,
+        nargs="+",
+        default=MARGIN_THRESHOLDS,
+        metavar="PP",
+        help="Margin thresholds (pp) tracked by --n-sim auto (default: MARGIN_THRESHOLDS).",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help=(
+            "Headless refresh: sample, reduce the draws to a JSON summary and exit. "
+            "Skips the PyMC model, per-draw DataFrames, CSV output and figures."
+        ),
+    )
+    parser.add_argument(
+        "--summary-out",
+        default=str(OUTPUT_DIR / "resumo_1turno.json"),
+        metavar="PATH",
+        help="Where --summary-only writes its JSON ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--control-variates",
+        action="store_true",
+        help="Add raw vs control-variate estimates to the --summary-only JSON.",
+    )
+    parser.add_argument(
+        "--sweep",
+        metavar="JSON",
+        help=(
+            "Scenario sweep: JSON file with a list of scenario_overrides dicts or a "
+            "grid {\"<cand>.votos_media\": [...], \"indecisos\": [...]}. Writes one "
+            "row per scenario to outputs/sweep.csv and exits."
+        ),
+    )
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("OLD_CSV", "NEW_CSV"),
+        help=(
+            "Paired comparison of two poll CSVs on common random numbers: prints "
+            "deltas in win probabilities, P(2nd round), matchups and margin "
+            "thresholds with paired standard errors, then exits."
+        ),
+    )
+    parser.add_argument(
+        "--backfill",
+        nargs="?",
+        const="",
         default=None,
-        metavar="N",
+        metavar="START_DATE",
+        help=(
+            "Recompute the forecast for every day from START_DATE (default: first "
+            "poll) to today using only the polls published by then; writes "
+            f"{TRAJETORIA_PATH} and exits."
+        ),
+    )
+    parser.add_argument(
+        "--reuse-draws",
+        metavar="NPZ",
+        help=(
+            "With --summary-only: reweight the draws stored at NPZ to the current "
+            "polls (Pareto-smoothed importance weights) instead of resampling. Falls "
+            "back to a full resample, stored at NPZ, when the ESS is too low."
+        ),
+    )
+    parser.add_argument(
+        "--pool",
+        metavar="DIR",
+        help=(
+            "Keep first-round draws in an appendable pool under DIR, keyed by an "
+            "input hash; rerunning with a larger --n-sim only draws the missing "
+            "samples (deterministic continuation of the same stream). Not with "
+            "--n-sim auto or --reuse-draws."
+        ),
+    )
+    parser.add_argument(
+        "--empirical-error",
+        nargs="?",
+        const=str(BANCO_ERROS_PATH),
+        default=None,
+        metavar="NPZ",
+        help=(
+            "Add historical poll-vs-result errors to every first-round draw, sampled "
+            "from the bank built by 'python src/backtesting.py --build-error-bank' "
+            "(records weighted by closeness in days to election)."
+        ),
+    )
+    parser.add_argument(
+        "--sensitivities",
+        action="store_true",
+        help=(
+            "Add the score-function sensitivity tornado to the report of the "
+            "full run (not with --empirical-error)."
+        ),
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help=f"Do not append this run to the forecast history ({HISTORICO_PATH}).",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
         help=(
-            "Override N_SIM for this run. Use --n-sim 200000 for low-probability "
-            "threshold markets where model_prob < 0.05."
+            "Print the closed-form preview of pv, P(2nd round) and top-two "
+            "probabilities, confirmed by a quick Monte Carlo run, and exit."
         ),
     )
-    _args = _parser.parse_args()
-    if _args.n_sim is not None:
-        N_SIM = _args.n_sim
+    args = parser.parse_args(argv)
+    auto = args.n_sim == "auto"
+    AMOSTRAGEM = args.sampling
+    if args.empirical_error and (args.preview or args.sweep or args.compare or
+                                 args.backfill is not None):
+        parser.error("--empirical-error cannot be combined with --preview, --sweep, "
+                     "--compare or --backfill")
+    if args.reuse_draws and not args.summary_only:
+        parser.error("--reuse-draws requires --summary-only")
+    if args.reuse_draws and args.pool:
+        parser.error("--reuse-draws cannot be combined with --pool")
+    if auto and (args.pool or args.compare):
+        parser.error("--n-sim auto cannot be combined with --pool or --compare")
+    if args.sensitivities and args.empirical_error:
+        parser.error("--sensitivities cannot be combined with --empirical-error")
+    if args.empirical_error:
+        carregar_banco_erros(args.empirical_error)
+        print(f"  [CLI] Empirical error bank: {args.empirical_error} "
+              f"({len(BANCO_ERROS.dias)} snapshots)")
+    if args.n_sim is not None and not auto:
+        N_SIM = args.n_sim
         print(f"  [CLI] N_SIM overridden: {N_SIM:,}")
 
+    def _amostrar():
+        """First-round draws honouring --n-sim auto; keeps N_SIM in sync."""
+        global N_SIM
+        if args.pool:
+            return amostrar_primeiro_turno_pool(diretorio=args.pool)
+        if not auto:
+            return amostrar_primeiro_turno()
+        amostras = amostrar_primeiro_turno_auto(args.target_se, args.track_thresholds)
+        N_SIM = amostras['adaptativo'].n_sim
+        return amostras
+
+    if args.compare:
+        tabela = comparar_pesquisas(*args.compare, n_sim=N_SIM)
+        print(f"Paired comparison ({N_SIM:,} common draws): "
+              f"{args.compare[0]} -> {args.compare[1]}\n")
+        print(tabela.to_string(float_format=lambda x: f"{x:.4f}"))
+        return
+
+    entradas = expand_inputs(args.csv) or [None]
+    varias = len(entradas) > 1
+    for entrada in entradas:
+        if varias:
+            print(f"\n{'─' * 60}\n  INPUT: {entrada}\n{'─' * 60}", file=sys.stderr)
+        _executar_entrada(args, entrada, varias, _amostrar)
+
+
+def _executar_entrada(args, csv_path, varias, amostrar):
+    """One poll CSV through the mode selected on the command line (see main())."""
+    auto = args.n_sim == "auto"
+
+    if args.preview:
+        with contextlib.redirect_stdout(sys.stderr):
+            inicializar(csv_path)
+            amostras = amostrar_primeiro_turno(verbose=False)
+        imprimir_previa(previa_analitica(), calcular_resumo(
+            amostras['validos_final'], amostras['candidatos_validos']
+        ))
+        return
+
+    if args.backfill is not None:
+        destino = output_for(TRAJETORIA_PATH, csv_path, varias)
+        tabela = backfill_trajetoria(csv_path, inicio=args.backfill or None,
+                                     n_sim=None if auto else N_SIM, caminho=destino)
+        pv_cols = [c for c in tabela.columns if c.startswith("pv_")]
+        semanal = tabela.iloc[::-7].iloc[::-1]
+        print(semanal[["data", "n_pesquisas", *pv_cols, "p2t"]].to_string(
+            index=False, float_format=lambda x: f"{x:.3f}"))
+        print(f"\nTrajectory saved: {destino} ({len(tabela)} days)")
+        return
+
+    if args.sweep:
+        with contextlib.redirect_stdout(sys.stderr):
+            inicializar(csv_path)
+        _salvar_sweep(args.sweep, output_for(OUTPUT_DIR / "sweep.csv", csv_path, varias),
+                       n_sim=None if auto else N_SIM)
+        return
+
+    if args.summary_only:
+        # Progress messages go to stderr so stdout carries only the JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            inicializar(csv_path)
+            validar_viabilidade()
+            if args.reuse_draws:
+                amostras = atualizar_primeiro_turno(args.reuse_draws)
+            else:
+                amostras = amostrar()
+            amostras_2t = amostrar_segundo_turno(
+                amostras['validos_final'], amostras['candidatos_validos']
+            )
+            resumo = resumo_primeiro_turno(amostras, amostras_2t,
+                                           controles=args.control_variates)
+            resumo['gerado_em'] = datetime.now().isoformat(timespec='seconds')
+            if csv_path is not None:
+                resumo['entrada'] = str(csv_path)
+            if auto:
+                run = amostras['adaptativo']
+                resumo['adaptativo'] = {
+                    'target_se': args.target_se,
+                    'convergiu': run.converged,
+                    'max_se': run.max_se,
+                    'pior': run.worst,
+                }
+
+        texto = json.dumps(resumo, ensure_ascii=False, indent=2, allow_nan=False)
+        if args.summary_out == "-":
+            print(texto)
+        else:
+            destino = output_for(Path(args.summary_out), csv_path, varias)
+            destino.write_text(texto, encoding="utf-8")
+            print(f"Summary saved: {destino}", file=sys.stderr)
+        return
+
     print("=" * 60)
     print("  BRAZIL ELECTION MONTE CARLO - 2026 [v2.8]")
     print("  NEW: First-round margin distribution + polymarket_edge()")
@@ -1664,19 +3230,28 @@ if __name__ == "__main__":
     print("  v2.2: Rejection Index as Electoral Ceiling")
     print("=" * 60)
 
-    inicializar()
+    inicializar(csv_path)
     validar_viabilidade()
 
     trace = construir_modelo()
-    df1, info_lim_1t, info_indecisos, validos_final, candidatos_validos = simular_primeiro_turno()
+    amostras = amostrar()
+    df1, info_lim_1t, info_indecisos, validos_final, candidatos_validos = (
+        simular_primeiro_turno(amostras, destino=output_for(RESULTADOS_1T_PATH, csv_path, varias))
+    )
 
     # First-round-only mode: second round is handled by simulation_2turno.py
     # or simulation_combined.py when pesquisas_2turno.csv is available.
     df2 = pd.DataFrame()
     info_matchups = {}
 
-    pv, p2v, p2t = relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos)
-    graficos(df1, df2, trace, pv, p2v, p2t, info_lim_1t, info_matchups, info_indecisos)
+    resultado = montar_resultado(df1, df2, info_lim_1t, info_matchups, info_indecisos)
+    if not args.no_history:
+        print(f"  [HISTORY] Run #{registrar_historico(resultado)} saved to {HISTORICO_PATH}")
+    pv, p2v, p2t = relatorio(df1, df2, info_lim_1t, info_matchups, info_indecisos,
+                             resumo=resultado.summary,
+                             amostras=amostras if args.sensitivities else None)
+    graficos(df1, df2, trace, pv, p2v, p2t, info_lim_1t, info_matchups, info_indecisos,
+             destino=output_for(GRAFICO_PATH, csv_path, varias))
 
     print("\nSimulation completed. Results available in /outputs")
     print("\nv2.6 Features:")
@@ -1690,3 +3265,7 @@ if __name__ == "__main__":
     print("\nv2.3 Features:")
     print("  - Poll aggregation: Temporal weighting exp(-days/7)")
     print("  - Outlier detection: Modified z-score > 2.5")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.core.analytic import preview
+from src.core.config import PollData
+from src.core.runoff import RunoffModel, exact_runoff
+from src.core.sweep import run_sweep
+
+
+CANDIDATOS = ["A", "B", "C", "Brancos/Nulos"]
+
+
+def _poll(votos, rejeicao, desvio):
+    return PollData(CANDIDATOS, np.array(votos, dtype=float),
+                    np.array(rejeicao, dtype=float), desvio, 5.0)
+
+
+@pytest.mark.parametrize("votos, rejeicao, desvio", [
+    ([36, 35, 12, 8], [45, 48, 20, 0], 3.0),   # disputa pela liderança
+    ([41, 30, 10, 8], [45, 48, 20, 0], 4.0),   # maioria incerta
+    ([44, 30, 10, 8], [52, 48, 20, 0], 3.0),   # teto abaixo de 50% no líder
+])
+def test_previa_confere_com_monte_carlo(votos, rejeicao, desvio):
+    poll = _poll(votos, rejeicao, desvio)
+    previa = preview(poll)
+    mc = run_sweep(poll, [{}], n_sim=100_000, rng=np.random.default_rng(0)).iloc[0]
+
+    assert abs(previa.p2t - mc["p2t"]) < 0.01
+    for c in ("A", "B", "C"):
+        assert abs(previa.win_prob[c] - mc[f"pv_{c}"]) < 0.02
+    assert np.isclose(sum(previa.win_prob.values()), 1.0)
+    assert np.isclose(sum(previa.top2_prob.values()), 1.0)
+
+
+@pytest.mark.parametrize("votos, tetos", [
+    ([50, 46, 4], (52, 60)),     # teto ativo no líder
+    ([48, 47, 5], (51, 50.5)),   # os dois tetos ativos, disputa apertada
+    ([30, 30, 40], (20, 50)),    # teto muito abaixo da intenção
+])
+def test_segundo_turno_exato_confere_com_monte_carlo(votos, tetos):
+    alphas = np.array(votos, dtype=float) * 50.0
+    exata = exact_runoff(alphas, *tetos)
+
+    p = np.random.default_rng(0).dirichlet(alphas, 1_000_000) * 100
+    a, b = np.minimum(p[:, 0], tetos[0]), np.minimum(p[:, 1], tetos[1])
+    voto_a = a / (a + b) * 100
+    margem = np.abs(2 * voto_a - 100)
+
+    assert abs(exata.prob_a - (voto_a > 50).mean()) < 3e-3
+    assert abs(exata.mean_a - voto_a.mean()) < 0.01
+    for thr, prob in exata.close_prob.items():
+        assert abs(prob - (margem < thr).mean()) < 3e-3
+    for nivel, q in exata.share_quantiles.items():
+        assert abs(q - np.quantile(voto_a, nivel)) < 0.02
+    for nivel, q in exata.margin_quantiles.items():
+        assert abs(q - np.quantile(margem, nivel)) < 0.04
+
+
+def test_segundo_turno_exato_converge_nos_nos():
+    modelo = RunoffModel(np.array([48, 47, 5]) * 50.0, 51, 50.5)
+    fino = RunoffModel(np.array([48, 47, 5]) * 50.0, 51, 50.5, nodes=96)
+    q = np.linspace(0.47, 0.53, 13)
+    assert np.max(np.abs(modelo.cdf(q) - fino.cdf(q))) < 1e-9
+    assert np.all(np.diff(modelo.cdf(q)) >= 0)
@@ -0,0 +1,189 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.backtesting import (
+    CONFIG_PADRAO,
+    avaliar_config,
+    backtest_completo,
+    backtest_snapshot,
+    calibrar,
+    carregar_snapshot,
+    DATA_DIR,
+    NAME_ALIASES,
+    SNAPSHOT_DATES,
+    agregar_pesquisas,
+    carregar_arquivo,
+    estados_replay,
+    executar_simulacao_historica,
+    pesquisas_snapshot,
+    replay_campanha,
+    tabela_declaracoes,
+)
+from src.io.archive import PollArchive
+from src.core.scoring import crps_sample, log_score, pit
+from src.core.reliability import bootstrap_metrics, bootstrap_weights, reliability_table, weighted_metrics
+
+
+def test_pares_do_segundo_turno_conferem_com_contagem_direta():
+    candidatos = ["A", "B", "C", "D"]
+    res = executar_simulacao_historica(
+        candidatos, np.array([30.0, 28.0, 27.0, 5.0]), np.zeros(4), 3.0, 0.0,
+        n_sim=20_000, rng=np.random.default_rng(3),
+    )
+    assert np.isclose(sum(res["prob_par"].values()), 1.0)
+    assert np.isclose(sum(res["prob_vencedor"].values()), 1.0)
+
+    # Mesmo fluxo, contagem ingênua por frozenset
+    from src.backtesting import _amostrar_historica
+
+    alphas = np.array([30.0, 28.0, 27.0, 5.0]) * (100.0 / 3.0)
+    votos = _amostrar_historica(alphas, np.full(4, 100.0), 20_000, rng=np.random.default_rng(3))
+    top2 = np.argsort(votos, axis=1)[:, -2:]
+    esperado: dict = {}
+    for a, b in top2:
+        par = frozenset([candidatos[a], candidatos[b]])
+        esperado[par] = esperado.get(par, 0) + 1
+    assert {k: v / 20_000 for k, v in esperado.items()} == res["prob_par"]
+
+
+def test_backtest_paralelo_igual_ao_serial():
+    serial = backtest_completo("2018", n_sim=5_000, workers=1, semente=7)
+    paralelo = backtest_completo("2018", n_sim=5_000, workers=2, semente=7)
+    assert serial == paralelo
+    assert backtest_snapshot("2018", "T-14", 5_000, semente=7) == serial[1]
+
+
+def test_calibracao_com_numeros_aleatorios_comuns():
+    snaps = [("2022", "T-7"), ("2018", "T-7")]
+    a = avaliar_config(CONFIG_PADRAO, snaps, 3_000)
+    assert a == avaliar_config(CONFIG_PADRAO, snaps, 3_000)
+
+    grade = {"escala_desvio": [0.5, 1.0, 2.0], "blank_fraction": [0.0, 0.3]}
+    tabela = calibrar(grade, year="2018", n_min=500, n_max=1_500, verbose=False)
+    assert len(tabela) == 7   # 6 da grade + configuração atual, sempre avaliada
+    assert list(tabela["rank"]) == list(range(1, 8))
+    assert ((tabela["blank_fraction"] == 0.15) & (tabela["escala_desvio"] == 1.0)).any()
+    # Quem chega à última rodada vem primeiro, ordenado pelo objetivo
+    final = tabela[tabela["rodada"] == tabela["rodada"].max()]
+    assert final["n_sim"].eq(1_500).all()
+    assert final["rmse"].is_monotonic_increasing
+    assert tabela.index[tabela["rodada"] == tabela["rodada"].max()].max() < len(final)
+    # Pontuações distribucionais só para as finalistas
+    assert final["crps_share"].notna().all()
+    assert tabela.loc[tabela["rodada"] < tabela["rodada"].max(), "crps_share"].isna().all()
+
+
+def test_declaracoes_cobrem_vencedor_par_e_margem():
+    r = backtest_snapshot("2022", "T-7", 3_000, semente=7)
+    tabela = tabela_declaracoes([r])
+    assert set(tabela["tipo"]) == {"vencedor", "par", "margem"}
+    assert tabela["y"].isin([0, 1]).all()
+    vencedor = tabela[tabela["tipo"] == "vencedor"]
+    assert np.isclose(vencedor["p"].sum(), 1.0) and vencedor["y"].sum() == 1
+
+
+def test_bootstrap_vetorizado_igual_ao_laco():
+    rng = np.random.default_rng(0)
+    p = rng.random(4_000)
+    y = (rng.random(4_000) < p).astype(float)
+
+    w = bootstrap_weights(len(p), 20, rng=np.random.default_rng(1))
+    vetor = weighted_metrics(p, y, w)
+    for i in range(20):
+        linha = weighted_metrics(p, y, w[i])
+        for k in vetor:
+            assert np.isclose(vetor[k][i], linha[k])
+
+    # Probabilidades calibradas: inclinação ≈ 1 e IC contendo 1
+    m = bootstrap_metrics(p, y, n_boot=2_000, rng=np.random.default_rng(2))
+    assert m.lower["slope"] < 1.0 < m.upper["slope"]
+    assert abs(m.estimate["intercept"]) < 0.2
+
+    tabela = reliability_table(p, y)
+    assert tabela["n"].sum() == len(p)
+    assert np.allclose(tabela["p_media"], tabela["freq_observada"], atol=0.05)
+
+    # Bootstrap por grupo: réplicas inteiras de cada grupo
+    g = bootstrap_weights(6, 50, groups=np.array([0, 0, 1, 1, 2, 2]), rng=rng)
+    assert np.array_equal(g[:, 0], g[:, 1]) and g.sum(axis=1).tolist() == [6.0] * 50
+
+
+def test_crps_ordenado_igual_a_forma_pareada():
+    rng = np.random.default_rng(5)
+    x = rng.normal(40.0, 3.0, size=(500, 3))
+    obs = np.array([41.0, 30.0, 55.0])
+    pareado = [
+        np.abs(x[:, k] - obs[k]).mean() - 0.5 * np.abs(x[:, k, None] - x[None, :, k]).mean()
+        for k in range(3)
+    ]
+    assert np.allclose(crps_sample(x, obs), pareado)
+    assert np.isclose(crps_sample(np.full(10, 2.0), 5.0), 3.0)   # previsão pontual: erro absoluto
+
+    assert pit(np.arange(10.0), 4.0) == 0.45
+    assert np.allclose(pit(x, obs), (x < obs).mean(axis=0))
+    assert np.isfinite(log_score(0, 40_000)) and log_score(40_000, 40_000) < 1e-4
+
+
+def test_snapshot_traz_pontuacao_distribucional():
+    r = backtest_snapshot("2018", "T-7", 3_000, semente=7)
+    assert set(r.crps_per_cand) == set(r.pit_per_cand) == {"Bolsonaro", "Haddad"}
+    assert np.isclose(r.crps_share, np.mean(list(r.crps_per_cand.values())), atol=1e-3)
+    assert r.crps_margin >= 0 and 0.0 <= r.pit_margin <= 1.0
+    assert r.log_score_pair >= 0
+
+
+def test_replay_incremental_igual_a_agregacao_direta():
+    arquivo = carregar_arquivo("2022")
+    dias = [date(2022, 7, 1) + timedelta(days=k) for k in range(0, 90, 3)]
+    for dia, n, (cands, votos, rej, desvio, indecisos) in estados_replay(arquivo, dias):
+        direto = agregar_pesquisas(arquivo[arquivo["data"] <= dia], dia)
+        assert n == (arquivo["data"] <= dia).sum()
+        assert cands == direto[0]
+        assert np.allclose(votos, direto[1]) and np.allclose(rej, direto[2])
+        assert np.isclose(desvio, direto[3]) and np.isclose(indecisos, direto[4])
+
+
+def test_replay_uma_linha_por_dia():
+    tabela = replay_campanha("2018", n_sim=2_000)
+    assert list(tabela["dias"]) == list(range(tabela["dias"].iloc[0], 0, -1))
+    probs = tabela.filter(like="prob:").sum(axis=1)
+    assert np.allclose(probs, 1.0)
+    # Dias sem pesquisa nova repetem a previsão anterior
+    for (_, a), (_, b) in zip(tabela.iloc[:-1].iterrows(), tabela.iloc[1:].iterrows()):
+        if a["n_pesquisas"] == b["n_pesquisas"]:
+            assert a["rmse"] == b["rmse"] and a["prob:Bolsonaro"] == b["prob:Bolsonaro"]
+
+
+def test_arquivo_indexado_reproduz_csvs(tmp_path):
+    arquivo = PollArchive.from_csvs(DATA_DIR, NAME_ALIASES)
+    for year, snaps in SNAPSHOT_DATES.items():
+        for snap, data_ref in snaps.items():
+            cands, votos, rej, desvio, indecisos = pesquisas_snapshot(year, snap)
+            csv = carregar_snapshot(DATA_DIR / f"{year}_1t_{snap}.csv", data_ref)
+            assert cands == csv[0]
+            assert np.allclose(votos, csv[1]) and np.allclose(rej, csv[2])
+            assert np.isclose(desvio, csv[3]) and np.isclose(indecisos, csv[4])
+
+    # Consulta por intervalo de datas = busca binária, extremos inclusivos
+    faixa = arquivo.polls("2022", date(2022, 9, 5), date(2022, 9, 22))
+    assert faixa["data"].between(date(2022, 9, 5), date(2022, 9, 22)).all()
+    assert len(faixa) == 32 and faixa["data"].is_monotonic_increasing
+    assert "Jair Bolsonaro" not in set(arquivo.polls("2022")["candidato"])
+
+    arquivo.save(tmp_path / "arquivo.sqlite")
+    lido = PollArchive.load(tmp_path / "arquivo.sqlite")
+    assert lido.windows == arquivo.windows
+    assert lido.polls("2018").reset_index(drop=True).equals(arquivo.polls("2018").reset_index(drop=True))
+
+
+def test_erros_por_posicao_param_no_primeiro_sem_resultado(monkeypatch):
+    import src.backtesting as bt
+
+    # Ciro (2º nas pesquisas) sem resultado: Bolsonaro, 3º, não sobe de posição
+    snapshot = (["Lula", "Ciro", "Bolsonaro"], np.array([45.0, 35.0, 20.0]), None, None, None)
+    monkeypatch.setattr(bt, "pesquisas_snapshot", lambda year, snap: snapshot)
+    monkeypatch.setitem(bt.GROUND_TRUTH["2022"], "votos_1t", {"Lula": 48.0, "Bolsonaro": 43.0})
+    dias, erros = bt.erros_snapshot("2022", "T-7")
+    assert dias > 0
+    assert np.allclose(erros, [3.0])
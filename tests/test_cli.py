@@ -0,0 +1,34 @@
+"""
+Tests for the unified command line (src/__main__.py) and its input expansion.
+"""
+
+import pytest
+
+import src.__main__ as cli
+from src.io.inputs import expand_inputs, output_for
+
+
+def test_expansao_de_entradas_em_ordem_sem_repeticao(tmp_path):
+    for nome in ("b.csv", "a.csv", "c.json"):
+        (tmp_path / nome).write_text("x")
+    entradas = expand_inputs([tmp_path / "c.json", str(tmp_path / "*.csv"), tmp_path / "a.csv"])
+    assert [p.name for p in entradas] == ["c.json", "a.csv", "b.csv"]
+    assert expand_inputs([]) == []
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(tmp_path / "*.txt")])
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([tmp_path / "falta.csv"])
+
+    base = tmp_path / "resumo.json"
+    assert output_for(base, tmp_path / "a.csv", varias=False) == base
+    assert output_for(base, tmp_path / "a.csv", varias=True).name == "resumo_a.json"
+
+
+def test_subcomando_repassa_argumentos(monkeypatch):
+    chamadas = []
+    monkeypatch.setitem(cli.SUBCOMANDOS, "runoff", ("json", "dumps", ""))
+    monkeypatch.setattr("json.dumps", lambda argv, prog: chamadas.append((argv, prog)))
+    assert cli.main(["runoff", "a.csv", "--n-sim", "100"]) == 0
+    assert chamadas == [(["a.csv", "--n-sim", "100"], "python -m src runoff")]
+    with pytest.raises(SystemExit):
+        cli.main(["desconhecido"])
@@ -0,0 +1,124 @@
+"""
+Tests for the poll-feed daemon (src/daemon.py).
+"""
+
+import asyncio
+import json
+from datetime import date, timedelta
+
+import numpy as np
+
+import src.daemon as daemon_mod
+import src.simulation_v2 as sv
+from src.daemon import AgregadorIncremental, DaemonPesquisas, FontePesquisas, chave_poll
+
+LINHA = {"candidato": "Lula", "intencao_voto_pct": 45.0, "rejeicao_pct": 44.0,
+         "desvio_padrao_pct": 2.0, "indecisos_pct": 3.0, "instituto": "Nova", "data": "2026-10-18"}
+
+
+def test_agregacao_incremental_igual_a_completa(tmp_path):
+    fonte = FontePesquisas("data/pesquisas.csv")
+    agregador = AgregadorIncremental()
+    poll, alterados = agregador.atualizar(fonte.ler(), date.today())
+    completo = sv.carregar_poll_data("data/pesquisas.csv")
+    assert alterados == completo.candidatos == poll.candidatos
+    assert np.allclose(poll.votos_media, completo.votos_media)
+    assert np.allclose(poll.rejeicao, completo.rejeicao)
+    assert np.isclose(poll.desvio_base, completo.desvio_base)
+    assert np.isclose(poll.indecisos, completo.indecisos)
+
+    df = fonte.ler()
+    df.loc[df["candidato"] == "Lula", "intencao_voto_pct"] += 1.0
+    novo, alterados = agregador.atualizar(df, date.today())
+    assert alterados == ["Lula"] and chave_poll(novo) != chave_poll(poll)
+
+
+def test_feed_lido_incrementalmente(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    fonte = FontePesquisas(None, feed)
+    feed.write_text(json.dumps(LINHA) + "\n" + '{"candidato": "Tarc', encoding="utf-8")
+    assert fonte.verificar()
+    assert list(fonte.ler()["candidato"]) == ["Lula"]     # linha incompleta espera
+
+    with open(feed, "a", encoding="utf-8") as f:
+        f.write('ísio", "intencao_voto_pct": 30.0, "desvio_padrao_pct": 2.0, '
+                '"instituto": "Nova", "data": "2026-10-18"}\n')
+        f.write(json.dumps({**LINHA, "intencao_voto_pct": 44.0}) + "\n")   # correção
+    df = fonte.ler()
+    assert list(df["candidato"]) == ["Tarcísio", "Lula"]
+    assert df.loc[df["candidato"] == "Lula", "intencao_voto_pct"].item() == 44.0
+
+
+def test_feed_pula_linhas_invalidas_sem_perder_as_seguintes(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    avisos = []
+    fonte = FontePesquisas(None, feed, log=avisos.append)
+    feed.write_text("\n".join([
+        "{quebrada",
+        json.dumps({**LINHA, "intencao_voto_pct": "45,0"}),
+        json.dumps({**LINHA, "rejeicao_pct": None}),
+        "[1, 2]",
+        json.dumps({"candidato": "Tarcísio", "intencao_voto_pct": 30.0}),
+        json.dumps({**LINHA, "candidato": "Tarcísio", "intencao_voto_pct": 30.0}),
+    ]) + "\n", encoding="utf-8")
+    df = fonte.ler()
+    assert list(df["candidato"]) == ["Lula", "Tarcísio"]
+    assert len(avisos) == 4 and ":2:" in avisos[1] and "intencao_voto_pct" in avisos[1]
+
+
+def test_daemon_publica_so_quando_agregado_muda(tmp_path):
+    csv = tmp_path / "pesquisas.csv"
+    csv.write_text(open("data/pesquisas.csv", encoding="utf-8").read(), encoding="utf-8")
+    resumo = tmp_path / "resumo.json"
+    daemon = DaemonPesquisas(FontePesquisas(csv), n_sim=2_000, workers=0,
+                             graficos=False, resumo_path=resumo)
+
+    async def rodar():
+        return [await daemon.processar(), await daemon.processar()]
+
+    assert asyncio.run(rodar()) == [True, False]
+    publicado = json.loads(resumo.read_text(encoding="utf-8"))
+    assert publicado["versao"] == 1 and "Lula" in json.dumps(publicado, ensure_ascii=False)
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_daemon_sobrevive_a_falha_e_mantem_ultima_previsao(tmp_path, monkeypatch):
+    csv = tmp_path / "pesquisas.csv"
+    csv.write_text(open("data/pesquisas.csv", encoding="utf-8").read(), encoding="utf-8")
+    resumo = tmp_path / "resumo.json"
+    daemon = DaemonPesquisas(FontePesquisas(csv), n_sim=2_000, workers=0,
+                             graficos=False, resumo_path=resumo)
+    assert asyncio.run(daemon.processar())
+    chave, publicado = daemon.chave, resumo.read_text(encoding="utf-8")
+
+    linhas = csv.read_text(encoding="utf-8").rstrip("\n")
+    csv.write_text(linhas + "\nLula,39.0,44.0,2.0,3.0,Nova,2026-10-18\n", encoding="utf-8")
+
+    def falha(*args):
+        raise RuntimeError("worker caiu")
+
+    monkeypatch.setattr(daemon_mod, "etapa_resumo", falha)
+    assert asyncio.run(daemon.processar()) is False
+    assert (daemon.chave, daemon.versao) == (chave, 1)
+    assert resumo.read_text(encoding="utf-8") == publicado
+
+    monkeypatch.undo()
+    assert asyncio.run(daemon.processar()) and daemon.versao == 2
+
+
+def test_daemon_republica_na_virada_do_dia(tmp_path, monkeypatch):
+    resumo = tmp_path / "resumo.json"
+    daemon = DaemonPesquisas(FontePesquisas("data/pesquisas.csv"), n_sim=2_000, workers=0,
+                             graficos=False, resumo_path=resumo)
+    assert asyncio.run(daemon.processar())
+    chave = daemon.chave
+
+    class Amanha(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr(daemon_mod, "date", Amanha)
+    # Mesmas pesquisas, outro dia: DESVIO muda e a previsão é republicada
+    assert asyncio.run(daemon.processar()) and daemon.chave != chave
+    assert json.loads(resumo.read_text(encoding="utf-8"))["versao"] == 2
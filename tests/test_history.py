@@ -0,0 +1,84 @@
+"""
+Tests for the forecast history store (src/io/history.py).
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import SimulationConfig, SimulationResult
+from src.core.summary import compute_summary
+from src.io.history import HistoryStore, Reservoir, dequantizar, quantizar, save_result
+
+
+def _resultado(rng, lula: float, quando: datetime) -> SimulationResult:
+    cands = ["Lula", "Tarcísio", "Outros"]
+    validos = rng.dirichlet(np.array([lula, 40.0, 100.0 - lula - 40.0]) * 20, size=5_000) * 100
+    df1 = pd.DataFrame({f"{c}_val": validos[:, i] for i, c in enumerate(cands)})
+    df1["margem_1t"] = np.abs(validos[:, 0] - validos[:, 1])
+    resumo = compute_summary(validos, cands)
+    return SimulationResult(
+        df1=df1, df2=pd.DataFrame(), pv=resumo.win_prob, p2v={}, p2t=resumo.p2t,
+        info_matchups={}, info_lim_1t={}, info_indecisos={},
+        margins=df1["margem_1t"].to_numpy(), timestamp=quando,
+        config=SimulationConfig(n_sim=5_000, seed=1), summary=resumo,
+    )
+
+
+def test_reservatorio_uniforme_em_blocos():
+    n, k, reps = 50, 10, 4_000
+    inclusao = np.zeros(n)
+    for s in range(reps):
+        r = Reservoir(k, np.random.default_rng(s))
+        for bloco in np.array_split(np.arange(n, dtype=float), 4):
+            r.add(bloco)
+        assert r.sample.shape == (k, 1) and len(set(r.sample[:, 0])) == k
+        inclusao[r.sample[:, 0].astype(int)] += 1
+    # Cada linha entra com probabilidade k/n, independente do bloco
+    assert np.allclose(inclusao / reps, k / n, atol=0.035)
+
+
+def test_quantizacao_ida_e_volta():
+    x = np.random.default_rng(0).uniform(0, 100, size=(300, 4))
+    blob = quantizar(x)
+    assert np.abs(dequantizar(blob, x.shape) - x).max() <= 100 / 65535 / 2 + 1e-12
+    assert len(blob) < x.nbytes / 3
+
+
+def test_historico_series_no_tempo(tmp_path):
+    rng = np.random.default_rng(3)
+    inicio = datetime(2026, 8, 1)
+    store = HistoryStore(tmp_path / "h.sqlite")
+    ids = [store.save(_resultado(rng, lula, inicio + timedelta(days=d)), reservoir=500)
+           for d, lula in [(2, 36.0), (0, 30.0), (1, 33.0)]]
+
+    serie = store.series("Lula", "pv")
+    assert list(serie["timestamp"]) == [inicio + timedelta(days=d) for d in range(3)]
+    assert serie["valor"].is_monotonic_increasing            # Lula sobe a cada dia
+    assert len(store.series(metrica="qualifica")) == 9
+    assert np.allclose(store.series(metrica="p2t")["valor"], store.runs()["p2t"])
+    assert len(store.series("Lula", inicio=inicio + timedelta(days=1))) == 2
+
+    amostra = store.draws(ids[0])
+    assert list(amostra.columns) == ["Lula_val", "Tarcísio_val", "Outros_val", "margem_1t"]
+    assert len(amostra) == 500 and np.allclose(amostra.iloc[:, :3].sum(axis=1), 100, atol=0.01)
+
+    # Mesma configuração → mesmo hash de entrada
+    save_result(_resultado(rng, 30.0, inicio), tmp_path / "h.sqlite", reservoir=0)
+    runs = store.runs()
+    assert runs["input_hash"].nunique() == 1 and len(runs) == 4
+
+
+def test_historico_limites_inclusivos(tmp_path):
+    rng = np.random.default_rng(4)
+    quando = datetime(2026, 8, 1, 12, 0)
+    store = HistoryStore(tmp_path / "h.sqlite")
+    store.save(_resultado(rng, 33.0, quando), reservoir=0)
+    store.save(_resultado(rng, 34.0, quando + timedelta(microseconds=1)), reservoir=0)
+
+    # Execução carimbada exatamente no limite entra nos dois lados
+    assert len(store.series("Lula", fim=quando)) == 1
+    assert len(store.series("Lula", inicio=quando, fim=quando)) == 1
+    assert len(store.series("Lula", inicio=quando + timedelta(microseconds=1))) == 1
+    assert len(store.series(metrica="p2t", inicio=quando, fim=quando)) == 1
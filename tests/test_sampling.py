@@ -0,0 +1,209 @@
+import numpy as np
+import pytest
+
+from src.core.control_variates import cv_estimate, dirichlet_controls
+from src.core.error_bank import ErrorBank, apply_errors
+from src.core.pool import PoolRegistry, SamplePool, pool_key
+from src.core.reweight import reweight_dirichlet, systematic_resample
+from src.core.sampling import METHODS, sample_dirichlet, uniforms
+from src.core.sensitivity import numeric_jacobian, score_gradient
+
+
+ALPHAS = np.array([36.0, 31.0, 8.0, 5.0, 20.0]) * 30
+
+
+@pytest.mark.parametrize("metodo", METHODS)
+def test_linhas_no_simplex_e_media_correta(metodo):
+    x = sample_dirichlet(ALPHAS, 4096, metodo, rng=np.random.default_rng(1))
+    assert x.shape == (4096, ALPHAS.size)
+    assert np.allclose(x.sum(axis=1), 1.0)
+    assert np.all(x > 0)
+    assert np.allclose(x.mean(axis=0), ALPHAS / ALPHAS.sum(), atol=2e-3)
+
+
+def test_random_preserva_fluxo_legado():
+    np.random.seed(42)
+    esperado = np.random.dirichlet(ALPHAS, size=100)
+    np.random.seed(42)
+    assert np.array_equal(sample_dirichlet(ALPHAS, 100), esperado)
+
+
+def test_antitetico_espelha_uniformes():
+    u = uniforms(7, 3, "antithetic", rng=np.random.default_rng(0))
+    assert u.shape == (7, 3)
+    assert np.allclose(u[:3] + u[4:7], 1.0)
+
+
+def test_sobol_reduz_variancia_da_mediana():
+    def erro(metodo):
+        rng = np.random.default_rng(9)
+        medianas = [
+            np.median(sample_dirichlet(ALPHAS, 2048, metodo, rng=rng)[:, 0])
+            for _ in range(30)
+        ]
+        return np.std(medianas)
+
+    assert erro("sobol") < 0.5 * erro("random")
+
+
+def test_metodo_invalido():
+    with pytest.raises(ValueError):
+        sample_dirichlet(ALPHAS, 10, "halton")
+
+
+def test_variaveis_de_controle_reduzem_variancia():
+    # Corrida apertada com teto no líder: P(2º turno) depende do teto, mas
+    # correlaciona com as cotas e maiorias sem teto, cujas médias são exatas.
+    alphas = np.array([50.0, 40.0, 6.0, 4.0]) * 40
+    validos = [0, 1, 2]
+    rng = np.random.default_rng(4)
+
+    def p2t(x):
+        v = x[:, validos] / x[:, validos].sum(axis=1, keepdims=True) * 100
+        v = np.minimum(v, [48.0, 100.0, 100.0])
+        v = v / v.sum(axis=1, keepdims=True) * 100
+        return v.max(axis=1) < 50
+
+    n_ref = 2_000_000
+    verdade = p2t(rng.dirichlet(alphas, size=n_ref)).mean()
+    se_ref = np.sqrt(verdade * (1 - verdade) / n_ref)
+
+    x = rng.dirichlet(alphas, size=20_000)
+    controles, medias, _ = dirichlet_controls(x, alphas, validos)
+    est = cv_estimate(p2t(x), controles, medias)
+
+    assert est.variance_reduction[0] > 2
+    assert est.se[0] < est.raw_se[0]
+    assert abs(est.estimate[0] - verdade) < 4 * np.hypot(est.se[0], se_ref)
+
+
+def test_reponderacao_psis_recupera_nova_distribuicao():
+    rng = np.random.default_rng(11)
+    x = rng.dirichlet(ALPHAS, size=40_000)
+
+    igual = reweight_dirichlet(x, ALPHAS, ALPHAS)
+    assert igual.ok and np.isclose(igual.ess, len(x))
+
+    novo = ALPHAS.copy()
+    novo[0] += 15.0
+    novo[1] -= 15.0
+    ajuste = reweight_dirichlet(x, ALPHAS, novo)
+    assert ajuste.ok and ajuste.k_hat < 0.5
+    assert np.isclose(ajuste.weights.sum(), 1.0)
+    media = ajuste.weights @ x[:, 0]
+    assert abs(media - novo[0] / novo.sum()) < 5e-4
+
+    idx = systematic_resample(ajuste.weights, rng=rng)
+    assert abs(x[idx, 0].mean() - media) < 5e-4
+
+
+def test_reponderacao_rejeita_mudanca_grande():
+    x = np.random.default_rng(12).dirichlet(ALPHAS, size=20_000)
+    novo = ALPHAS * np.array([1.3, 0.8, 1.0, 1.0, 1.0])
+    assert not reweight_dirichlet(x, ALPHAS, novo).ok
+
+
+def test_gradiente_score_confere_com_derivada_analitica():
+    # E[x_0] = a_0 / A  =>  dE/da_0 = (A - a_0) / A², dE/da_j = -a_0 / A²
+    alphas = np.array([40.0, 30.0, 20.0, 10.0])
+    x = np.random.default_rng(13).dirichlet(alphas, size=200_000)
+    total = alphas.sum()
+    esperado = np.full(4, -alphas[0] / total**2)
+    esperado[0] = (total - alphas[0]) / total**2
+
+    grad, se = score_gradient(x[:, 0], x, alphas)
+    assert np.all(np.abs(grad[0] - esperado) < 4 * se[0])
+
+    # Chain rule: theta scales every alpha, d alpha / d theta = alphas
+    jac = alphas[:, np.newaxis]
+    grad_t, se_t = score_gradient(x[:, 0], x, alphas, jac)
+    assert abs(grad_t[0, 0]) < 4 * se_t[0, 0]
+    assert np.allclose(numeric_jacobian(lambda t: alphas * t[0], np.array([1.0])), jac)
+
+
+@pytest.mark.parametrize("metodo", METHODS)
+def test_pool_continua_o_mesmo_fluxo(metodo, tmp_path):
+    inteiro, aux_inteiro = SamplePool(ALPHAS, metodo, seed=7, n_aux=1).take(2000)
+
+    pool = SamplePool(ALPHAS, metodo, seed=7, n_aux=1)
+    assert pool.extend_to(401) >= 401
+    pool.save(tmp_path / "pool.npz")
+    retomado = SamplePool.load(tmp_path / "pool.npz")
+    novos = retomado.extend_to(2000)
+
+    assert novos <= 2000 - 401
+    proporcoes, aux = retomado.take(2000)
+    assert np.array_equal(proporcoes, inteiro)
+    assert np.array_equal(aux, aux_inteiro)
+
+
+def test_pool_acumula_contagens_so_nas_novas():
+    vistos = []
+
+    def contar(proporcoes, aux):
+        vistos.append(len(proporcoes))
+        return {"lider": int((proporcoes[:, 0] > proporcoes[:, 1]).sum())}
+
+    pool = SamplePool(ALPHAS, "random", seed=3, counter=contar)
+    pool.extend_to(1000)
+    pool.extend_to(5000)
+    pool.take(4000)
+
+    assert vistos == [1000, 4000]
+    x, _ = pool.take()
+    assert pool.counts["lider"] == int((x[:, 0] > x[:, 1]).sum())
+
+
+def test_registro_de_pools_lru():
+    registro = PoolRegistry(max_pools=2)
+    chaves = [pool_key(ALPHAS, "random", s) for s in range(3)]
+    assert len(set(chaves)) == 3
+    for s, chave in enumerate(chaves):
+        registro.get(chave, lambda: SamplePool(ALPHAS, seed=s))
+    assert len(registro) == 2
+    criado = []
+    registro.get(chaves[0], lambda: criado.append(1) or SamplePool(ALPHAS))
+    assert criado == [1]
+
+
+def test_banco_de_erros_prioriza_dias_proximos_e_renormaliza():
+    banco = ErrorBank(np.array([7.0, 30.0, 90.0]),
+                      np.array([[-3.0, 4.0], [1.0, 2.0], [0.5, 0.0]]),
+                      ["T-7", "T-30", "T-90"])
+    erros = banco.sample(20_000, dias=5, tau=7, rng=np.random.default_rng(0), ess_min=1)
+    assert erros.shape == (20_000, 2)
+    frac = (erros[:, 0] == -3.0).mean()
+    assert abs(frac - banco.weights(5, tau=7, ess_min=1)[0]) < 0.01
+    assert frac > 0.9
+
+    validos = np.tile([20.0, 45.0, 35.0], (3, 1))   # líder na coluna 1
+    ajustados = apply_errors(validos, np.array([[-3.0, 4.0]] * 3), ordem=[1, 2, 0])
+    assert np.allclose(ajustados.sum(axis=1), 100.0)
+    assert ajustados[0, 1] < 45.0 and ajustados[0, 2] > 35.0
+
+
+def test_banco_de_erros_alarga_tau_ate_ess_minimo():
+    dias = np.array([90.0, 60.0, 30.0, 14.0, 7.0, 30.0, 14.0, 7.0])
+    banco = ErrorBank(dias, np.zeros((8, 2)), [f"T-{d:.0f}" for d in dias])
+    for d in (400, 90, 60, 14, 0):
+        w = banco.weights(d)
+        assert np.isclose(w.sum(), 1.0) and 1.0 / np.sum(w**2) >= 3.0 - 1e-6
+        assert w.max() < 0.5 and np.argmax(w) == np.argmin(np.abs(dias - d))
+    # Perto dos registros o tau pedido já basta e não é alterado
+    perto = banco.weights(14)
+    assert np.allclose(perto, banco.weights(14, ess_min=1))
+    # Piso maior que o banco: pesos uniformes no limite
+    assert np.allclose(ErrorBank(dias[:2], np.zeros((2, 2)), ["a", "b"]).weights(500), 0.5, atol=1e-3)
+
+
+def test_banco_de_erros_do_backtesting(tmp_path):
+    from src.backtesting import construir_banco_erros
+
+    banco = construir_banco_erros(tmp_path / "banco.npz")
+    relido = ErrorBank.load(tmp_path / "banco.npz")
+    assert relido.rotulos == banco.rotulos
+    assert np.array_equal(relido.erros, banco.erros)
+    assert relido.ranks == 2 and np.all(relido.dias > 0)
+    # 2022 T-7: Lula (1º nas pesquisas) superestimado, Bolsonaro subestimado
+    i = banco.rotulos.index("2022 T-7")
+    assert banco.erros[i, 0] < 0 < banco.erros[i, 1]
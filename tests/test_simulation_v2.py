@@ -0,0 +1,129 @@
+"""
+Small-N smoke tests for the simulation_v2 entry points.
+"""
+
+import contextlib
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.simulation_v2 as sv
+
+
+@pytest.fixture
+def modelo(monkeypatch):
+    # Estado global do módulo: restaurado ao fim de cada teste
+    for nome in ("CANDIDATOS", "VOTOS_MEDIA", "REJEICAO", "DESVIO_BASE", "INDECISOS",
+                 "CORES", "DESVIO", "CSV_PATH", "N_SIM", "AMOSTRAGEM", "BANCO_ERROS"):
+        monkeypatch.setattr(sv, nome, getattr(sv, nome, None))
+    with contextlib.redirect_stdout(io.StringIO()):
+        sv.inicializar("data/pesquisas.csv")
+    np.random.seed(0)
+    return sv
+
+
+def _sem_nan(constante):
+    pytest.fail(f"JSON não estrito: {constante}")
+
+
+def test_resumo_json_estrito_com_variaveis_de_controle(modelo):
+    amostras = modelo.amostrar_primeiro_turno(2_000, verbose=False)
+    resumo = modelo.resumo_primeiro_turno(amostras, controles=True)
+    texto = json.dumps(resumo, ensure_ascii=False, allow_nan=False)
+    carregado = json.loads(texto, parse_constant=_sem_nan)
+
+    assert "variaveis_controle" in carregado
+    assert "variaveis_controle" not in modelo.resumo_primeiro_turno(amostras)
+    assert modelo._json_finito({"a": [float("nan"), (1.0, float("-inf"))]}) == {"a": [None, [1.0, None]]}
+
+
+@pytest.mark.parametrize("argv", [
+    ["--pool", "p", "--n-sim", "auto"],
+    ["--compare", "a.csv", "b.csv", "--n-sim", "auto"],
+    ["--reuse-draws", "d.npz"],
+    ["--summary-only", "--reuse-draws", "d.npz", "--pool", "p"],
+    ["--backfill", "--empirical-error", "bank.npz"],
+])
+def test_combinacoes_de_opcoes_rejeitadas(modelo, argv, capsys):
+    with pytest.raises(SystemExit) as erro:
+        modelo.main(argv)
+    assert erro.value.code == 2
+    assert "error:" in capsys.readouterr().err
+
+
+def test_resumo_pela_linha_de_comando(modelo, tmp_path):
+    destino = tmp_path / "resumo.json"
+    with contextlib.redirect_stdout(io.StringIO()):
+        modelo.main(["--summary-only", "--summary-out", str(destino), "--n-sim", "2000"])
+    resumo = json.loads(destino.read_text(encoding="utf-8"), parse_constant=_sem_nan)
+
+    assert set(resumo["pv"]) <= set(modelo.CANDIDATOS)
+    assert sum(resumo["pv"].values()) == pytest.approx(1.0)
+    assert 0.0 <= resumo["p2t"] <= 1.0
+    erro = resumo["erro_mc"]["p2t"]
+    assert erro["low"] - 1e-12 <= resumo["p2t"] <= erro["high"] + 1e-12
+
+
+@pytest.mark.parametrize("metodo", ["is", "cv"])
+def test_polymarket_edge_estimadores(modelo, metodo, tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        amostras = modelo.amostrar_primeiro_turno(2_000, verbose=False)
+        df1, *_ = modelo.simular_primeiro_turno(amostras, destino=tmp_path / "df1.csv")
+    contagem = modelo.polymarket_edge(df1, 5.0, 0.5, metodo="contagem")
+    edge = modelo.polymarket_edge(df1, 5.0, 0.5, metodo=metodo)
+
+    assert edge["metodo"] == metodo and edge["n_sim"] == len(df1) == 2_000
+    assert 0.0 <= edge["model_prob"] <= 1.0 and edge["mc_se"] >= 0.0
+    assert edge["edge"] == pytest.approx(edge["model_prob"] - 0.5)
+    assert abs(edge["model_prob"] - contagem["model_prob"]) < 5 * contagem["mc_se"] + 0.01
+
+    # Outras pesquisas carregadas: df1 não é mais do modelo atual
+    modelo.VOTOS_MEDIA = modelo.VOTOS_MEDIA * 1.01
+    with pytest.raises(ValueError):
+        modelo.polymarket_edge(df1, 5.0, 0.5, metodo=metodo)
+
+
+def test_atualizar_reaproveita_amostras(modelo, tmp_path):
+    caminho = tmp_path / "amostras.npz"
+    with contextlib.redirect_stdout(io.StringIO()):
+        primeira = modelo.atualizar_primeiro_turno(caminho)
+        segunda = modelo.atualizar_primeiro_turno(caminho)
+
+    assert caminho.exists() and primeira["reponderacao"]["reamostrado"]
+    info = segunda["reponderacao"]
+    assert not info["reamostrado"] and info["ess_frac"] == pytest.approx(1.0)
+    assert segunda["validos_final"].shape == primeira["validos_final"].shape
+    assert np.allclose(segunda["validos_final"].sum(axis=1), 100.0)
+
+
+def test_sensibilidades_formato(modelo):
+    amostras = modelo.amostrar_primeiro_turno(2_000, verbose=False)
+    tabela = modelo.sensibilidades(amostras, limiares=(5,))
+
+    assert list(tabela.columns) == ["entrada", "candidato", "parametro", "alvo", "efeito", "ep"]
+    assert set(tabela["candidato"]) - {"—"} <= set(modelo.CANDIDATOS)
+    assert np.isfinite(tabela["efeito"]).all() and (tabela["ep"] >= 0).all()
+
+
+def test_pool_continua_e_acumula(modelo):
+    with contextlib.redirect_stdout(io.StringIO()):
+        menor = modelo.amostrar_primeiro_turno_pool(1_000, semente=2026, verbose=False)
+        maior = modelo.amostrar_primeiro_turno_pool(2_000, semente=2026, verbose=False)
+
+    assert (maior["pool"]["n_reusados"], maior["pool"]["n_novos"]) == (1_000, 1_000)
+    assert np.array_equal(maior["validos_final"][:1_000], menor["validos_final"])
+    assert np.allclose(maior["validos_final"].sum(axis=1), 100.0)
+
+
+def test_backfill_uma_linha_por_dia(modelo):
+    with contextlib.redirect_stdout(io.StringIO()):
+        tabela = modelo.backfill_trajetoria("data/pesquisas.csv", n_sim=1_000, caminho="")
+
+    dias = pd.to_datetime(tabela["data"])
+    assert dias.is_monotonic_increasing and dias.diff().dropna().dt.days.eq(1).all()
+    pv = tabela.filter(like="pv_").dropna()
+    assert np.allclose(pv.sum(axis=1), 1.0)
+    assert tabela["p2t"].dropna().between(0, 1).all()
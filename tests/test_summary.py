@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.adaptive import conservative_se, sample_until
+from src.core.mcse import (
+    batch_means_quantile_se,
+    beta_interval,
+    binomial_se,
+    edge_significance,
+    wilson_interval,
+)
+from src.core.summary import compute_summary, quantile_table
+from src.core.tail import dirichlet_logpdf, estimate_tail, estimate_tail_strata
+
+
+def _amostras(n=5000, seed=7):
+    rng = np.random.default_rng(seed)
+    votos = rng.dirichlet([40, 35, 15, 10], size=n) * 100
+    return votos, ["A", "B", "C", "D"]
+
+
+def test_summary_bate_com_pandas():
+    votos, cands = _amostras()
+    df = pd.DataFrame(votos, columns=cands)
+    ordenado = np.sort(votos, axis=1)
+    margem = ordenado[:, -1] - ordenado[:, -2]
+
+    s = compute_summary(votos, cands, thresholds=(3, 10, 15))
+
+    assert np.allclose(s.mean, df.mean().to_numpy())
+    for i, c in enumerate(cands):
+        assert s.quantile(c, 0.05) == pytest.approx(df[c].quantile(0.05))
+        assert s.quantile(c, 0.95) == pytest.approx(df[c].quantile(0.95))
+
+    vencedor = df.idxmax(axis=1).value_counts(normalize=True)
+    for c in cands:
+        assert s.win_prob[c] == pytest.approx(vencedor.get(c, 0.0))
+
+    assert s.p2t == pytest.approx((ordenado[:, -1] < 50).mean())
+    for thr in (3, 10, 15):
+        assert s.prob_margin_above(thr) == pytest.approx((margem > thr).mean())
+        assert s.prob_margin_below(thr) == pytest.approx((margem < thr).mean())
+    assert s.margin_quantile(0.50) == pytest.approx(np.median(margem))
+
+
+def test_pares_do_segundo_turno():
+    votos, cands = _amostras(n=2000, seed=11)
+    s = compute_summary(votos, cands)
+
+    top2 = np.argsort(votos, axis=1)[:, -2:]
+    esperado = pd.Series(
+        [tuple(sorted(cands[j] for j in linha)) for linha in top2]
+    ).value_counts(normalize=True)
+
+    assert sum(s.pair_prob.values()) == pytest.approx(1.0)
+    for par, p in s.pair_prob.items():
+        assert p == pytest.approx(esperado[tuple(sorted(par))])
+    assert sum(s.qualify_prob.values()) == pytest.approx(2.0)
+
+
+def test_limiar_nao_calculado_gera_erro():
+    votos, cands = _amostras(n=100)
+    s = compute_summary(votos, cands, thresholds=(3,))
+    with pytest.raises(KeyError):
+        s.prob_margin_above(7)
+
+
+def test_quantile_table_formato():
+    votos, _ = _amostras(n=500)
+    tabela = quantile_table(votos, (0.1, 0.5, 0.9))
+    assert tabela.shape == (4, 3)
+    assert np.all(np.diff(tabela, axis=1) >= 0)
+
+
+def test_wilson_valores_conhecidos():
+    # Referência: Wilson 95% para 8/20 = [0.2188, 0.6134]
+    low, high = wilson_interval(8, 20)
+    assert low == pytest.approx(0.2188, abs=1e-4)
+    assert high == pytest.approx(0.6134, abs=1e-4)
+
+    # Nunca colapsa para largura zero nas caudas
+    low0, high0 = wilson_interval(0, 10_000)
+    assert low0 == 0.0 and high0 > 0.0
+    assert binomial_se(0, 10_000) == 0.0
+
+
+def test_beta_contem_frequencia():
+    k = np.array([0, 5, 500, 1000])
+    low, high = beta_interval(k, 1000)
+    p = k / 1000
+    assert np.all(low <= p) and np.all(p <= high)
+    assert low[0] == 0.0 and high[-1] == 1.0
+
+
+def test_batch_means_aproxima_erro_da_mediana():
+    # SE assintótico da mediana de N(0,1): sqrt(pi/2) / sqrt(n)
+    n = 200_000
+    x = np.random.default_rng(3).standard_normal(n)
+    se = batch_means_quantile_se(x, [0.5])
+    assert se.shape == (1,)
+    assert se[0] == pytest.approx(np.sqrt(np.pi / 2 / n), rel=0.5)
+
+
+def test_edge_significancia():
+    assert edge_significance(5_800, 10_000, 0.55)["significant"]
+    assert not edge_significance(5_800, 10_000, 0.578)["significant"]
+    # k = 0: erro padrão nulo, z com o sinal da vantagem
+    assert edge_significance(0, 10_000, 0.10)["z_score"] == -np.inf
+    assert edge_significance(10_000, 10_000, 0.90)["z_score"] == np.inf
+
+
+def test_sample_until_para_no_erro_alvo():
+    rng = np.random.default_rng(5)
+    run = sample_until(
+        lambda n: rng.random(n),
+        lambda x: {"raro": int((x < 0.0).sum()), "meio": int((x < 0.5).sum())},
+        target_se=0.005,
+        n_initial=1_000,
+        verbose=False,
+    )
+    assert run.converged
+    assert run.n_sim == sum(len(c) for c in run.chunks)
+    assert conservative_se(run.counts["meio"], run.n_sim) <= 0.005
+    # p = 0.5 exige ~10k amostras; a estimativa não deve passar muito disso
+    assert 9_000 <= run.n_sim <= 15_000
+
+
+def test_dirichlet_logpdf_bate_com_scipy():
+    from scipy.stats import dirichlet
+
+    alphas = np.array([12.0, 7.5, 3.0])
+    x = np.random.default_rng(0).dirichlet(alphas, size=5)
+    esperado = [dirichlet.logpdf(linha, alphas) for linha in x]
+    assert np.allclose(dirichlet_logpdf(x, alphas), esperado)
+
+
+def test_importance_sampling_cauda_sem_vies():
+    alphas = np.array([40.0, 30.0, 30.0])
+    transform = lambda props: props * 100
+    rng = np.random.default_rng(21)
+
+    ref = rng.dirichlet(alphas, size=2_000_000) * 100
+    ordenado = np.sort(ref, axis=1)
+    verdade = ((ordenado[:, -1] - ordenado[:, -2]) > 20).mean()
+    assert 0.001 < verdade < 0.05
+
+    est = estimate_tail(alphas, transform, 20.0, target=0, n=40_000, rng=rng)
+    assert abs(est.prob - verdade) < 4 * est.se
+    assert est.ess > 1_000
+    # Mais preciso que contar 40k amostras simples
+    assert est.se < np.sqrt(verdade * (1 - verdade) / 40_000)
+
+
+def test_importance_sampling_cauda_estratificada_por_erro_discreto():
+    alphas = np.array([40.0, 30.0, 30.0])
+    erros, pesos = [-4.0, 0.0, 9.0], np.array([0.5, 0.3, 0.2])
+    transforms = [lambda props, e=e: props * 100 + [e, -e, 0.0] for e in erros]
+    rng = np.random.default_rng(3)
+
+    ref = rng.dirichlet(alphas, size=2_000_000) * 100
+    ref += np.array([[e, -e, 0.0] for e in erros])[rng.choice(3, size=len(ref), p=pesos)]
+    ordenado = np.sort(ref, axis=1)
+    verdade = ((ordenado[:, -1] - ordenado[:, -2]) > 25).mean()
+    assert 0.001 < verdade < 0.05
+
+    est = estimate_tail_strata(alphas, transforms, pesos, 25.0, target=0, n=40_000, rng=rng)
+    assert abs(est.prob - verdade) < 4 * est.se
+    assert est.se < np.sqrt(verdade * (1 - verdade) / 40_000)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.config import PollData
+from src.core.paired import paired_compare
+from src.core.simulation import redistribute_undecided
+from src.core.sweep import expand_grid, run_sweep
+
+
+POLL = PollData(
+    candidatos=["Lula", "Flávio Bolsonaro", "Outros", "Brancos/Nulos"],
+    votos_media=np.array([38.0, 32.0, 12.0, 8.0]),
+    rejeicao=np.array([45.0, 48.0, 20.0, 0.0]),
+    desvio_base=2.0,
+    indecisos=10.0,
+)
+
+
+def test_expand_grid_produz_produto_cartesiano():
+    cenarios = expand_grid({"Lula.votos_media": [36, 40], "indecisos": [5, 10, 15]})
+    assert len(cenarios) == 6
+    assert cenarios[0] == {"Lula": {"votos_media": 36}, "indecisos": 5}
+
+
+def test_redistribuicao_igual_a_formula_escalar():
+    valid = np.array([True, True, True, False])
+    ajustado = redistribute_undecided(
+        POLL.votos_media[np.newaxis], POLL.rejeicao[np.newaxis], [10.0], [0.15], valid
+    )[0]
+    pesos = POLL.votos_media * (100 - POLL.rejeicao) / 100 * valid
+    esperado = POLL.votos_media + pesos / pesos.sum() * 10 * 0.85
+    esperado[3] += 1.5
+    assert np.allclose(ajustado, esperado)
+    assert np.isclose(ajustado.sum(), POLL.votos_media.sum() + 10)
+
+
+def test_blocos_nao_alteram_resultado():
+    cenarios = expand_grid({"Lula.votos_media": [34, 38, 42], "blank_fraction": [0.1, 0.3]})
+    lote = run_sweep(POLL, cenarios, n_sim=2000, rng=np.random.default_rng(5))
+    um_a_um = run_sweep(POLL, cenarios, n_sim=2000, chunk_size=1, rng=np.random.default_rng(5))
+    pd.testing.assert_frame_equal(lote, um_a_um)
+    assert len(lote) == 6
+    assert {"Lula.votos_media", "blank_fraction", "pv_Lula", "p2t"} <= set(lote.columns)
+
+
+def test_override_move_probabilidades_na_direcao_certa():
+    df = run_sweep(
+        POLL, [{}, {"Lula": {"votos_media": 33.0}}], n_sim=20_000,
+        method="sobol", rng=np.random.default_rng(0),
+    )
+    assert df.loc[1, "pv_Lula"] < df.loc[0, "pv_Lula"]
+    assert df.loc[1, "media_Lula"] < df.loc[0, "media_Lula"]
+    assert np.allclose(df.filter(like="pv_").sum(axis=1), 1.0)
+
+
+def test_override_desconhecido():
+    with pytest.raises(KeyError):
+        run_sweep(POLL, [{"Ciro": {"votos_media": 10.0}}], n_sim=10)
+
+
+def test_comparacao_pareada_consigo_mesma_e_nula():
+    tabela = paired_compare(POLL, POLL, n_sim=5000, rng=np.random.default_rng(2))
+    assert np.allclose(tabela["delta"], 0.0)
+    assert np.allclose(tabela["ep_pareado"], 0.0)
+
+
+def test_comparacao_pareada_reduz_erro_em_corrida_apertada():
+    antigo = PollData(POLL.candidatos, np.array([35.0, 34.0, 12.0, 8.0]),
+                      POLL.rejeicao, POLL.desvio_base, POLL.indecisos)
+    novo = PollData(POLL.candidatos, np.array([35.1, 34.0, 12.0, 8.0]),
+                    POLL.rejeicao, POLL.desvio_base, POLL.indecisos)
+    tabela = paired_compare(antigo, novo, n_sim=40_000, rng=np.random.default_rng(3))
+    lula = tabela.loc["pv Lula"]
+    assert lula["delta"] > 0
+    assert lula["ep_pareado"] < lula["ep_independente"] / 2
+    assert lula["z"] > 3
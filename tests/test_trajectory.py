@@ -0,0 +1,68 @@
+"""
+Tests for the batched forecast trajectory (src/core/trajectory.py).
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import src.simulation_v2 as sv
+from src.core.trajectory import aggregate_dates, run_trajectory
+
+
+def _pesquisas(rng) -> pd.DataFrame:
+    inicio = date(2026, 3, 1)
+    linhas = []
+    for p in range(9):
+        dia = inicio + timedelta(days=int(rng.integers(0, 40)))
+        ind = float(rng.uniform(2, 10))
+        lula = 40.0 + rng.normal(0, 2) + (12.0 if p == 4 else 0.0)   # um outlier
+        for cand, voto, rej in [("Lula", lula, 45.0), ("Tarcísio", 33.0 + rng.normal(0, 2), 0.0),
+                                ("Outros", 12.0, 20.0), ("Brancos/Nulos", 8.0, 0.0)]:
+            linhas.append({"candidato": cand, "intencao_voto_pct": voto,
+                           "rejeicao_pct": rej + (rng.uniform(0, 3) if rej else 0.0),
+                           "desvio_padrao_pct": float(rng.choice([1.0, 2.0, 2.5])),
+                           "indecisos_pct": ind, "instituto": f"I{p}", "data": dia})
+    # Candidato que só aparece a partir da metade da campanha
+    linhas.append({"candidato": "Zema", "intencao_voto_pct": 4.0, "rejeicao_pct": 0.0,
+                   "desvio_padrao_pct": 2.0, "indecisos_pct": 5.0, "instituto": "I9",
+                   "data": inicio + timedelta(days=20)})
+    return pd.DataFrame(linhas)
+
+
+def test_agregacao_matricial_igual_a_escalar_por_dia():
+    df = _pesquisas(np.random.default_rng(1))
+    cands = list(df["candidato"].unique())
+    dias = [date(2026, 3, 1) + timedelta(days=d) for d in range(0, 45, 3)]
+    estados = aggregate_dates(np.array([d.toordinal() for d in dias]), df, cands)
+
+    for i, dia in enumerate(dias):
+        publicadas = df[df["data"] <= dia]
+        for j, cand in enumerate(cands):
+            df_cand = publicadas[publicadas["candidato"] == cand]
+            if df_cand.empty:
+                assert np.isnan(estados["votos"][i, j])
+                continue
+            voto, rej, desv, _ = sv.agregar_pesquisas_candidato(df_cand, dia)
+            assert np.allclose([estados["votos"][i, j], estados["rejeicao"][i, j],
+                                estados["desvio"][i, j]], [voto, rej, desv])
+        if len(publicadas):
+            pesos = np.exp(-np.array([(dia - d).days for d in publicadas["data"]]) / 7)
+            assert np.isclose(estados["indecisos"][i],
+                              np.average(publicadas["indecisos_pct"], weights=pesos))
+
+
+def test_trajetoria_numeros_aleatorios_comuns():
+    df = _pesquisas(np.random.default_rng(2))
+    cands = list(df["candidato"].unique())
+    dias = np.array([date(2026, 4, 15).toordinal()] * 3 + [date(2026, 2, 1).toordinal()])
+    estados = aggregate_dates(dias, df, cands)
+    res = run_trajectory(estados, cands, np.full(4, 2.0), n_sim=4_000,
+                         rng=np.random.default_rng(0))
+
+    assert res[3] is None                                     # antes da primeira pesquisa
+    assert res[0]["candidatos"] == ["Lula", "Tarcísio", "Outros", "Zema"]
+    # Mesmo estado, mesmas normais → resultados idênticos entre os dias
+    assert np.array_equal(res[0]["win"], res[2]["win"])
+    assert np.isclose(res[0]["win"].sum(), 1.0) and res[0]["win"][0] > 0.9